@@ -1,24 +1,41 @@
-import os
+import time
 import sys
+
+# The bot subprocess (api.py --run-main) starts here, before the web server's imports below,
+# which it never uses
+if __name__ == "__main__" and "--run-main" in sys.argv[1:]:
+    import bot_startup
+    bot_startup.run(sys.argv, start=time.perf_counter())
+    sys.exit(0)
+
+import os
 import webbrowser
 import threading
 import print_utils
-from collections import deque
 from flask import Flask, request, jsonify
 from flask_socketio import SocketIO, emit
 import json
 import subprocess
-import random
-import time
+from collections import deque
 from pathlib import Path
 import argparse
-import re
 from config import get_user_data_dir
+from log_pipeline import ConsoleBuffer, LogPipeline
+from console_log import ConsoleLog
+from bot_events import ENV_ADDRESS, BotState, EventServer
 
 # --- INITIALIZE GLOBAL VARIABLES HERE ---
 _lock = threading.Lock()
 bot_process = None
-bot_output = deque(maxlen=5000)
+bot_output = ConsoleBuffer(maxlen=5000)
+# Price, status, order and TWS message events of the bot, received over event_server
+bot_state = BotState()
+event_server = None
+# Warm standby (see WARM_STANDBY): a bot subprocess with everything imported that waits
+# for /api/start; client IDs of the running bot and the standby, for picking the next one
+standby_process = None
+bot_client_id = None
+standby_client_id = None
 # --- END INITIALIZATION ---
 
 # --- HELPER FUNCTIONS (resource_path is unchanged) ---
@@ -40,8 +57,15 @@ CONFIG_FILE = os.path.join(USER_DATA_DIR, 'config.json')
 DEFAULT_CONFIG_FILE = resource_path('config.json')
 # Session files also go in the user data directory
 SESSION_FILES = [os.path.join(USER_DATA_DIR, "session_name.session"), os.path.join(USER_DATA_DIR, "session_name.session-journal")]
-# Log file also goes in the user data directory
+# Log files also go in the user data directory: one per day, plus the single-file log of older versions
+CONSOLE_LOG_DIR = os.path.join(USER_DATA_DIR, "console_logs")
 LOG_FILE = os.path.join(USER_DATA_DIR, "bot_console.log")
+console_log = ConsoleLog(CONSOLE_LOG_DIR)
+# Order latency histograms written by the bot, one YYYY-MM-DD.json per trading day
+ORDER_LATENCY_DIR = os.path.join(USER_DATA_DIR, "order_latency")
+# Seconds between log file writes and between socket.io output frames
+LOG_FLUSH_INTERVAL = 0.5
+OUTPUT_EMIT_INTERVAL = 0.1
 
 MAIN_SCRIPT = resource_path('main.py')
 REACT_DIST = resource_path("raising-bot-web/dist")
@@ -54,7 +78,7 @@ socketio = SocketIO(app, cors_allowed_origins="*")
 CONFIG_FIELDS = [
     "IBKR_ACCOUNT", "IBKR_PORT", "TELEGRAM_API_ID", "TELEGRAM_API_HASH", "TELEGRAM_CHANNEL",
     "IBKR_HOST", "IBKR_CLIENT_ID", "UNDERLYING_SYMBOL", "DEFAULT_ORDER_TYPE", "SNAPMID_OFFSET",
-    "DEFAULT_LIMIT_PRICE", "DEFAULT_STOP_PRICE", "WAIT_AFTER_OPEN_SECONDS",
+    "DEFAULT_LIMIT_PRICE", "DEFAULT_STOP_PRICE", "WAIT_AFTER_OPEN_SECONDS", "PRICE_STATUS_HZ", "WARM_STANDBY",
     "LMT_PRICE_FOR_SPREAD_30", "LMT_PRICE_FOR_SPREAD_35", "PEG_MID_PRICE_CAP"
 ]
 
@@ -70,34 +94,55 @@ CONFIG_DEFAULTS = {
     "DEFAULT_ORDER_TYPE": "SNAP MID",
     "SNAPMID_OFFSET": "0.1",
     "WAIT_AFTER_OPEN_SECONDS": "3",
+    "PRICE_STATUS_HZ": "2",
+    "WARM_STANDBY": "off",
     "LMT_PRICE_FOR_SPREAD_30": "",
     "LMT_PRICE_FOR_SPREAD_35": "",
 }
 
+# off; warm (modules and calendar loaded); connected (also holds its own TWS connection)
+STANDBY_MODES = ["off", "warm", "connected"]
+
 VALID_ORDER_TYPES = [
     "SNAP MID", "SNAP MKT", "LMT", "MKT", "STP", "STP LMT", "REL", "TRAIL", "TRAIL LIMIT", "PEG MID"
 ]
 
 # --- UPDATE CONFIG LOADING LOGIC ---
+# (inode, mtime_ns, size) of config.json and what was read from it, so GETs do not re-read the file
+_config_cache = None
+
 def load_config():
+    global _config_cache
     # If user config doesn't exist, create it from the default bundled with the app
     if not os.path.exists(CONFIG_FILE) and os.path.exists(DEFAULT_CONFIG_FILE):
         import shutil
         shutil.copy(DEFAULT_CONFIG_FILE, CONFIG_FILE)
 
+    try:
+        st = os.stat(CONFIG_FILE)
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    except OSError:
+        key = None
+    cached = _config_cache
+    if cached is not None and cached[0] == key:
+        return cached[1].copy()
+
     config = CONFIG_DEFAULTS.copy()
-    if os.path.exists(CONFIG_FILE):
+    if key is not None:
         with open(CONFIG_FILE) as f:
             try:
                 config.update(json.load(f))
             except Exception:
                 pass # If file is corrupt, we'll use defaults
-    return config
+    _config_cache = (key, config)
+    return config.copy()
 
 # `save_config` is now fine because CONFIG_FILE points to a writable location.
 
 def save_config(data):
+    global _config_cache
     # Atomic write with simple retry
+    _config_cache = None
     tmp = CONFIG_FILE + ".tmp"
     last_err = None
     for i in range(3):
@@ -111,24 +156,90 @@ def save_config(data):
             time.sleep(0.1 * (2 ** i))
     raise last_err
 
-def _start_subprocess_with_retry():
-    global bot_process
+def on_bot_event(event):
+    bot_state.apply(event)
+    socketio.emit("bot_event", event)
+
+def _ensure_event_server():
+    """Starts the loopback event server once; returns its address, or None if it cannot listen."""
+    global event_server
+    if event_server is None:
+        server = EventServer(on_bot_event)
+        try:
+            server.start()
+        except OSError as e:
+            print(f"Event server failed to start, bot status comes from the console: {e}", flush=True)
+            return None
+        event_server = server
+    return event_server.address
+
+def _next_client_id(*in_use):
+    """
+    Bot processes alternate between IBKR_CLIENT_ID and the next ID, so the standby never
+    shares an ID with the running bot and a restart does not reuse the one just released.
+    """
+    try:
+        base = int(load_config().get("IBKR_CLIENT_ID"))
+    except (TypeError, ValueError):
+        base = int(CONFIG_DEFAULTS["IBKR_CLIENT_ID"])
+    return base + 1 if base in in_use else base
+
+class _OutputPump:
+    """
+    Reads a bot subprocess's stdout from the moment it is spawned. A standby that prints
+    while it waits (TWS farm messages, in connected mode) would otherwise fill the pipe,
+    and its print would block, TWS reader thread included. Lines are kept (the last
+    `backlog` of them) until attach() passes them, and every later line, to a consumer.
+    """
+
+    def __init__(self, stream, backlog=500):
+        self._lock = threading.Lock()
+        self._lines = deque(maxlen=backlog)
+        self._consumer = None
+        self._thread = threading.Thread(target=self._run, args=(stream,), daemon=True)
+        self._thread.start()
+
+    def attach(self, consumer):
+        with self._lock:
+            for line in self._lines:
+                consumer(line)
+            self._lines.clear()
+            self._consumer = consumer
+
+    def join(self):
+        self._thread.join()
+
+    def _run(self, stream):
+        try:
+            for line in iter(stream.readline, ""):
+                with self._lock:
+                    if self._consumer is None:
+                        self._lines.append(line)
+                    else:
+                        self._consumer(line)
+        except Exception:
+            pass
+
+def _spawn_bot(client_id, extra_args=()):
+    """Starts a bot subprocess (retrying) with its output pump, or returns None."""
     env = os.environ.copy()
     env["PYTHONUNBUFFERED"] = "1"
-    last_err = None
+    address = _ensure_event_server()
+    if address:
+        env[ENV_ADDRESS] = address
 
     # Create the correct command based on whether the app is packaged or not.
     if getattr(sys, 'frozen', False):
         # In a packaged app, sys.executable is the app itself.
-        command = [sys.executable, "--run-main", "--client-id", str(random.randint(100, 999))]
+        command = [sys.executable, "--run-main", "--client-id", str(client_id), *extra_args]
     else:
         # In development, we must explicitly call the script (api.py).
         # sys.argv[0] is the path to the current script (api.py).
-        command = [sys.executable, sys.argv[0], "--run-main", "--client-id", str(random.randint(100, 999))]
+        command = [sys.executable, sys.argv[0], "--run-main", "--client-id", str(client_id), *extra_args]
 
     for i in range(3):
         try:
-            bot_process = subprocess.Popen(
+            process = subprocess.Popen(
                 command,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
@@ -139,48 +250,80 @@ def _start_subprocess_with_retry():
                 errors="ignore",
                 env=env,
             )
-            return True
-        except Exception as e:
-            last_err = e
+        except Exception:
             time.sleep(0.3 * (2 ** i))
-    bot_process = None
-    return False
+            continue
+        process.output_pump = _OutputPump(process.stdout)
+        return process
+    return None
+
+def _start_subprocess_with_retry():
+    """Hands the run to the warm standby if one is waiting, otherwise spawns the bot. Call with _lock held."""
+    global bot_process, bot_client_id, standby_process
+    standby, standby_process = standby_process, None
+    if standby is not None and standby.poll() is None:
+        try:
+            standby.stdin.write("start\n")
+            standby.stdin.flush()
+            bot_process, bot_client_id = standby, standby_client_id
+            return True
+        except Exception:
+            _terminate(standby)
+    client_id = _next_client_id(bot_client_id)
+    bot_process = _spawn_bot(client_id)
+    if bot_process is None:
+        return False
+    bot_client_id = client_id
+    return True
+
+def _terminate(process):
+    try:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    finally:
+        if process.stdout: process.stdout.close()
+        if process.stdin: process.stdin.close()
+
+def refresh_standby(restart=False):
+    """
+    Keeps one standby waiting when WARM_STANDBY is on, spawning it with an ID the running
+    bot does not use. restart replaces a waiting standby, which still has the config it
+    imported at launch.
+    """
+    global standby_process, standby_client_id
+    mode = str(load_config().get("WARM_STANDBY", "off")).strip().lower()
+    with _lock:
+        alive = standby_process is not None and standby_process.poll() is None
+        if alive and (restart or mode not in ("warm", "connected")):
+            _terminate(standby_process)
+            alive = False
+        if not alive:
+            standby_process = None
+        if alive or mode not in ("warm", "connected"):
+            return
+        running = bot_process is not None and bot_process.poll() is None
+        client_id = _next_client_id(bot_client_id if running else None)
+        standby_process = _spawn_bot(client_id, ["--standby-connect" if mode == "connected" else "--standby"])
+        standby_client_id = client_id
 
 def read_bot_output():
     global bot_process, bot_output
+    pipeline = LogPipeline(bot_output, lambda frame: socketio.emit("output", frame),
+                           console_log, flush_interval=LOG_FLUSH_INTERVAL, emit_interval=OUTPUT_EMIT_INTERVAL)
+    pipeline.start()
     try:
-        assert bot_process and bot_process.stdout
-        for line in iter(bot_process.stdout.readline, ""):
-            raw = line.rstrip()
-            stripped = re.sub(r'^\[TS:[^\]]+\]\s*', '', raw)
-            UPDATABLE_PREFIXES = ("Waiting for market open:", "Live SPX Price:")
-
-            def is_updatable_line(line):
-                stripped = re.sub(r'^\[TS:[^\]]+\]\s*', '', line)
-                return any(stripped.startswith(prefix) for prefix in UPDATABLE_PREFIXES)
-
-            is_updatable = any(stripped.startswith(prefix) for prefix in UPDATABLE_PREFIXES)
-
-            with _lock:
-                if is_updatable:
-                    if bot_output and is_updatable_line(bot_output[-1]):
-                        bot_output[-1] = raw
-                    else:
-                        bot_output.append(raw)
-                else:
-                    bot_output.append(raw)
-            # Emit the new line to all connected clients
-            socketio.emit("output", {"line": raw})
-
-            if not is_updatable:
-                try:
-                    with open(LOG_FILE, "a") as f:
-                        f.write(raw + "\n")
-                except Exception:
-                    pass
+        assert bot_process
+        pump = bot_process.output_pump
+        # A standby's lines from before the handover come first
+        pump.attach(lambda line: pipeline.ingest(line.rstrip()))
+        pump.join()
     except Exception:
         pass
     finally:
+        pipeline.stop()
         with _lock:
             bot_process = None
 
@@ -206,6 +349,10 @@ def config():
 
         # Validate order type
         order_type = data.get("DEFAULT_ORDER_TYPE", "").strip().upper()
+        standby_mode = str(data.get("WARM_STANDBY", "off")).strip().lower()
+        if standby_mode not in STANDBY_MODES:
+            return jsonify({"error": f"Invalid WARM_STANDBY: {standby_mode}. Allowed: {', '.join(STANDBY_MODES)}"}), 400
+
         if order_type and order_type not in VALID_ORDER_TYPES:
             return jsonify({"error": f"Invalid DEFAULT_ORDER_TYPE: {order_type}. Allowed: {', '.join(VALID_ORDER_TYPES)}"}), 400
 
@@ -249,6 +396,8 @@ def config():
             merged = load_config()
             merged.update({k: str(v) for k, v in data.items()})
             save_config(merged)
+            # A waiting standby imported the old config; replace it (or stop it if now off)
+            threading.Thread(target=refresh_standby, kwargs={"restart": True}, daemon=True).start()
             return jsonify({"status": "ok"})
         except Exception as e:
             return jsonify({"error": f"Failed to save config: {e}"}), 500
@@ -260,10 +409,13 @@ def start_bot():
     with _lock:
         if bot_process is None or bot_process.poll() is not None:
             bot_output.clear()
+            bot_state.clear()
             ok = _start_subprocess_with_retry()
             if not ok:
                 return jsonify({"status": "failed"}), 500
             threading.Thread(target=read_bot_output, daemon=True).start()
+            # The next standby warms up in the background while this run starts
+            threading.Thread(target=refresh_standby, daemon=True).start()
     return jsonify({"status": "started"})
 
 @app.route("/api/stop", methods=["POST"])
@@ -272,24 +424,35 @@ def stop_bot():
     with _lock:
         if bot_process and bot_process.poll() is None:
             try:
-                bot_process.terminate()
-                try:
-                    bot_process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    bot_process.kill()
-                finally:
-                    if bot_process.stdout: bot_process.stdout.close()
-                    if bot_process.stdin: bot_process.stdin.close()
+                _terminate(bot_process)
             finally:
                 bot_process = None
         # Clear output when stopped
         bot_output.clear()
+        bot_state.clear()
     return jsonify({"status": "stopped"})
 
 @app.route("/api/output")
 def get_output():
-    with _lock:
-        return jsonify({"output": list(bot_output)})
+    """
+    All buffered entries, or with ?since=N only those changed after sequence number N
+    (reset=true means the client's copy is stale and the entries replace it).
+    """
+    since = request.args.get("since", type=int)
+    entries, last_seq, reset = bot_output.since(since)
+    if since is None:
+        return jsonify({"output": [e["line"] for e in entries], "entries": entries, "last_seq": last_seq})
+    return jsonify({"entries": entries, "last_seq": last_seq, "reset": reset})
+
+@app.route("/api/state")
+def get_state():
+    """The bot's latest price, status, order statuses and TWS messages, as received over the event channel."""
+    return jsonify(bot_state.snapshot())
+
+@app.route("/api/bars")
+def get_bars():
+    """The session's one-minute SPX bars and VWAP, from the bot's latest bars event (null before any)."""
+    return jsonify(bot_state.snapshot()["bars"])
 
 @app.route("/api/input", methods=["POST"])
 def bot_input():
@@ -313,7 +476,8 @@ def bot_input():
 def bot_status():
     with _lock:
         running = bot_process is not None and bot_process.poll() is None
-    return jsonify({"running": running})
+        standby = standby_process is not None and standby_process.poll() is None
+    return jsonify({"running": running, "standby": standby})
 
 def _session_exists():
     return any(os.path.exists(p) for p in SESSION_FILES)
@@ -346,6 +510,9 @@ def telegram_session():
 @app.route('/api/shutdown', methods=['POST'])
 def shutdown():
     """Shuts down the Flask server."""
+    with _lock:
+        if standby_process is not None and standby_process.poll() is None:
+            _terminate(standby_process)
     shutdown_func = request.environ.get('werkzeug.server.shutdown')
     if shutdown_func is None:
         # This is a fallback for non-development servers, though it's an abrupt exit.
@@ -365,20 +532,63 @@ def serve(path):
 
 @app.route("/api/history")
 def get_history():
+    """
+    Console history of one day. Query parameters: date (YYYY-MM-DD, required), start and
+    end (HH:MM[:SS]), q (text filter), cursor (from the previous page's next_cursor), limit.
+    """
     date_str = request.args.get("date")  # Format: YYYY-MM-DD
     if not date_str:
-        return jsonify({"history": []})
+        return jsonify({"history": [], "next_cursor": None})
+    try:
+        cursor = request.args.get("cursor")
+        limit = min(max(int(request.args.get("limit", 500)), 1), 5000)
+        lines, next_cursor = console_log.history(
+            date_str,
+            start=request.args.get("start") or None,
+            end=request.args.get("end") or None,
+            text=request.args.get("q") or None,
+            cursor=int(cursor) if cursor not in (None, "") else None,
+            limit=limit,
+        )
+        return jsonify({"history": lines, "next_cursor": next_cursor})
+    except Exception:
+        return jsonify({"history": [], "next_cursor": None})
+
+@app.route("/api/history/days")
+def get_history_days():
+    return jsonify({"days": console_log.days()})
+
+@app.route("/api/latency")
+def get_latency():
+    """Order latency histograms of one trading day (?date=YYYY-MM-DD, default the latest)."""
+    days = latency_days()
+    date_str = request.args.get("date") or (days[-1] if days else None)
+    if date_str not in days:
+        return jsonify({"date": date_str, "stages": {}})
     try:
-        with open(LOG_FILE, "r") as f:
-            lines = f.readlines()
-        if date_str:
-            # Filter lines by date prefix, e.g. [TS:2025-08-27 ...]
-            filtered = [line.rstrip() for line in lines if line.startswith(f"[TS:{date_str}")]
-        else:
-            filtered = [line.rstrip() for line in lines]
-        return jsonify({"history": filtered})
+        with open(os.path.join(ORDER_LATENCY_DIR, f"{date_str}.json")) as f:
+            return jsonify(json.load(f))
     except Exception:
-        return jsonify({"history": []})
+        return jsonify({"date": date_str, "stages": {}})
+
+@app.route("/api/latency/days")
+def get_latency_days():
+    return jsonify({"days": latency_days()})
+
+def latency_days():
+    try:
+        names = os.listdir(ORDER_LATENCY_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted(name[:-5] for name in names if name.endswith(".json"))
+
+def prepare_console_log():
+    """Moves the old single-file log into per-day files and compresses past days."""
+    try:
+        console_log.migrate(LOG_FILE)
+        console_log.rotate()
+    except Exception as e:
+        print(f"Console log maintenance failed: {e}", flush=True)
 
 # --- ADD THIS BROWSER-OPENING LOGIC AT THE VERY END ---
 def open_browser():
@@ -387,15 +597,16 @@ def open_browser():
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--run-main", action="store_true", help="Run the main_loop for the bot subprocess.")
+    parser.add_argument("--run-main", action="store_true", help="Run the main_loop for the bot subprocess (handled by bot_startup at the top).")
+    parser.add_argument("--log-flush-interval", type=float, default=LOG_FLUSH_INTERVAL, help="Seconds between writes to bot_console.log.")
+    parser.add_argument("--emit-interval", type=float, default=OUTPUT_EMIT_INTERVAL, help="Seconds between batched console frames sent to the browser.")
     args, unknown = parser.parse_known_args()
+    LOG_FLUSH_INTERVAL = args.log_flush_interval
+    OUTPUT_EMIT_INTERVAL = args.emit_interval
 
-    if args.run_main:
-        from main import main_loop
-        sys.argv = [sys.argv[0]] + unknown
-        main_loop()
-    else:
-        if getattr(sys, 'frozen', False):
-            threading.Timer(1.5, open_browser).start()
-        # Use socketio.run instead of app.run
-        socketio.run(app, host='0.0.0.0', port=9527, debug=False, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    threading.Thread(target=prepare_console_log, daemon=True).start()
+    threading.Thread(target=refresh_standby, daemon=True).start()
+    if getattr(sys, 'frozen', False):
+        threading.Timer(1.5, open_browser).start()
+    # Use socketio.run instead of app.run
+    socketio.run(app, host='0.0.0.0', port=9527, debug=False, allow_unsafe_werkzeug=True)
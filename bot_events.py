@@ -0,0 +1,198 @@
+# bot_events.py
+
+import json
+import os
+import queue
+import secrets
+import socket
+import struct
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+# Set by api.py for the bot subprocess: "host:port:token" of its EventServer
+ENV_ADDRESS = "RAISING_BOT_EVENTS"
+
+# Event types; human log lines stay on stdout
+PRICE = "price"    # Live SPX price and seconds to the close
+STATUS = "status"  # Fields of the bot's state, merged into what is already known
+ORDER = "order"    # An orderStatus of one order
+LOG = "log"        # A TWS message (error callback) with its code
+BARS = "bars"      # The session's one-minute SPX bars and VWAP so far
+HELLO = "hello"    # First frame on a connection, carrying the token
+
+HEADER = struct.Struct(">I")
+MAX_FRAME = 1 << 20
+
+def encode_event(kind: str, data: dict) -> bytes:
+    """A frame: 4-byte big-endian payload length, then the event as UTF-8 JSON."""
+    payload = json.dumps({"type": kind, **data}, separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(len(payload)) + payload
+
+def read_event(stream) -> Optional[dict]:
+    """Reads one frame from a binary stream; None at a clean end of stream."""
+    header = stream.read(HEADER.size)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        raise ValueError("Truncated frame header")
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME:
+        raise ValueError(f"Frame of {size} bytes exceeds {MAX_FRAME}")
+    payload = stream.read(size)
+    if len(payload) < size:
+        raise ValueError("Truncated frame")
+    return json.loads(payload.decode("utf-8"))
+
+class EventChannel:
+    """
+    The bot's end of the event channel. send() only queues the encoded frame, so callers
+    on the TWS reader thread never wait on the socket; a writer thread sends the frames.
+    Without a connection (the bot run from a terminal, or api.py gone) send() returns
+    False and callers print instead.
+    """
+
+    def __init__(self):
+        self._sock: Optional[socket.socket] = None
+        self._queue: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def connect(self, address: Optional[str] = None, timeout: float = 5.0) -> bool:
+        """Connects to "host:port:token" (default: the ENV_ADDRESS variable)."""
+        address = address or os.environ.get(ENV_ADDRESS)
+        if not address or self.connected:
+            return self.connected
+        try:
+            host, port, token = address.rsplit(":", 2)
+            sock = socket.create_connection((host, int(port)), timeout=timeout)
+            sock.settimeout(None)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.sendall(encode_event(HELLO, {"token": token, "pid": os.getpid()}))
+        except (OSError, ValueError) as e:
+            print(f"Event channel unavailable, status goes to the console: {e}", flush=True)
+            return False
+        self._sock = sock
+        self._thread = threading.Thread(target=self._run, name="bot-events", daemon=True)
+        self._thread.start()
+        return True
+
+    def send(self, kind: str, **data) -> bool:
+        if self._sock is None:
+            return False
+        self._queue.put(encode_event(kind, data))
+        return True
+
+    def close(self):
+        if self._sock is not None:
+            self._queue.put(None)
+            if self._thread is not None:
+                self._thread.join(timeout=2)
+
+    def _run(self):
+        sock = self._sock
+        try:
+            while True:
+                frame = self._queue.get()
+                if frame is None:
+                    break
+                sock.sendall(frame)
+        except OSError:
+            pass
+        finally:
+            self._sock = None
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+# The bot process has a single channel, connected once by main_loop
+events = EventChannel()
+
+class EventServer:
+    """
+    api.py's end: listens on an ephemeral loopback port and passes each event of a
+    connection that opened with the right token to `on_event` (on the reading thread).
+    """
+
+    def __init__(self, on_event: Callable[[dict], None], host: str = "127.0.0.1"):
+        self.on_event = on_event
+        self.host = host
+        self.token = secrets.token_hex(16)
+        self._listener: Optional[socket.socket] = None
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self._listener.getsockname()[1]}:{self.token}"
+
+    def start(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind((self.host, 0))
+        listener.listen(4)
+        self._listener = listener
+        threading.Thread(target=self._accept, name="bot-events-accept", daemon=True).start()
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.close()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._read, args=(conn,), name="bot-events-read", daemon=True).start()
+
+    def _read(self, conn: socket.socket):
+        try:
+            with conn, conn.makefile("rb") as stream:
+                hello = read_event(stream)
+                if not hello or hello.get("type") != HELLO or not secrets.compare_digest(str(hello.get("token")), self.token):
+                    return
+                while True:
+                    event = read_event(stream)
+                    if event is None:
+                        return
+                    self.on_event(event)
+        except (OSError, ValueError):
+            pass
+
+class BotState:
+    """The latest price, merged status, per-order status, session bars and recent TWS messages, from events."""
+
+    def __init__(self, log_size: int = 50):
+        self._lock = threading.Lock()
+        self._log_size = log_size
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.price: Optional[dict] = None
+            self.status: dict = {}
+            self.orders: dict = {}
+            self.bars: Optional[dict] = None
+            self.log = deque(maxlen=self._log_size)
+
+    def apply(self, event: dict):
+        fields = {k: v for k, v in event.items() if k != "type"}
+        kind = event.get("type")
+        with self._lock:
+            if kind == PRICE:
+                self.price = fields
+            elif kind == STATUS:
+                self.status.update(fields)
+            elif kind == ORDER:
+                self.orders[str(fields.get("order_id"))] = fields
+            elif kind == LOG:
+                self.log.append(fields)
+            elif kind == BARS:
+                self.bars = fields
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"price": self.price, "status": dict(self.status), "orders": dict(self.orders), "bars": self.bars,
+                    "log": list(self.log)}
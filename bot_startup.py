@@ -0,0 +1,101 @@
+# bot_startup.py
+
+import builtins
+import sys
+import time
+from typing import List, Optional, Tuple
+
+class StartupProfiler:
+    """
+    Times every first import of a module (total and self time, like python -X importtime,
+    but also inside a PyInstaller build) and named startup milestones, from `start`.
+    """
+
+    def __init__(self, start: Optional[float] = None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks: List[Tuple[str, float]] = []
+        self.imports: List[Tuple[str, float, float, int]] = []  # (module, total s, self s, depth)
+        self._children: List[float] = []
+        self._original_import = None
+
+    def install(self):
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is not None and builtins.__import__ == self._import:
+            builtins.__import__ = self._original_import
+        self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        if level or name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+        depth = len(self._children)
+        self._children.append(0.0)
+        started = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            total = time.perf_counter() - started
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += total
+            self.imports.append((name, total, total - children, depth))
+
+    def mark(self, name: str):
+        self.marks.append((name, time.perf_counter() - self.start))
+
+    def report(self, top: int = 15) -> List[str]:
+        lines = ["--- Startup profile ---"]
+        for name, at in self.marks:
+            lines.append(f"{at * 1000:9.1f} ms  {name}")
+        imported = sum(total for _, total, _, depth in self.imports if depth == 0)
+        lines.append(f"Imports: {len(self.imports)} module(s), {imported * 1000:.1f} ms. Slowest (total / self):")
+        for name, total, own, depth in sorted(self.imports, key=lambda r: r[1], reverse=True)[:top]:
+            lines.append(f"{total * 1000:9.1f} ms {own * 1000:8.1f} ms  {'  ' * depth}{name}")
+        return lines
+
+# Set by --profile-startup; main_loop reports milestones through mark() and finish()
+profiler: Optional[StartupProfiler] = None
+
+def enable(start: Optional[float] = None) -> StartupProfiler:
+    global profiler
+    profiler = StartupProfiler(start)
+    profiler.install()
+    return profiler
+
+def mark(name: str):
+    if profiler is not None:
+        profiler.mark(name)
+
+def finish(name: str):
+    """Records the last milestone, prints the report once and stops timing imports."""
+    global profiler
+    current, profiler = profiler, None
+    if current is None:
+        return
+    current.mark(name)
+    current.uninstall()
+    for line in current.report():
+        print(line, flush=True)
+
+def run(argv: List[str], start: Optional[float] = None):
+    """
+    Entry point of the bot subprocess (api.py --run-main), taken before api.py imports
+    the web server. With --profile-startup the import of main is timed as well.
+    --standby (or --standby-connect, which also opens the TWS connection) makes it a
+    warm standby that starts the bot when api.py writes a line to its stdin.
+    """
+    if "--profile-startup" in argv:
+        enable(start)
+    mark("entry")
+    import main
+    mark("bot modules imported")
+    flags = ("--run-main", "--standby", "--standby-connect")
+    sys.argv = [argv[0]] + [arg for arg in argv[1:] if arg not in flags]
+    if "--standby" in argv or "--standby-connect" in argv:
+        main.run_standby(connect="--standby-connect" in argv)
+    else:
+        main.main_loop()
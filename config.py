@@ -2,8 +2,13 @@
 
 import json
 import os
+import re
+import threading
+import time
+from dataclasses import dataclass, fields
 from pathlib import Path
 import sys
+from typing import Optional
 
 # --- START: New code to find the correct config path ---
 def get_user_data_dir():
@@ -35,31 +40,146 @@ CONFIG_DEFAULTS = {
     "DEFAULT_STOP_PRICE": None,
     "SNAPMID_OFFSET": 0.1,
     "WAIT_AFTER_OPEN_SECONDS": 3,  # Default wait time after market open
+    "PRICE_STATUS_HZ": 2,  # Live SPX status lines per second (every tick is still recorded)
     "LMT_PRICE_FOR_SPREAD_30": 19,
     "LMT_PRICE_FOR_SPREAD_35": 23
 }
 
-config_data = CONFIG_DEFAULTS.copy()
-if os.path.exists(CONFIG_FILE):
-    with open(CONFIG_FILE, 'r') as f:
+def _optional_float(value) -> Optional[float]:
+    return float(value) if value not in (None, "", "None") else None
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """One validated reading of config.json over CONFIG_DEFAULTS, with the types the bot uses."""
+    IBKR_ACCOUNT: str
+    IBKR_PORT: int
+    TELEGRAM_API_ID: str
+    TELEGRAM_API_HASH: str
+    TELEGRAM_CHANNEL: str
+    MULTI_SIGNAL_REGEX: str
+    IBKR_HOST: str
+    IBKR_CLIENT_ID: int
+    UNDERLYING_SYMBOL: str
+    DEFAULT_ORDER_TYPE: str
+    SNAPMID_OFFSET: float
+    DEFAULT_LIMIT_PRICE: Optional[float]
+    DEFAULT_STOP_PRICE: Optional[float]
+    WAIT_AFTER_OPEN_SECONDS: int
+    PRICE_STATUS_HZ: float
+    LMT_PRICE_FOR_SPREAD_30: Optional[float]
+    LMT_PRICE_FOR_SPREAD_35: Optional[float]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ConfigSnapshot":
+        """Raises ValueError or TypeError for a value that does not convert."""
+        values = {**CONFIG_DEFAULTS, **data}
+        status_hz = _optional_float(values.get("PRICE_STATUS_HZ"))
+        return cls(
+            IBKR_ACCOUNT=values.get("IBKR_ACCOUNT"),
+            IBKR_PORT=int(values.get("IBKR_PORT")),
+            TELEGRAM_API_ID=values.get("TELEGRAM_API_ID"),
+            TELEGRAM_API_HASH=values.get("TELEGRAM_API_HASH"),
+            TELEGRAM_CHANNEL=values.get("TELEGRAM_CHANNEL"),
+            MULTI_SIGNAL_REGEX=values.get("MULTI_SIGNAL_REGEX"),
+            IBKR_HOST=values.get("IBKR_HOST"),
+            IBKR_CLIENT_ID=int(values.get("IBKR_CLIENT_ID")),
+            UNDERLYING_SYMBOL=values.get("UNDERLYING_SYMBOL"),
+            DEFAULT_ORDER_TYPE=values.get("DEFAULT_ORDER_TYPE"),
+            SNAPMID_OFFSET=float(values.get("SNAPMID_OFFSET")),
+            DEFAULT_LIMIT_PRICE=_optional_float(values.get("DEFAULT_LIMIT_PRICE")),
+            DEFAULT_STOP_PRICE=_optional_float(values.get("DEFAULT_STOP_PRICE")),
+            WAIT_AFTER_OPEN_SECONDS=int(values.get("WAIT_AFTER_OPEN_SECONDS", 3)),
+            PRICE_STATUS_HZ=status_hz if status_hz is not None else 2.0,
+            LMT_PRICE_FOR_SPREAD_30=_optional_float(values.get("LMT_PRICE_FOR_SPREAD_30")),
+            LMT_PRICE_FOR_SPREAD_35=_optional_float(values.get("LMT_PRICE_FOR_SPREAD_35")),
+        )
+
+class LiveConfig:
+    """
+    The current ConfigSnapshot of config.json. reload() reads the file only when its inode
+    (api.py replaces the file on save), mtime or size changed, and swaps in the new snapshot with a single assignment once it has
+    validated, so readers take `snapshot` without locks or file I/O. A file that does not
+    parse or validate is reported and the previous snapshot is kept.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._key = self._stat()
+        data = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                try:
+                    data = json.load(f)
+                except Exception:
+                    pass  # A corrupt file at startup means the defaults, as before
+        self.snapshot = ConfigSnapshot.from_dict(data)
+
+    def _stat(self):
         try:
-            config_data.update(json.load(f))
-        except Exception:
-            pass
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def reload(self) -> bool:
+        """Swaps in the file's settings if it changed; True if a new snapshot was taken."""
+        with self._lock:
+            key = self._stat()
+            if key == self._key:
+                return False
+            self._key = key  # An invalid file is reported once, not on every check
+            try:
+                with open(self.path, 'r') as f:
+                    snapshot = ConfigSnapshot.from_dict(json.load(f))
+                re.compile(snapshot.MULTI_SIGNAL_REGEX)
+            except (OSError, ValueError, TypeError, re.error) as e:
+                print(f"Config change ignored, keeping the current settings: {e}", flush=True)
+                return False
+            old, self.snapshot = self.snapshot, snapshot
+        changed = [f.name for f in fields(snapshot) if getattr(old, f.name) != getattr(snapshot, f.name)]
+        if changed:
+            print(f"Config reloaded: {', '.join(changed)} changed.", flush=True)
+        return True
+
+    def watch(self, interval: float = 1.0):
+        """Checks the file every `interval` seconds from a daemon thread (started once)."""
+        if self._thread is not None:
+            return
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"Config reload failed: {e}", flush=True)
+        self._thread = threading.Thread(target=run, name="config-watch", daemon=True)
+        self._thread.start()
+
+live_config = LiveConfig(CONFIG_FILE)
+
+def current_config() -> ConfigSnapshot:
+    """The latest validated settings; order building and signal parsing read these."""
+    return live_config.snapshot
 
-IBKR_ACCOUNT = config_data.get("IBKR_ACCOUNT")
-IBKR_PORT = int(config_data.get("IBKR_PORT"))
-TELEGRAM_API_ID = config_data.get("TELEGRAM_API_ID")
-TELEGRAM_API_HASH = config_data.get("TELEGRAM_API_HASH")
-TELEGRAM_CHANNEL = config_data.get("TELEGRAM_CHANNEL")
-MULTI_SIGNAL_REGEX = config_data.get("MULTI_SIGNAL_REGEX")
-IBKR_HOST = config_data.get("IBKR_HOST")
-IBKR_CLIENT_ID = int(config_data.get("IBKR_CLIENT_ID"))
-UNDERLYING_SYMBOL = config_data.get("UNDERLYING_SYMBOL")
-DEFAULT_ORDER_TYPE = config_data.get("DEFAULT_ORDER_TYPE")
-SNAPMID_OFFSET = float(config_data.get("SNAPMID_OFFSET"))
-DEFAULT_LIMIT_PRICE = float(config_data.get("DEFAULT_LIMIT_PRICE")) if config_data.get("DEFAULT_LIMIT_PRICE") not in (None, "", "None") else None
-DEFAULT_STOP_PRICE = float(config_data.get("DEFAULT_STOP_PRICE")) if config_data.get("DEFAULT_STOP_PRICE") not in (None, "", "None") else None
-WAIT_AFTER_OPEN_SECONDS = int(config_data.get("WAIT_AFTER_OPEN_SECONDS", 3))
-LMT_PRICE_FOR_SPREAD_30 = float(config_data.get("LMT_PRICE_FOR_SPREAD_30")) if config_data.get("LMT_PRICE_FOR_SPREAD_30") not in (None, "", "None") else None
-LMT_PRICE_FOR_SPREAD_35 = float(config_data.get("LMT_PRICE_FOR_SPREAD_35")) if config_data.get("LMT_PRICE_FOR_SPREAD_35") not in (None, "", "None") else None
+# Settings as of startup. Connection and Telegram settings are only read here, since the
+# IBKR and Telegram sessions are opened with them; the rest is read through current_config()
+_startup = live_config.snapshot
+IBKR_ACCOUNT = _startup.IBKR_ACCOUNT
+IBKR_PORT = _startup.IBKR_PORT
+TELEGRAM_API_ID = _startup.TELEGRAM_API_ID
+TELEGRAM_API_HASH = _startup.TELEGRAM_API_HASH
+TELEGRAM_CHANNEL = _startup.TELEGRAM_CHANNEL
+MULTI_SIGNAL_REGEX = _startup.MULTI_SIGNAL_REGEX
+IBKR_HOST = _startup.IBKR_HOST
+IBKR_CLIENT_ID = _startup.IBKR_CLIENT_ID
+UNDERLYING_SYMBOL = _startup.UNDERLYING_SYMBOL
+DEFAULT_ORDER_TYPE = _startup.DEFAULT_ORDER_TYPE
+SNAPMID_OFFSET = _startup.SNAPMID_OFFSET
+DEFAULT_LIMIT_PRICE = _startup.DEFAULT_LIMIT_PRICE
+DEFAULT_STOP_PRICE = _startup.DEFAULT_STOP_PRICE
+WAIT_AFTER_OPEN_SECONDS = _startup.WAIT_AFTER_OPEN_SECONDS
+PRICE_STATUS_HZ = _startup.PRICE_STATUS_HZ
+LMT_PRICE_FOR_SPREAD_30 = _startup.LMT_PRICE_FOR_SPREAD_30
+LMT_PRICE_FOR_SPREAD_35 = _startup.LMT_PRICE_FOR_SPREAD_35
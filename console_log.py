@@ -0,0 +1,295 @@
+# console_log.py
+
+import gzip
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# "[TS:2025-12-31 09:30:00] ..." -> day, hour
+TS_DAY_HOUR = re.compile(r'^\[TS:(\d{4}-\d{2}-\d{2}) (\d{2})')
+DAY_FILE = re.compile(r'^(\d{4}-\d{2}-\d{2})\.log(\.gz)?$')
+
+def _time_key(value: Optional[str], upper: bool = False) -> Optional[str]:
+    """
+    Normalises 'HH', 'HH:MM' or 'HH:MM:SS' to 'HH:MM:SS' for string comparison.
+    With upper=True the missing parts are filled in as the end of that hour or minute.
+    """
+    if not value:
+        return None
+    fill = "59" if upper else "00"
+    parts = (value.split(":") + [fill, fill])[:3]
+    return ":".join(p.zfill(2) for p in parts)
+
+def _line_time(line: str) -> Optional[str]:
+    # "[TS:YYYY-MM-DD HH:MM:SS]" -> "HH:MM:SS"
+    return line[15:23] if line.startswith("[TS:") and len(line) >= 23 else None
+
+class ConsoleLog:
+    """
+    The bot console log, one file per day (YYYY-MM-DD.log) with a small index
+    (YYYY-MM-DD.idx) holding the byte offset where each hour starts.
+
+    Days before today are rotated into YYYY-MM-DD.log.gz, compressed one gzip member
+    per hour; the index then also records where each member lies. Offsets always refer
+    to the uncompressed text, so a history cursor stays valid across rotation, and a
+    query only reads the hours (members) that overlap its time range.
+
+    write/flush/close make it a drop-in writer for LogPipeline.
+    """
+
+    def __init__(self, directory: str, max_lines: int = 1000):
+        self.directory = directory
+        self.max_lines = max_lines
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._lines: List[str] = []
+        self._day: Optional[str] = None  # Day and hour of the last line written, for lines without a timestamp
+        self._hour: Optional[str] = None
+        self._file = None
+        self._file_day: Optional[str] = None
+        self._index: Dict[str, int] = {}
+
+    # --- Writing ---
+
+    def write(self, line: str):
+        with self._lock:
+            self._lines.append(line)
+            if len(self._lines) < self.max_lines:
+                return
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._lines:
+                return
+            lines, self._lines = self._lines, []
+            new_day = False
+            for line in lines:
+                m = TS_DAY_HOUR.match(line)
+                if m:
+                    self._day, self._hour = m.group(1), m.group(2)
+                elif self._day is None:
+                    now = datetime.now()
+                    self._day, self._hour = now.strftime("%Y-%m-%d"), now.strftime("%H")
+                if self._day != self._file_day:
+                    new_day = self._file_day is not None
+                    self._open_day(self._day)
+                if self._hour not in self._index:
+                    self._index[self._hour] = self._file.tell()
+                    self._save_index(self._day, {"hours": self._index})
+                self._file.write((line + "\n").encode("utf-8"))
+            self._file.flush()
+        if new_day:
+            self.rotate()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._close_file()
+
+    def _open_day(self, day: str):
+        self._close_file()
+        path = self._path(day, ".log")
+        if not os.path.exists(path) and os.path.exists(self._path(day, ".log.gz")):
+            self._restore_day(day)  # A late line for a day that was already rotated
+        self._file = open(path, "ab")
+        self._file_day = day
+        index = self._load_index(day) if self._file.tell() else None
+        self._index = dict(index["hours"]) if index and not index.get("members") else {}
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+        self._file = None
+        self._file_day = None
+
+    # --- Rotation ---
+
+    def rotate(self, today: Optional[str] = None):
+        """Compresses every uncompressed day before `today` (default: the day being written)."""
+        today = today or self._file_day or datetime.now().strftime("%Y-%m-%d")
+        for day, compressed in self.days(with_state=True):
+            if day < today and not compressed:
+                with self._lock:
+                    if day == self._file_day:
+                        self._close_file()
+                    try:
+                        self._compress_day(day)
+                    except Exception as e:
+                        print(f"Failed to compress console log for {day}: {e}", flush=True)
+
+    def _compress_day(self, day: str):
+        plain = self._path(day, ".log")
+        size = os.path.getsize(plain)
+        index = self._load_index(day)
+        hours = sorted((index or {}).get("hours", {}).items(), key=lambda kv: kv[1])
+        if not hours or hours[0][1] != 0:
+            hours = self._scan_hours(plain)
+        bounds = [offset for _, offset in hours] + [size]
+        members = {}
+        tmp = self._path(day, ".log.gz.tmp")
+        with open(plain, "rb") as src, open(tmp, "wb") as dst:
+            for (hour, start), end in zip(hours, bounds[1:]):
+                src.seek(start)
+                member = gzip.compress(src.read(end - start))
+                members[hour] = [dst.tell(), len(member)]
+                dst.write(member)
+        os.replace(tmp, self._path(day, ".log.gz"))
+        self._save_index(day, {"hours": dict(hours), "members": members})
+        os.remove(plain)
+
+    def _restore_day(self, day: str):
+        """Turns a rotated day back into a plain file so it can be appended to."""
+        index = self._load_index(day) or {}
+        tmp = self._path(day, ".log.tmp")
+        with gzip.open(self._path(day, ".log.gz"), "rb") as src, open(tmp, "wb") as dst:
+            while True:
+                chunk = src.read(1 << 20)
+                if not chunk:
+                    break
+                dst.write(chunk)
+        os.replace(tmp, self._path(day, ".log"))
+        self._save_index(day, {"hours": index.get("hours", {})})
+        os.remove(self._path(day, ".log.gz"))
+
+    def _scan_hours(self, path: str) -> List[Tuple[str, int]]:
+        """Rebuilds the hour offsets of a day file that has no (or a damaged) index."""
+        hours, offset = {}, 0
+        with open(path, "rb") as f:
+            for raw in f:
+                m = TS_DAY_HOUR.match(raw.decode("utf-8", errors="replace"))
+                hour = m.group(2) if m else (max(hours) if hours else "00")
+                hours.setdefault(hour, offset)
+                offset += len(raw)
+        if not hours or min(hours.values()) != 0:
+            hours[min(hours) if hours else "00"] = 0
+        return sorted(hours.items(), key=lambda kv: kv[1])
+
+    def migrate(self, legacy_path: str):
+        """Splits a single-file bot_console.log into per-day files, then renames it *.migrated."""
+        if not os.path.exists(legacy_path):
+            return
+        with open(legacy_path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                self.write(line.rstrip("\n"))
+        self.flush()
+        os.replace(legacy_path, legacy_path + ".migrated")
+        self.rotate(datetime.now().strftime("%Y-%m-%d"))
+
+    # --- Reading ---
+
+    def days(self, with_state: bool = False):
+        """Days with a log, oldest first (as (day, compressed) pairs if with_state)."""
+        if not with_state:
+            self.flush()
+        found = {}
+        for name in os.listdir(self.directory):
+            m = DAY_FILE.match(name)
+            if m:
+                # A plain file next to a .gz is an interrupted rotation; the plain one is authoritative
+                found[m.group(1)] = found.get(m.group(1), True) and bool(m.group(2))
+        days = sorted(found.items())
+        return days if with_state else [day for day, _ in days]
+
+    def history(self, day: str, start: Optional[str] = None, end: Optional[str] = None, text: Optional[str] = None,
+                cursor: Optional[int] = None, limit: int = 500) -> Tuple[List[str], Optional[int]]:
+        """
+        Returns up to `limit` lines of `day` between `start` and `end` ('HH:MM[:SS]', inclusive)
+        that contain `text` (case-insensitive), and the cursor of the next page (None if done).
+        """
+        self.flush()  # Include lines still waiting for the next write
+        start_key, end_key = _time_key(start), _time_key(end, upper=True)
+        index = self._load_index(day)
+        plain = os.path.exists(self._path(day, ".log"))
+        if not plain and not (index and index.get("members")):
+            return [], None
+
+        hours = sorted((index or {}).get("hours", {}).items(), key=lambda kv: kv[1])
+        begin, stop = 0, None
+        if hours and start_key:
+            later = [offset for hour, offset in hours if hour >= start_key[:2]]
+            if not later:
+                return [], None
+            begin = later[0]
+        if hours and end_key:
+            after = [offset for hour, offset in hours if hour > end_key[:2]]
+            stop = after[0] if after else None
+        if cursor is not None:
+            begin = max(begin, int(cursor))
+
+        needle = text.lower() if text else None
+        lines: List[str] = []
+        current_time = None
+        for offset, line in self._iter_lines(day, index, plain, begin, stop):
+            line_time = _line_time(line)
+            if line_time:
+                current_time = line_time
+            if end_key and current_time and current_time > end_key:
+                break
+            if start_key and (current_time is None or current_time < start_key):
+                continue
+            if needle and needle not in line.lower():
+                continue
+            if len(lines) >= limit:
+                return lines, offset
+            lines.append(line)
+        return lines, None
+
+    def _iter_lines(self, day: str, index, plain: bool, begin: int, stop: Optional[int]) -> Iterator[Tuple[int, str]]:
+        """Yields (offset, line) from uncompressed offset `begin` up to `stop`."""
+        if plain:
+            with open(self._path(day, ".log"), "rb") as f:
+                f.seek(begin)
+                offset = begin
+                for raw in f:
+                    if stop is not None and offset >= stop:
+                        return
+                    yield offset, raw.decode("utf-8", errors="replace").rstrip("\n")
+                    offset += len(raw)
+            return
+
+        members = index["members"]
+        starts = sorted((offset, hour) for hour, offset in index["hours"].items())
+        with open(self._path(day, ".log.gz"), "rb") as f:
+            for i, (member_start, hour) in enumerate(starts):
+                member_end = starts[i + 1][0] if i + 1 < len(starts) else None
+                if member_end is not None and member_end <= begin:
+                    continue
+                if stop is not None and member_start >= stop:
+                    return
+                gz_offset, gz_length = members[hour]
+                f.seek(gz_offset)
+                data = gzip.decompress(f.read(gz_length))
+                pos = max(0, begin - member_start)
+                while pos < len(data):
+                    offset = member_start + pos
+                    if stop is not None and offset >= stop:
+                        return
+                    nl = data.find(b"\n", pos)
+                    nl = len(data) if nl == -1 else nl + 1
+                    yield offset, data[pos:nl].decode("utf-8", errors="replace").rstrip("\n")
+                    pos = nl
+
+    # --- Files ---
+
+    def _path(self, day: str, suffix: str) -> str:
+        return os.path.join(self.directory, day + suffix)
+
+    def _load_index(self, day: str) -> Optional[dict]:
+        try:
+            with open(self._path(day, ".idx"), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_index(self, day: str, index: dict):
+        tmp = self._path(day, ".idx.tmp")
+        with open(tmp, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, self._path(day, ".idx"))
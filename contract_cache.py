@@ -0,0 +1,129 @@
+# contract_cache.py
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Optional, Tuple
+
+import pytz
+
+CACHE_VERSION = 1
+
+CacheKey = Tuple[str, str, str, float, str]
+
+def make_key(symbol, trading_class, expiry, strike, right) -> CacheKey:
+    """Normalizes the (symbol, tradingClass, expiry, strike, right) key of an option contract."""
+    return (
+        str(symbol).upper(),
+        str(trading_class or "").upper(),
+        str(expiry)[:8],  # Details may report "YYYYMMDD HH:MM TZ"
+        float(strike),
+        str(right)[:1].upper(),  # "CALL" -> "C"
+    )
+
+def key_for_contract(contract) -> Optional[CacheKey]:
+    """Returns the cache key for an option contract, or None if it is not fully specified."""
+    expiry = getattr(contract, "lastTradeDateOrContractMonth", "")
+    strike = getattr(contract, "strike", 0.0)
+    right = getattr(contract, "right", "")
+    if not expiry or not strike or not right:
+        return None
+    return make_key(getattr(contract, "symbol", ""), getattr(contract, "tradingClass", ""), expiry, strike, right)
+
+def today_eastern() -> str:
+    return datetime.now(pytz.timezone('US/Eastern')).strftime("%Y%m%d")
+
+class ContractCache:
+    """
+    Persistent two-way map between option contracts and their conIds.
+    A listed option keeps its conId until it expires, so entries are only evicted
+    once their expiry date is in the past.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._by_key = {}
+        self._by_conid = {}
+        self._dirty = False
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def get_conid(self, key: CacheKey) -> Optional[int]:
+        return self._by_key.get(key)
+
+    def get_key(self, conid: int) -> Optional[CacheKey]:
+        return self._by_conid.get(conid)
+
+    def lookup(self, contract) -> Optional[int]:
+        """Returns the cached conId for a contract given either by conId or by its option fields."""
+        conid = getattr(contract, "conId", 0)
+        if conid:
+            return conid if conid in self._by_conid else None
+        key = key_for_contract(contract)
+        return self._by_key.get(key) if key else None
+
+    def put(self, key: CacheKey, conid: int):
+        with self._lock:
+            if self._by_key.get(key) == conid:
+                return
+            self._by_key[key] = conid
+            self._by_conid[conid] = key
+            self._dirty = True
+
+    def put_contract(self, contract):
+        """Stores a contract returned by contractDetails. Non-option contracts are ignored."""
+        if getattr(contract, "secType", "") not in ("OPT", "FOP"):
+            return
+        key = key_for_contract(contract)
+        if key and contract.conId:
+            self.put(key, contract.conId)
+
+    def evict_expired(self, today: Optional[str] = None) -> int:
+        """Drops every entry whose expiry is before `today` (YYYYMMDD, US/Eastern). Returns the count."""
+        today = today or today_eastern()
+        with self._lock:
+            expired = [key for key in self._by_key if key[2] < today]
+            for key in expired:
+                conid = self._by_key.pop(key)
+                self._by_conid.pop(conid, None)
+            if expired:
+                self._dirty = True
+        return len(expired)
+
+    def load(self):
+        """Loads the cache file if present and evicts expired entries. A corrupt file is ignored."""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return
+            with self._lock:
+                for symbol, trading_class, expiry, strike, right, conid in data.get("entries", []):
+                    key = make_key(symbol, trading_class, expiry, strike, right)
+                    self._by_key[key] = int(conid)
+                    self._by_conid[int(conid)] = key
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Ignoring unreadable contract cache {self.path}: {e}", flush=True)
+            return
+        self.evict_expired()
+
+    def save(self):
+        """Writes the cache atomically if anything changed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = [[*key, conid] for key, conid in self._by_key.items()]
+            self._dirty = False
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump({"version": CACHE_VERSION, "entries": entries}, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            self._dirty = True
+            print(f"Failed to save contract cache: {e}", flush=True)
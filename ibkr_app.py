@@ -1,12 +1,19 @@
 # ibkr_app.py
 
 import threading
+import time
 from datetime import datetime
 from ibapi.client import EClient
 from ibapi.wrapper import EWrapper
 from ibapi.contract import Contract
 from ibapi.order_condition import PriceCondition
 
+from order_index import DuplicateIndex
+from tick_stats import StatusThrottle
+from tick_store import TickStore
+from order_latency import OrderLatencyTracker
+from bot_events import LOG, ORDER, PRICE, events
+
 class IBKRApp(EWrapper, EClient):
     # Define constants for request IDs
     REQID_HISTORICAL_OPEN = 99
@@ -18,32 +25,62 @@ class IBKRApp(EWrapper, EClient):
         self.nextOrderId = None
         self.underlying_open_price = None
         self.current_spx_price = None
+        # Every SPX price tick of the session, for intraday bars and VWAP; the status line
+        # is printed at most PRICE_STATUS_HZ times a second
+        self.spx_store = TickStore()
+        self.status_throttle = StatusThrottle()
+        # Optional PriceTriggerEngine of pending retries, fed every SPX last price
+        self.price_triggers = None
+        # Optional OpenPriceResolver, fed the SPX stream and its daily bar requests around the bell
+        self.open_price_resolver = None
+        # Optional AsyncIBKR, handed the callbacks of the requests it sent
+        self.async_layer = None
+        # Last reqCurrentTime answer (whole server seconds) and the local time.time() it arrived
+        self.server_time = None
+        self.server_time_received = None
+        self.current_time_event = threading.Event()
         
         # --- NEW: Thread-safe request ID generation and result storage ---
         self.nextReqId = 1
         self.req_id_lock = threading.Lock()
         self.contract_details_results = {}
         self.contract_details_events = {}
+        self.contract_details_lists = {}  # reqId -> every ContractDetails of a wildcard request
+        self.sec_def_results = {}
+        self.sec_def_events = {}
         
         # --- Threading events for synchronization ---
         self.connected_event = threading.Event()
         self.open_orders_event = threading.Event()
         self.historical_data_event = threading.Event()
-        self.order_status_event = threading.Event()
         
         self.open_orders = []
         self.error_order_ids = []
+        # Live duplicate counts of open combo orders, kept current by openOrder/orderStatus
+        self.duplicate_index = DuplicateIndex()
+        self.order_states = {}  # orderId -> last orderStatus status
+        self.pending_cancels = {}  # orderId -> time.monotonic() when cancelOrder was sent
+        self.cancel_latencies = {}  # orderId -> seconds from cancelOrder to error 202
+        # Send -> openOrder/orderStatus timestamps per order, and latency histograms per stage
+        self.order_latency = OrderLatencyTracker()
         # --- Add these fields for countdown ---
         self.market_close_time = None
         self.tz = None
         self.conid_to_strike = {}
         self.conid_to_expiry = {}
+        # Optional persistent ContractCache, consulted before any contract details request
+        self.contract_cache = None
+        # Optional OptionChain of listed strikes, used to snap signal strikes
+        self.option_chain = None
 
     def get_new_reqid(self):
         """Generates a new, unique, thread-safe request ID."""
         with self.req_id_lock:
             reqid = self.nextReqId
             self.nextReqId += 1
+            # The fixed reqIds stay free: the SPX stream outlives many generated ones
+            while self.nextReqId in (self.REQID_HISTORICAL_OPEN, self.REQID_SPX_STREAM):
+                self.nextReqId += 1
             return reqid
 
     def nextValidId(self, orderId: int):
@@ -54,35 +91,94 @@ class IBKRApp(EWrapper, EClient):
     def error(self, reqId, errorCode, errorString):
         # Informational codes
         info_codes = [2104, 2106, 2158, 162, 2107, 2108, 2110, 2111, 2112, 2113, 2114]
+        layer = self.async_layer
+        if layer is not None:
+            layer.on_error(reqId, errorCode, errorString)
         if errorCode in info_codes:
+            # Farm status chatter stays on the console, out of the dashboard's short TWS message log
             print(f"IBKR INFO: reqId {reqId}, Code {errorCode} - {errorString}", flush=True)
             return
+        events.send(LOG, req_id=reqId, code=errorCode, message=errorString)
         if errorCode == 202:
-            print(f"Order cancellation confirmed for reqId {reqId}.", flush=True)
+            self.order_latency.event(reqId, "Cancelled")
+            sent = self.pending_cancels.pop(reqId, None)
+            self.order_states[reqId] = "Cancelled"
+            self.duplicate_index.discard(reqId)
+            if sent is not None:
+                self.cancel_latencies[reqId] = time.monotonic() - sent
+                print(f"Order cancellation confirmed for order {reqId} in {self.cancel_latencies[reqId] * 1000:.0f} ms.", flush=True)
+            else:
+                print(f"Order cancellation confirmed for reqId {reqId}.", flush=True)
         # For contract detail errors, signal the event to unblock the waiting thread
         if reqId in self.contract_details_events:
             self.contract_details_events[reqId].set()
+        if reqId in self.sec_def_events:
+            self.sec_def_events[reqId].set()
         print(f"IBKR Log: reqId {reqId}, Code {errorCode} - {errorString}", flush=True)
 
+    def currentTime(self, time_from_server: int):
+        super().currentTime(time_from_server)
+        self.server_time_received = time.time()
+        self.server_time = time_from_server
+        self.current_time_event.set()
+
     def tickPrice(self, reqId, tickType, price, attrib):
         """Callback for streaming market data."""
         super().tickPrice(reqId, tickType, price, attrib)
+        layer = self.async_layer
+        if layer is not None and layer.owns(reqId):
+            layer.on_item(reqId, (tickType, price))
+            return
+        if reqId == self.REQID_SPX_STREAM and price > 0:
+            self.spx_store.append(price, tickType)
+            resolver = self.open_price_resolver
+            if resolver is not None:
+                resolver.on_tick(tickType, price)
         # tickType 4 is 'LAST_PRICE'
-        if reqId == 100 and tickType == 4: # Use a dedicated reqId for the SPX stream
+        if reqId == self.REQID_SPX_STREAM and tickType == 4: # Use a dedicated reqId for the SPX stream
+            now = time.monotonic()
             self.current_spx_price = price
-            if hasattr(self, "market_close_time") and hasattr(self, "tz"):
-                now = datetime.now(self.tz)
-                seconds_left = int((self.market_close_time - now).total_seconds())
-                if seconds_left > 0:
-                    hours, remainder = divmod(seconds_left, 3600)
-                    mins, secs = divmod(remainder, 60)
-                    print(f"Live SPX Price: {self.current_spx_price} | Market Close Countdown: {hours:02d}:{mins:02d}:{secs:02d}", flush=True)
-                else:
-                    print(f"Live SPX Price: {self.current_spx_price} | Market closed | Countdown: 00:00:00", flush=True)
+            triggers = self.price_triggers
+            if triggers is not None:
+                triggers.on_price(price)
+            if self.status_throttle.due(now):
+                self.print_price_status()
+
+    def tickSize(self, reqId, tickType, size):
+        super().tickSize(reqId, tickType, size)
+        # tickType 5 is 'LAST_SIZE', the size of the trade reported by the preceding LAST_PRICE
+        if reqId == self.REQID_SPX_STREAM and tickType == 5:
+            self.spx_store.set_last_size(size, 4)
+
+    def print_price_status(self):
+        """
+        Sends the live SPX price over the event channel, or without one prints the
+        status line (rewritten in place by the console).
+        """
+        seconds_left = None
+        if self.market_close_time is not None and self.tz is not None:
+            seconds_left = max(int((self.market_close_time - datetime.now(self.tz)).total_seconds()), 0)
+        if events.send(PRICE, price=self.current_spx_price, close_seconds=seconds_left):
+            return
+        if seconds_left is not None:
+            if seconds_left > 0:
+                hours, remainder = divmod(seconds_left, 3600)
+                mins, secs = divmod(remainder, 60)
+                print(f"Live SPX Price: {self.current_spx_price} | Market Close Countdown: {hours:02d}:{mins:02d}:{secs:02d}", flush=True)
             else:
-                print(f"Live SPX Price: {self.current_spx_price}", flush=True)
+                print(f"Live SPX Price: {self.current_spx_price} | Market closed | Countdown: 00:00:00", flush=True)
+        else:
+            print(f"Live SPX Price: {self.current_spx_price}", flush=True)
 
     def historicalData(self, reqId, bar):
+        layer = self.async_layer
+        if layer is not None and layer.owns(reqId):
+            layer.on_item(reqId, bar)
+            return
+        resolver = self.open_price_resolver
+        if resolver is not None and resolver.owns(reqId):
+            resolver.on_historical_bar(reqId, bar.date, bar.open)
+            return
         if reqId == self.REQID_HISTORICAL_OPEN:
             self.underlying_open_price = bar.open
             print(f"Received historical data: Open={bar.open}", flush=True)
@@ -90,15 +186,37 @@ class IBKRApp(EWrapper, EClient):
 
     def historicalDataEnd(self, reqId: int, start: str, end: str):
         super().historicalDataEnd(reqId, start, end)
+        layer = self.async_layer
+        if layer is not None and layer.owns(reqId):
+            layer.on_end(reqId)
+            return
+        resolver = self.open_price_resolver
+        if resolver is not None and resolver.owns(reqId):
+            return
         if not self.underlying_open_price:
             print("Historical data request finished but no data was received.", flush=True)
             self.historical_data_event.set() # Unblock the wait even if there's no data
 
+    def _cached_conid(self, contract: Contract):
+        """Returns the conId from the contract cache (updating the strike/expiry maps), or None."""
+        if self.contract_cache is None:
+            return None
+        conid = self.contract_cache.lookup(contract)
+        if conid is not None:
+            key = self.contract_cache.get_key(conid)
+            self.conid_to_strike[conid] = key[3]
+            self.conid_to_expiry[conid] = key[2]
+        return conid
+
     def get_contract_details(self, contract: Contract, timeout=7) -> int:
         """
         Fetches contract details for a given contract object in a thread-safe manner.
-        Returns the conId.
+        Returns the conId. Contracts already in the contract cache are answered without a request.
         """
+        cached = self._cached_conid(contract)
+        if cached is not None:
+            return cached
+
         req_id = self.get_new_reqid()
         self.contract_details_events[req_id] = threading.Event()
         self.contract_details_results[req_id] = None
@@ -118,24 +236,146 @@ class IBKRApp(EWrapper, EClient):
         
         return details.contract.conId
 
+    def resolve_conids(self, contracts, timeout=7, attempts=3) -> dict:
+        """
+        Resolves many contracts to conIds in one batch.
+        All reqContractDetails calls are sent up front and collected as they complete,
+        so each attempt waits for the slowest request rather than the sum of all of them.
+        Requests that time out or return no details are re-sent on the next attempt.
+
+        `contracts` is a dict of caller-chosen keys to Contract objects (a list is keyed by index).
+        Returns a dict of key -> conId for every contract that resolved; failed keys are omitted.
+        """
+        if not isinstance(contracts, dict):
+            contracts = dict(enumerate(contracts))
+        resolved = {}
+        pending = {}
+        for key, contract in contracts.items():
+            cached = self._cached_conid(contract)
+            if cached is not None:
+                resolved[key] = cached
+            else:
+                pending[key] = contract
+
+        for attempt in range(1, attempts + 1):
+            if not pending:
+                break
+            in_flight = {}
+            for key, contract in pending.items():
+                req_id = self.get_new_reqid()
+                self.contract_details_events[req_id] = threading.Event()
+                self.contract_details_results[req_id] = None
+                in_flight[req_id] = key
+            print(f"Requesting contract details for {len(in_flight)} contract(s) (attempt {attempt}/{attempts})...", flush=True)
+            for req_id, key in in_flight.items():
+                self.reqContractDetails(req_id, pending[key])
+
+            # One shared deadline for the whole batch
+            deadline = time.monotonic() + timeout
+            for req_id, key in in_flight.items():
+                self.contract_details_events[req_id].wait(max(0.0, deadline - time.monotonic()))
+                details = self.contract_details_results.pop(req_id, None)
+                del self.contract_details_events[req_id]
+                if details:
+                    resolved[key] = details.contract.conId
+                    del pending[key]
+
+            if pending and attempt < attempts:
+                print(f"{len(pending)} contract detail request(s) unresolved (attempt {attempt}/{attempts}). Retrying...", flush=True)
+                time.sleep(0.5 * attempt)
+
+        for key, contract in pending.items():
+            print(f"Failed to get contract details for {contract.symbol} {getattr(contract, 'strike', '')} {getattr(contract, 'right', '')} after {attempts} attempt(s).", flush=True)
+        return resolved
+
     def contractDetails(self, reqId, contractDetails):
         super().contractDetails(reqId, contractDetails)
         # If this reqId is one we are waiting for, store the result
         if reqId in self.contract_details_results:
             self.contract_details_results[reqId] = contractDetails
+        if reqId in self.contract_details_lists:
+            self.contract_details_lists[reqId].append(contractDetails)
+        layer = self.async_layer
+        if layer is not None:
+            layer.on_item(reqId, contractDetails)
         
         # Also update our general-purpose mappings
         conId = contractDetails.contract.conId
         self.conid_to_strike[conId] = contractDetails.contract.strike
         self.conid_to_expiry[conId] = contractDetails.contract.lastTradeDateOrContractMonth
+        if self.contract_cache is not None:
+            self.contract_cache.put_contract(contractDetails.contract)
 
     def contractDetailsEnd(self, reqId: int):
         super().contractDetailsEnd(reqId)
         # If this reqId is one we are waiting for, signal its event to unblock it
         if reqId in self.contract_details_events:
             self.contract_details_events[reqId].set()
+        layer = self.async_layer
+        if layer is not None:
+            layer.on_end(reqId)
+
+    def get_all_contract_details(self, contract: Contract, timeout=15) -> list:
+        """
+        Sends one contract details request and returns every match, e.g. all strikes
+        of an expiry when the strike is left unset.
+        """
+        req_id = self.get_new_reqid()
+        self.contract_details_events[req_id] = threading.Event()
+        self.contract_details_lists[req_id] = []
+
+        print(f"Requesting all matching contract details with reqId {req_id}...", flush=True)
+        self.reqContractDetails(req_id, contract)
+        event_triggered = self.contract_details_events[req_id].wait(timeout)
+
+        details = self.contract_details_lists.pop(req_id)
+        del self.contract_details_events[req_id]
+        if not event_triggered:
+            raise Exception(f"Request for all {contract.symbol} {contract.lastTradeDateOrContractMonth} details timed out.")
+        return details
+
+    def securityDefinitionOptionParameter(self, reqId, exchange, underlyingConId, tradingClass, multiplier, expirations, strikes):
+        super().securityDefinitionOptionParameter(reqId, exchange, underlyingConId, tradingClass, multiplier, expirations, strikes)
+        if reqId in self.sec_def_results:
+            # One callback per exchange; merge them per trading class
+            known_expirations, known_strikes = self.sec_def_results[reqId].setdefault(tradingClass, (set(), set()))
+            known_expirations.update(expirations)
+            known_strikes.update(float(k) for k in strikes)
+
+    def securityDefinitionOptionParameterEnd(self, reqId: int):
+        super().securityDefinitionOptionParameterEnd(reqId)
+        if reqId in self.sec_def_events:
+            self.sec_def_events[reqId].set()
+
+    def get_option_chain_params(self, symbol: str, underlying_conid: int, underlying_sec_type="IND", timeout=10) -> dict:
+        """
+        Fetches the option chain definition of an underlying with reqSecDefOptParams.
+        Returns a dict of tradingClass -> (set of expirations, set of strikes).
+        """
+        req_id = self.get_new_reqid()
+        self.sec_def_events[req_id] = threading.Event()
+        self.sec_def_results[req_id] = {}
+
+        print(f"Requesting {symbol} option chain parameters with reqId {req_id}...", flush=True)
+        self.reqSecDefOptParams(req_id, symbol, "", underlying_sec_type, underlying_conid)
+        event_triggered = self.sec_def_events[req_id].wait(timeout)
+
+        results = self.sec_def_results.pop(req_id)
+        del self.sec_def_events[req_id]
+        if not event_triggered:
+            raise Exception(f"Request for {symbol} option chain parameters timed out.")
+        return results
+
+    def placeOrder(self, orderId, contract, order):
+        self.order_latency.sent(orderId, "place")
+        super().placeOrder(orderId, contract, order)
+
+    def cancelOrder(self, orderId):
+        self.order_latency.sent(orderId, "cancel")
+        super().cancelOrder(orderId)
 
     def openOrder(self, orderId, contract, order, orderState):
+        self.order_latency.event(orderId, "openOrder")
         super().openOrder(orderId, contract, order, orderState)
         order_info = {
             "orderId": orderId,
@@ -152,36 +392,76 @@ class IBKRApp(EWrapper, EClient):
             if isinstance(cond, PriceCondition):
                 order_info["trigger_price"] = cond.price
         self.open_orders.append(order_info)
+        if order_info["leg_conIds"]:
+            self.duplicate_index.add(orderId, order_info["leg_conIds"], order_info["trigger_price"])
+        layer = self.async_layer
+        if layer is not None:
+            layer.on_open_order(order_info)
 
     def openOrderEnd(self):
         super().openOrderEnd()
         print("Finished receiving open orders.", flush=True)
         self.open_orders_event.set() # Signal that all open orders have been received
+        layer = self.async_layer
+        if layer is not None:
+            layer.on_open_order_end()
 
     def orderStatus(self, orderId, status, filled, remaining, avgFillPrice, permId, parentId, lastFillPrice, clientId, whyHeld, mktCapPrice):
+        self.order_latency.event(orderId, status)
         super().orderStatus(orderId, status, filled, remaining, avgFillPrice, permId, parentId, lastFillPrice, clientId, whyHeld, mktCapPrice)
         print(f"OrderStatus. ID: {orderId}, Status: {status}, Filled: {filled}, Remaining: {remaining}, AvgFillPrice: {avgFillPrice}", flush=True)
-        # Set the event when all orders are processed
-        if status in ("Filled", "Cancelled", "Inactive", "Rejected"):
-            self.order_status_event.set()
+        events.send(ORDER, order_id=orderId, status=status, filled=float(filled), remaining=float(remaining), avg_fill_price=avgFillPrice)
+        self.order_states[orderId] = status
+        if status == "Filled" and self.pending_cancels.pop(orderId, None) is not None:
+            print(f"Order {orderId} filled before its cancellation took effect.", flush=True)
+        if status in ("Cancelled", "ApiCancelled"):
+            self.duplicate_index.discard(orderId)
         if status == "Inactive":
             if orderId not in self.error_order_ids:
                 self.error_order_ids.append(orderId)
+                self._wake_triggers()
+
+    def _wake_triggers(self):
+        """Lets the retry loop pick up a new error order without waiting for its timeout."""
+        triggers = self.price_triggers
+        if triggers is not None:
+            triggers.wake()
+
+    def cancel_orders(self, order_ids) -> list:
+        """
+        Sends cancelOrder for each order that is not already filled, cancelled or being cancelled.
+        Confirmation arrives as error 202, which records the round-trip time in cancel_latencies.
+        Returns the order IDs a cancel was sent for.
+        """
+        sent = []
+        for order_id in order_ids:
+            if order_id in self.pending_cancels or self.order_states.get(order_id) in ("Filled", "Cancelled", "ApiCancelled"):
+                continue
+            self.pending_cancels[order_id] = time.monotonic()
+            self.cancelOrder(order_id)
+            sent.append(order_id)
+        return sent
 
     def fetch_contract_details_for_conids(self, conid_list):
         """
         Given a list of conIds, fetch contract details and update mappings.
+        Missing conIds are requested together through resolve_conids.
         """
+        contracts = {}
         for conid in set(conid_list):
             if conid in self.conid_to_strike:  # Skip if we already have it
                 continue
             contract = Contract()
             contract.conId = conid
-            try:
-                # This call will populate the conid_to_strike/expiry maps via the callback
-                self.get_contract_details(contract)
-            except Exception as e:
-                print(f"Could not fetch details for conId {conid}: {e}", flush=True)
+            if self._cached_conid(contract) is not None:
+                continue
+            contracts[conid] = contract
+        if contracts:
+            # The contractDetails callback populates the conid_to_strike/expiry maps
+            resolved = self.resolve_conids(contracts)
+            for conid in contracts:
+                if conid not in resolved:
+                    print(f"Could not fetch details for conId {conid}.", flush=True)
         
         # Return copies of the mappings
         return dict(self.conid_to_strike), dict(self.conid_to_expiry)
@@ -0,0 +1,211 @@
+# ibkr_async.py
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from ibapi.contract import Contract
+
+# TWS messages about a request that do not end it (farm status, delayed or partial market data)
+WARNING_CODES = {2104, 2106, 2107, 2108, 2119, 2158, 2176, 10090, 10167}
+
+class IBKRRequestError(Exception):
+    """A TWS error message that ended a request."""
+
+    def __init__(self, req_id: int, code: int, message: str):
+        super().__init__(f"reqId {req_id}, Code {code} - {message}")
+        self.req_id = req_id
+        self.code = code
+        self.message = message
+
+def _schedule(request: "_Request", callback, *args):
+    try:
+        request.loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:  # The loop that awaited it has closed
+        pass
+
+class _Request:
+    """One request in flight: the loop that awaits it, and its future (or queue, for a stream)."""
+    __slots__ = ("loop", "future", "queue", "items")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, stream: bool = False):
+        self.loop = loop
+        self.future = None if stream else loop.create_future()
+        self.queue = asyncio.Queue() if stream else None
+        self.items = []
+
+    # The methods below run on the request's loop, scheduled from the reader thread
+
+    def add(self, item):
+        if self.queue is not None:
+            self.queue.put_nowait(item)
+        elif not self.future.done():
+            self.items.append(item)
+
+    def finish(self):
+        if self.future is not None and not self.future.done():
+            self.future.set_result(self.items)
+
+    def fail(self, exc: Exception):
+        if self.queue is not None:
+            self.queue.put_nowait(exc)
+        elif not self.future.done():
+            self.future.set_exception(exc)
+
+class AsyncIBKR:
+    """
+    Asyncio façade over an IBKRApp. Each request gets its own reqId, mapped to a future of
+    the loop that awaits it (a queue for market data), which the EWrapper callbacks resolve
+    from the EClient reader thread through call_soon_threadsafe. Requests of any kind can
+    then be awaited together, e.g. with asyncio.gather; a request that times out or is
+    cancelled is cancelled at TWS too where the API allows it.
+
+    The IBKRApp's own blocking methods keep working alongside; only reqIds sent from here
+    are routed to this layer.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._requests: Dict[int, _Request] = {}
+        self._open_orders: Optional[_Request] = None  # Shared by concurrent open_orders() calls
+        app.async_layer = self
+
+    # --- Callbacks, called by IBKRApp on the reader thread ---
+
+    def owns(self, req_id: int) -> bool:
+        return req_id in self._requests
+
+    def on_item(self, req_id: int, item):
+        request = self._requests.get(req_id)
+        if request is not None:
+            _schedule(request, request.add, item)
+
+    def on_end(self, req_id: int):
+        request = self._requests.get(req_id)
+        if request is not None:
+            _schedule(request, request.finish)
+
+    def on_error(self, req_id: int, code: int, message: str):
+        request = self._requests.get(req_id)
+        if request is not None and code not in WARNING_CODES:
+            _schedule(request, request.fail, IBKRRequestError(req_id, code, message))
+
+    def on_open_order(self, order_info: dict):
+        request = self._open_orders
+        if request is not None:
+            _schedule(request, request.add, order_info)
+
+    def on_open_order_end(self):
+        request, self._open_orders = self._open_orders, None
+        if request is not None:
+            _schedule(request, request.finish)
+
+    # --- Requests ---
+
+    async def _request(self, send, cancel=None, timeout: Optional[float] = None) -> list:
+        """Sends one request with `send(req_id)` and returns its items once it ends."""
+        request = _Request(asyncio.get_running_loop())
+        req_id = self.app.get_new_reqid()
+        self._requests[req_id] = request  # Before the request, so no answer is dropped
+        try:
+            send(req_id)
+            return await asyncio.wait_for(request.future, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            if cancel is not None and request.future.cancelled():
+                cancel(req_id)
+            raise
+        finally:
+            del self._requests[req_id]
+
+    async def contract_details(self, contract: Contract, timeout: float = 7) -> list:
+        """Every ContractDetails matching `contract`; an empty list when nothing matches."""
+        return await self._request(lambda req_id: self.app.reqContractDetails(req_id, contract), timeout=timeout)
+
+    async def conid(self, contract: Contract, timeout: float = 7) -> int:
+        """The conId of `contract`, from the contract cache when it is there."""
+        cached = self.app._cached_conid(contract)
+        if cached is not None:
+            return cached
+        try:
+            details = await self.contract_details(contract, timeout)
+        except IBKRRequestError as e:
+            if e.code != 200:  # 200: no security definition found
+                raise
+            details = []
+        if not details:
+            raise Exception(f"Failed to get contract details for {contract.symbol} {getattr(contract, 'strike', '')} {getattr(contract, 'right', '')}. No details found.")
+        return details[0].contract.conId
+
+    async def historical_bars(self, contract: Contract, end: str = "", duration: str = "1 D", bar_size: str = "1 day",
+                              what_to_show: str = "TRADES", use_rth: bool = True, timeout: float = 15) -> list:
+        """The BarData of one reqHistoricalData request; cancelled at TWS on timeout."""
+        return await self._request(
+            lambda req_id: self.app.reqHistoricalData(req_id, contract, end, duration, bar_size, what_to_show,
+                                                      int(use_rth), 1, False, []),
+            cancel=self.app.cancelHistoricalData, timeout=timeout)
+
+    async def open_orders(self, timeout: float = 8) -> List[dict]:
+        """
+        The open orders (IBKRApp's order_info dicts) of one reqAllOpenOrders. The answer
+        carries no reqId, so concurrent callers share one request.
+        """
+        loop = asyncio.get_running_loop()
+        request = self._open_orders
+        if request is None or request.loop is not loop:
+            request = self._open_orders = _Request(loop)
+            self.app.reqAllOpenOrders()
+        try:
+            # Shielded: one caller timing out leaves the request to the others
+            return await asyncio.wait_for(asyncio.shield(request.future), timeout)
+        except asyncio.TimeoutError:
+            if self._open_orders is request:
+                self._open_orders = None  # The next call sends a new request
+            raise
+
+    def market_data(self, contract: Contract, generic_ticks: str = "") -> "TickStream":
+        """Subscribes to streaming prices of `contract`; call from a coroutine of the loop that reads them."""
+        request = _Request(asyncio.get_running_loop(), stream=True)
+        req_id = self.app.get_new_reqid()
+        self._requests[req_id] = request
+        self.app.reqMktData(req_id, contract, generic_ticks, False, False, [])
+        return TickStream(self, req_id, request)
+
+class TickStream:
+    """
+    (tickType, price) pairs of one market data subscription, as an async iterator.
+    Closing it (or leaving its `async with`) cancels the subscription; an error for its
+    reqId is raised from the next read.
+    """
+
+    def __init__(self, layer: AsyncIBKR, req_id: int, request: _Request):
+        self.layer = layer
+        self.req_id = req_id
+        self._request = request
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Tuple[int, float]:
+        if self.closed:
+            raise StopAsyncIteration
+        item = await self._request.queue.get()
+        if isinstance(item, Exception):
+            self.close()
+            raise item
+        return item
+
+    async def next(self, timeout: Optional[float] = None) -> Tuple[int, float]:
+        """The next tick; asyncio.TimeoutError after `timeout` seconds, leaving the subscription open."""
+        return await asyncio.wait_for(self.__anext__(), timeout)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.layer._requests.pop(self.req_id, None)
+            self.layer.app.cancelMktData(self.req_id)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
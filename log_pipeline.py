@@ -0,0 +1,212 @@
+# log_pipeline.py
+
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+TS_PREFIX = re.compile(r'^\[TS:[^\]]+\]\s*')
+# Status lines that are rewritten in place on screen and never written to the log file
+UPDATABLE_PREFIXES = ("Waiting for market open:", "Live SPX Price:")
+
+def strip_timestamp(line: str) -> str:
+    return TS_PREFIX.sub('', line, count=1)
+
+def is_updatable(line: str) -> bool:
+    return strip_timestamp(line).startswith(UPDATABLE_PREFIXES)
+
+class BufferedLogWriter:
+    """
+    Appends lines to a log file through one open handle, writing whatever has
+    accumulated in a single call on flush (or once `max_lines` are waiting).
+    """
+
+    def __init__(self, path: str, max_lines: int = 1000):
+        self.path = path
+        self.max_lines = max_lines
+        self._lock = threading.Lock()
+        self._lines: List[str] = []
+        self._file = None
+
+    def write(self, line: str):
+        with self._lock:
+            self._lines.append(line)
+            if len(self._lines) < self.max_lines:
+                return
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._lines:
+                return
+            data = "\n".join(self._lines) + "\n"
+            self._lines = []
+            try:
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(data)
+                self._file.flush()
+            except Exception:
+                self._close_file()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._close_file()
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+
+class ConsoleBuffer:
+    """
+    The most recent console entries, each [id, line, seq]. Every change gets the next
+    sequence number: an appended line takes it as its id, while a status line that
+    replaces the previous status line keeps that entry's id and only bumps its seq.
+    Since only the tail is ever replaced, the entries changed after any seq form a
+    suffix, so since() touches only what it returns.
+    """
+
+    def __init__(self, maxlen: int = 5000):
+        self.lock = threading.Lock()
+        self._entries = deque(maxlen=maxlen)
+        self._seq = 0
+        self._cleared_at = 0  # Clients that synced before this seq must start over
+        self._tail_updatable = False
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, line: str, updatable: bool) -> Tuple[int, str, int]:
+        """Stores a line and returns (id, line, seq) of the changed entry."""
+        with self.lock:
+            self._seq += 1
+            if updatable and self._tail_updatable and self._entries:
+                entry = self._entries[-1]
+                entry[1], entry[2] = line, self._seq
+            else:
+                entry = [self._seq, line, self._seq]
+                self._entries.append(entry)
+            self._tail_updatable = updatable
+            return entry[0], entry[1], entry[2]
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+            # Clearing is a change too: the next frame then has a gap that makes clients resync
+            self._seq += 1
+            self._cleared_at = self._seq
+            self._tail_updatable = False
+
+    def lines(self) -> List[str]:
+        with self.lock:
+            return [entry[1] for entry in self._entries]
+
+    def since(self, seq: Optional[int]) -> Tuple[List[dict], int, bool]:
+        """
+        Returns (entries changed after `seq`, current seq, reset). reset is True when the
+        client's copy cannot be patched (unknown seq, cleared buffer or dropped entries);
+        all entries are returned then.
+        """
+        with self.lock:
+            oldest = self._entries[0][0] if self._entries else self._seq + 1
+            reset = seq is None or seq > self._seq or seq < self._cleared_at or seq < oldest - 1
+            changed = []
+            if reset:
+                changed = list(self._entries)
+            else:
+                for entry in reversed(self._entries):
+                    if entry[2] <= seq:
+                        break
+                    changed.append(entry)
+                changed.reverse()
+            return [{"seq": entry[0], "line": entry[1]} for entry in changed], self._seq, reset
+
+class OutputBatcher:
+    """
+    Collects changed console entries and hands them to `emit` as one frame per flush:
+    {"entries": [{"seq", "line"}], "prev_seq", "last_seq"}. A client whose last seen seq
+    is not prev_seq has missed a frame and should resync through /api/output?since=.
+    Repeated changes to one entry (status line updates) are sent once, with the newest line.
+    """
+
+    def __init__(self, emit: Callable[[dict], None]):
+        self.emit = emit
+        self._lock = threading.Lock()
+        self._entries: Dict[int, str] = {}
+        self._first_seq: Optional[int] = None
+        self._last_seq = 0
+
+    def add(self, entry_id: int, line: str, seq: int):
+        with self._lock:
+            if self._first_seq is None:
+                self._first_seq = seq
+            self._entries[entry_id] = line
+            self._last_seq = seq
+
+    def flush(self):
+        with self._lock:
+            if not self._entries:
+                return
+            entries, self._entries = self._entries, {}
+            prev_seq, self._first_seq = self._first_seq - 1, None
+            last_seq = self._last_seq
+        self.emit({"entries": [{"seq": i, "line": line} for i, line in entries.items()],
+                   "prev_seq": prev_seq, "last_seq": last_seq})
+
+class LogPipeline:
+    """
+    Ingests the bot's console lines: updates the shared ConsoleBuffer, and feeds
+    the socket batcher and the log writer, which a background thread flushes
+    every `emit_interval` and `flush_interval` seconds respectively.
+    `log` is a file path or any writer with write/flush/close (e.g. ConsoleLog).
+    """
+
+    def __init__(self, output: ConsoleBuffer, emit: Callable[[dict], None], log,
+                 flush_interval: float = 0.5, emit_interval: float = 0.1):
+        self.output = output
+        self.batcher = OutputBatcher(emit)
+        self.writer = BufferedLogWriter(log) if isinstance(log, str) else log
+        self.flush_interval = flush_interval
+        self.emit_interval = emit_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def ingest(self, raw: str):
+        updatable = is_updatable(raw)
+        # Buffer and batcher are updated in the same order from this single reader thread
+        self.batcher.add(*self.output.add(raw, updatable))
+        if not updatable:
+            self.writer.write(raw)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="log-pipeline", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.batcher.flush()
+        self.writer.close()
+
+    def _run(self):
+        last_write = time.monotonic()
+        while not self._stop.wait(self.emit_interval):
+            try:
+                self.batcher.flush()
+            except Exception:
+                pass
+            now = time.monotonic()
+            if now - last_write >= self.flush_interval:
+                self.writer.flush()
+                last_write = now
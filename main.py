@@ -1,23 +1,37 @@
 # main.py
 
+import asyncio
+import os
+import sys
 import threading
 import time
 
-from flask import app
 import print_utils
 from datetime import datetime, timedelta
 import pytz
-import asyncio
 import argparse # 1. Import argparse
 import json
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
 
-from config import (IBKR_HOST, IBKR_PORT, IBKR_CLIENT_ID, 
-                    UNDERLYING_SYMBOL, IBKR_ACCOUNT, SNAPMID_OFFSET, WAIT_AFTER_OPEN_SECONDS,
-                    LMT_PRICE_FOR_SPREAD_30, LMT_PRICE_FOR_SPREAD_35, DEFAULT_LIMIT_PRICE)
-from signal_utils import (Signal, gather_signals, get_signal_hash)
+from config import (IBKR_HOST, IBKR_PORT, IBKR_CLIENT_ID, UNDERLYING_SYMBOL, current_config, get_user_data_dir,
+                    live_config)
+from signal_utils import (Signal, gather_signal_post, get_signal_hash)
 from ibkr_app import IBKRApp
+from ibkr_async import AsyncIBKR
+from contract_cache import ContractCache, today_eastern
+from option_chain import load_option_chain, load_expiries
+from order_index import DuplicateIndex
+from tick_stats import StatusThrottle
+from trigger_engine import PriceTriggerEngine
+from market_clock import ClockOffset, refine_clock_offset, sleep_until
+from open_price import OpenPriceResolver
+from order_burst import BurstResult, transmit_burst
+from bot_events import BARS, STATUS, events
+import bot_startup
+from trading_calendar import get_calendar
+from telegram_listener import TelegramListener
+from signal_watcher import SignalWatcher, SignalDiff
 
 from ibapi.contract import ComboLeg, Contract
 from ibapi.order import Order
@@ -38,44 +52,23 @@ failed_conid_signals = []  # <-- Add here, after imports
 def get_trading_day_open(tz, choice='today'):
     """
     Calculates the market open time for 'today' or the 'next' trading day.
+    Weekends and NYSE holidays are skipped using the shared trading calendar.
     """
     now = datetime.now(tz)
-    target_day = now
-
-    if choice == 'next':
-        # Always start from the next calendar day
-        target_day = now + timedelta(days=1)
-    
-    # For 'next' choice, find the next weekday if the target is a weekend.
-    # For 'today' choice, this loop won't run if today is a weekday.
-    while target_day.weekday() >= 5:  # 5 = Saturday, 6 = Sunday
-        target_day += timedelta(days=1)
-        
-    return target_day.replace(hour=9, minute=30, second=0, microsecond=0)
+    # 'today' may resolve to today itself; 'next' always starts from the next calendar day
+    return get_calendar().next_open(now, include_today=(choice != 'next'), tz=tz)
 
-def is_duplicate_order(leg_ids, trigger_price, existing_orders, managed_orders, signal):
+def is_duplicate_order(app, leg_ids, trigger_price, signal):
     """
-    Checks if the number of matching orders in existing_orders + managed_orders
-    meets or exceeds signal.allowed_duplicates.
+    Checks if the orders in app.duplicate_index (open orders and those placed this session)
+    matching these legs and trigger meet or exceed signal.allowed_duplicates.
     """
-    count = 0
-    # Check existing TWS orders
-    for order in existing_orders:
-        if (order.get("secType") == "BAG" and
-            tuple(order.get("leg_conIds", [])) == tuple(leg_ids) and
-            order.get("trigger_price") == trigger_price):
-            count += 1
-    # Check managed orders in current session
-    for mo in managed_orders:
-        mo_leg_ids = sorted([leg.conId for leg in mo.contract.comboLegs])
-        if tuple(mo_leg_ids) == tuple(leg_ids) and mo.trigger == trigger_price:
-            count += 1
-    # Compare to allowed_duplicates
-    return count >= signal.allowed_duplicates
+    return app.duplicate_index.is_duplicate(leg_ids, trigger_price, signal.allowed_duplicates)
 
 def connect_with_retry(app, host, port, client_id, attempts=3):
     for i in range(1, attempts + 1):
         try:
+            bot_startup.mark(f"IBKR connect attempt {i}")
             app.connect(host, port, client_id)
             api_thread = threading.Thread(target=app.run, daemon=True)
             api_thread.start()
@@ -109,37 +102,64 @@ def request_with_retry(request_fn, event, attempts=3, wait_secs=6, before_each=N
         time.sleep(1.0 * i)
     return False
 
-async def wait_until_market_open(market_open_time, tz):
+# Seconds before the open at which the offset between the local and the TWS clock is measured
+CLOCK_SYNC_LEAD = 60
+
+def print_open_countdown(seconds_left: float):
+    if events.send(STATUS, phase="waiting_open", open_seconds=int(seconds_left)):
+        return
     # keep single-line printing for terminal; web will de-duplicate on client
-    while True:
-        now = datetime.now(tz)
-        seconds_left = (market_open_time - now).total_seconds()
-        if seconds_left <= 0:
-            break
-        hours, remainder = divmod(int(seconds_left), 3600)
-        mins, secs = divmod(remainder, 60)
-        print(f"Waiting for market open: {hours:02d}:{mins:02d}:{secs:02d} remaining...", flush=True)
-        await asyncio.sleep(1)
+    hours, remainder = divmod(int(seconds_left), 3600)
+    mins, secs = divmod(remainder, 60)
+    print(f"Waiting for market open: {hours:02d}:{mins:02d}:{secs:02d} remaining...", flush=True)
+
+def wait_until_market_open(market_open_time, tz, app=None, clock: Optional[ClockOffset] = None) -> ClockOffset:
+    """
+    Waits until the open on the exchange (TWS) clock. With an app, the offset of the local
+    clock is measured with reqCurrentTime shortly before the open; the final approach is
+    fine-slept and spun, and the achieved timing error is logged.
+    Returns the clock offset estimate, for scheduling later steps on the same clock.
+    """
+    clock = clock or ClockOffset()
+    target = market_open_time.timestamp()
+    if app is not None:
+        if target - time.time() > CLOCK_SYNC_LEAD:
+            sleep_until(target - CLOCK_SYNC_LEAD, clock.offset, on_second=print_open_countdown)
+        try:
+            refine_clock_offset(app, clock)
+        except Exception as e:
+            print(f"Clock offset measurement failed: {e}", flush=True)
+        if clock.known:
+            print(f"TWS clock offset: {clock.offset * 1000:+.1f} ms (±{clock.uncertainty * 1000:.1f} ms, {len(clock.samples)} sample(s)).", flush=True)
+    late = sleep_until(target, clock.offset, on_second=print_open_countdown)
     print("Market is open!", flush=True)
+    events.send(STATUS, phase="open", open_seconds=0)
+    if abs(late) < 1:  # Otherwise the bot simply started after the open
+        print(f"Open reached with {late * 1000:+.2f} ms jitter on the {'TWS' if clock.known else 'local'} clock.", flush=True)
+    return clock
 
-def process_managed_orders(app, managed_orders, underlying_symbol):
+def process_managed_orders(app, managed_orders, underlying_symbol) -> BurstResult:
     """
     Processes managed orders by comparing open price to trigger and transmitting/cancelling as needed.
+    All transmits and cancels go out in one burst; the GO/NO-GO lines are printed after it.
     """
-    for order_info in managed_orders:
-        if app.underlying_open_price >= order_info.trigger:
-            print(f"!! NO-GO for Order {order_info.id} !! {underlying_symbol} open ({app.underlying_open_price}) >= trigger ({order_info.trigger}). CANCELLING.", flush=True)
-            app.cancelOrder(order_info.id)
-        else:
-            print(f"** GO for Order {order_info.id}! ** Open price ({app.underlying_open_price}) is favorable. TRANSMITTING.", flush=True)
-            final_order = order_info.order_obj
-            final_order.transmit = True
-            app.placeOrder(order_info.id, order_info.contract, final_order)
+    orders = sorted(managed_orders, key=lambda mo: mo.trigger)  # Linear when already sorted
+    result = transmit_burst(app, orders, app.underlying_open_price)
+    for order_info in result.no_go:
+        print(f"!! NO-GO for Order {order_info.id} !! {underlying_symbol} open ({app.underlying_open_price}) >= trigger ({order_info.trigger}). CANCELLING.", flush=True)
+    for order_info in result.go:
+        print(f"** GO for Order {order_info.id}! ** Open price ({app.underlying_open_price}) is favorable. TRANSMITTING.", flush=True)
+    if result.go or result.no_go:
+        print(result.summary(), flush=True)
+    if len(result.sent_at) > 1:
+        app.order_latency.record("open burst first→last transmit", result.transmit_spread)
+    return result
 
 def fetch_existing_orders(app: IBKRApp) -> List[dict]:
     """Fetches only the currently open orders."""
     print("Requesting open orders...", flush=True)
     app.open_orders = []  # <-- Clear the list before fetching!
+    app.duplicate_index.clear()  # Rebuilt by the openOrder callbacks
     ok = request_with_retry(lambda: app.reqAllOpenOrders(), app.open_orders_event, attempts=3, wait_secs=8, desc="Open orders")
     if not ok:
         print("Failed to fetch open orders after retries. Continuing with empty set.", flush=True)
@@ -148,30 +168,65 @@ def fetch_existing_orders(app: IBKRApp) -> List[dict]:
     print(f"Found {len(open_orders)} open SPX order(s).", flush=True)
     return open_orders
 
-def get_trigger_conid_with_retry(app: IBKRApp, attempts: int = 3) -> Optional[int]:
-    """Fetches the SPX index contract ID with retry logic."""
-    trigger_conid = None
-    for i in range(1, attempts + 1):
-        try:
-            spx_contract = Contract()
-            spx_contract.symbol = "SPX"
-            spx_contract.secType = "IND"
-            spx_contract.exchange = "CBOE"
-            spx_contract.currency = "USD"
-            trigger_conid = app.get_contract_details(spx_contract)
-            print(f"Successfully fetched current SPX Index conId: {trigger_conid}", flush=True)
-            return trigger_conid
-        except Exception as e:
-            print(f"Fetch SPX conId failed (attempt {i}/{attempts}): {e}", flush=True)
-            time.sleep(1.5 * i)
-    return None
+def spx_index_contract() -> Contract:
+    spx = Contract(); spx.symbol="SPX"; spx.secType="IND"; spx.exchange="CBOE"; spx.currency="USD"
+    return spx
+
+async def _fetch_orders_and_trigger_conid(ib: AsyncIBKR, attempts: int) -> Tuple[List[dict], Optional[int]]:
+    async def open_orders():
+        for i in range(1, attempts + 1):
+            try:
+                return await ib.open_orders(timeout=8)
+            except asyncio.TimeoutError:
+                print(f"Open orders timed out (attempt {i}/{attempts}). Retrying...", flush=True)
+        print("Failed to fetch open orders after retries. Continuing with empty set.", flush=True)
+        return []
+
+    async def trigger_conid():
+        for i in range(1, attempts + 1):
+            try:
+                conid = await ib.conid(spx_index_contract())
+                print(f"Successfully fetched current SPX Index conId: {conid}", flush=True)
+                return conid
+            except asyncio.TimeoutError:
+                print(f"Fetch SPX conId timed out (attempt {i}/{attempts}).", flush=True)
+            except Exception as e:
+                print(f"Fetch SPX conId failed (attempt {i}/{attempts}): {e}", flush=True)
+            await asyncio.sleep(1.5 * i)
+        return None
+
+    orders, conid = await asyncio.gather(open_orders(), trigger_conid())
+    return orders, conid
+
+def fetch_orders_and_trigger_conid(app: IBKRApp, attempts: int = 3) -> Tuple[List[dict], Optional[int]]:
+    """
+    Startup requests of each day: the open orders and the SPX index conId, awaited together
+    through the asyncio request layer rather than one after the other.
+    """
+    print("Requesting open orders and the SPX conId...", flush=True)
+    app.open_orders = []
+    app.duplicate_index.clear()  # Rebuilt by the openOrder callbacks
+    ib = app.async_layer or AsyncIBKR(app)
+    open_orders, trigger_conid = asyncio.run(_fetch_orders_and_trigger_conid(ib, attempts))
+    print(f"Found {len(open_orders)} open SPX order(s).", flush=True)
+    return open_orders, trigger_conid
+
+def subscribe_spx_stream(app: IBKRApp, req_id: int = IBKRApp.REQID_SPX_STREAM) -> None:
+    app.reqMktData(req_id, spx_index_contract(), "", False, False, [])
 
-def start_spx_stream(app: IBKRApp, req_id_start: int = 100, tries: int = 3) -> None:
+def start_spx_stream(app: IBKRApp, req_id: int = IBKRApp.REQID_SPX_STREAM, tries: int = 3, subscribed: bool = False) -> None:
+    """
+    Makes sure the SPX stream delivers prices, re-subscribing if it stays silent.
+    With subscribed=True the stream was already requested (before the open).
+    """
     print("Starting live SPX price stream...", flush=True)
-    spx = Contract(); spx.symbol="SPX"; spx.secType="IND"; spx.exchange="CBOE"; spx.currency="USD"
     for i in range(tries):
-        req_id = req_id_start + i  # Use a different req_id each time
-        app.reqMktData(req_id, spx, "", False, False, [])
+        if i or not subscribed:
+            if i:
+                app.cancelMktData(req_id)  # The stream is identified by req_id, so re-request it under the same one
+            subscribe_spx_stream(app, req_id)
+        elif app.current_spx_price is not None:
+            break
         time.sleep(1.5 * (i + 1))
         if app.current_spx_price is not None:
             break
@@ -205,6 +260,47 @@ def get_contract_conid_with_retry(app: IBKRApp, contract: Contract, attempts: in
             time.sleep(0.5 * i)
     raise last_err or Exception("Unknown conid error")
 
+def listed_leg_strikes(app: IBKRApp, signal: Signal, report: bool = True) -> Tuple[float, float]:
+    """
+    Returns the (LC, SC) strikes to trade for a signal. When the option chain of the expiry
+    is loaded, unlisted strikes snap outward to the nearest listed one (LC down, SC up),
+    which keeps the spread at least as wide as the signal. A snap is printed when `report`
+    is set, which callers do once per signal.
+    """
+    chain = getattr(app, "option_chain", None)
+    if chain is None or not chain.has_expiry(signal.expiry):
+        return signal.lc_strike, signal.sc_strike
+    lc_strike = chain.snap(signal.expiry, signal.lc_strike, "down") or signal.lc_strike
+    sc_strike = chain.snap(signal.expiry, signal.sc_strike, "up") or signal.sc_strike
+    if report and (lc_strike, sc_strike) != (signal.lc_strike, signal.sc_strike):
+        print(f"Strikes {signal.lc_strike}/{signal.sc_strike} not listed for {signal.expiry}. Using {lc_strike}/{sc_strike}.", flush=True)
+    return lc_strike, sc_strike
+
+def resolve_signal_conids(app: IBKRApp, signals: List[Signal]) -> dict:
+    """
+    Resolves the LC/SC legs of all signals in one batch.
+    Returns a dict of (expiry, strike, right) -> conId for every leg that resolved.
+    """
+    contracts = {}
+    for s in signals:
+        for strike in listed_leg_strikes(app, s, report=False):  # Reported when the signal is staged
+            key = (s.expiry, float(strike), "C")
+            if key not in contracts:
+                contracts[key] = build_option_contract(s.expiry, strike, "C")
+    if not contracts:
+        return {}
+    print(f"Resolving conIds for {len(contracts)} option leg(s) in one batch...", flush=True)
+    return app.resolve_conids(contracts)
+
+def get_leg_conid(app: IBKRApp, expiry: str, strike: float, right: str, conid_map: Optional[dict] = None) -> int:
+    """Returns the conId of a leg from a pre-resolved batch, falling back to a single lookup."""
+    if conid_map:
+        conid = conid_map.get((expiry, float(strike), right))
+        if conid is not None:
+            return conid
+    contract = build_option_contract(expiry, strike, right)
+    return get_contract_conid_with_retry(app, contract, attempts=3)
+
 def build_combo_contract(lc_conid: int, sc_conid: int) -> Contract:
     c = Contract(); c.symbol=UNDERLYING_SYMBOL; c.secType="BAG"; c.currency="USD"; c.exchange="SMART"
     leg1 = ComboLeg(); leg1.conId=lc_conid; leg1.ratio=1; leg1.action="BUY"; leg1.exchange="SMART"
@@ -213,24 +309,25 @@ def build_combo_contract(lc_conid: int, sc_conid: int) -> Contract:
     return c
 
 def build_staged_order(signal: Signal, trigger_conid: int) -> Order:
+    cfg = current_config()  # Price caps and offsets as last saved, without a restart
     o = Order()
     o.action = "BUY"
     o.totalQuantity = 1
     o.tif = "DAY"
     o.transmit = False
     o.orderType = signal.order_type
-    o.account = IBKR_ACCOUNT
+    o.account = cfg.IBKR_ACCOUNT
 
     if o.orderType == "LMT" or o.orderType == "PEG MID":
         spread_width = signal.sc_strike - signal.lc_strike
         price_cap = None
-        if spread_width == 30 and LMT_PRICE_FOR_SPREAD_30 is not None:
-            price_cap = LMT_PRICE_FOR_SPREAD_30
-        elif spread_width == 35 and LMT_PRICE_FOR_SPREAD_35 is not None:
-            price_cap = LMT_PRICE_FOR_SPREAD_35
+        if spread_width == 30 and cfg.LMT_PRICE_FOR_SPREAD_30 is not None:
+            price_cap = cfg.LMT_PRICE_FOR_SPREAD_30
+        elif spread_width == 35 and cfg.LMT_PRICE_FOR_SPREAD_35 is not None:
+            price_cap = cfg.LMT_PRICE_FOR_SPREAD_35
         else:
             # Use signal-specific price first, then fall back to the global default
-            price_cap = signal.lmt_price if signal.lmt_price is not None else DEFAULT_LIMIT_PRICE
+            price_cap = signal.lmt_price if signal.lmt_price is not None else cfg.DEFAULT_LIMIT_PRICE
 
         if price_cap is None:
             raise ValueError(f"{o.orderType} order requires a price cap. None found for spread width {spread_width}.")
@@ -247,7 +344,7 @@ def build_staged_order(signal: Signal, trigger_conid: int) -> Order:
             if signal.snapmid_offset is not None:
                 offset_val = float(signal.snapmid_offset)
             else:
-                offset_val = float(SNAPMID_OFFSET)
+                offset_val = float(cfg.SNAPMID_OFFSET)
             
             # A positive offset makes a BUY order more aggressive (pays more).
             o.auxPrice = abs(offset_val)
@@ -263,14 +360,14 @@ def build_staged_order(signal: Signal, trigger_conid: int) -> Order:
         if signal.snapmid_offset is not None:
             o.auxPrice = float(signal.snapmid_offset)
         else:
-            o.auxPrice = float(SNAPMID_OFFSET)
+            o.auxPrice = float(cfg.SNAPMID_OFFSET)
     elif o.orderType == "SNAP MKT":
         # For a BUY order, this creates a LMT order at Ask - Offset.
         # A positive offset seeks price improvement. An offset of 0 behaves like a MKT order.
         if signal.snapmid_offset is not None:
             o.auxPrice = abs(float(signal.snapmid_offset))
         else:
-            o.auxPrice = abs(float(SNAPMID_OFFSET))
+            o.auxPrice = abs(float(cfg.SNAPMID_OFFSET))
 
     cond = Create(OrderCondition.Price)
     cond.conId = int(trigger_conid)
@@ -298,32 +395,78 @@ def stage_order(app: IBKRApp, signal: Signal, contract: Contract, order: Order,
         hash=signal_hash,
     )
 
-def process_and_stage_new_signals(app: IBKRApp, signals: List[Signal], managed_orders: List[ManagedOrder], existing_orders: List[dict], trigger_conid: int):
+def signal_order_hash(signal: Signal) -> str:
+    """The ManagedOrder.hash of orders staged from `signal`."""
+    return get_signal_hash(f"{UNDERLYING_SYMBOL}-{signal.expiry}-{signal.lc_strike}-{signal.sc_strike}-{signal.trigger_price}")
+
+def cancel_signal_orders(app: IBKRApp, signals: List[Signal], managed_orders: List[ManagedOrder], failed_signals: List[Signal]) -> List[int]:
+    """
+    Cancels one working order per signal occurrence in `signals` (withdrawn or triggered in
+    the channel), matched through ManagedOrder.hash. Filled orders are left alone; occurrences
+    without a working order drop a matching entry from `failed_signals` instead, so it is not retried.
+    Cancelled orders leave managed_orders and the error retry list. Returns the cancelled order IDs.
+    """
+    order_states = getattr(app, "order_states", {})
+    by_hash = {}
+    for mo in managed_orders:
+        if order_states.get(mo.id) not in ("Filled", "Cancelled", "ApiCancelled"):
+            by_hash.setdefault(mo.hash, []).append(mo)
+
+    to_cancel = []
+    for s in signals:
+        candidates = by_hash.get(signal_order_hash(s))
+        if candidates:
+            # Newest order first, so older duplicates keep their place in the queue
+            to_cancel.append(candidates.pop(candidates.index(max(candidates, key=lambda mo: mo.id))))
+            continue
+        key = (s.expiry, s.lc_strike, s.sc_strike, s.trigger_price)
+        for i, fs in enumerate(failed_signals):
+            if (fs.expiry, fs.lc_strike, fs.sc_strike, fs.trigger_price) == key:
+                failed_signals.pop(i)
+                print(f"--> Dropped pending retry for {s.lc_strike}/{s.sc_strike} @ {s.trigger_price}.", flush=True)
+                break
+
+    sent = app.cancel_orders([mo.id for mo in to_cancel])
+    for mo in to_cancel:
+        if mo.id in sent:
+            print(f"--> Cancelling Order {mo.id} ({mo.lc_strike}/{mo.sc_strike} @ {mo.trigger}): signal no longer pending.", flush=True)
+        managed_orders.remove(mo)
+        if mo.id in app.error_order_ids:
+            app.error_order_ids.remove(mo.id)
+    return sent
+
+def process_and_stage_new_signals(app: IBKRApp, signals: List[Signal], managed_orders: List[ManagedOrder], existing_orders: List[dict], trigger_conid: int, conid_map: Optional[dict] = None, duplicate_index: Optional[DuplicateIndex] = None):
+    """
+    Stages an order for every signal. Pass the result of resolve_signal_conids as `conid_map`
+    to skip the per-leg lookups; legs missing from it are fetched one at a time.
+    Duplicates are checked against `duplicate_index` (normally app.duplicate_index); without one,
+    an index is built once from existing_orders and managed_orders.
+    """
     if not signals:
         return
+    if duplicate_index is None:
+        duplicate_index = DuplicateIndex.from_orders(existing_orders, managed_orders)
 
     for s in signals:
         print(f"Processing signal: {json.dumps(s.__dict__)}", flush=True)
         try:
-            lc_contract = build_option_contract(s.expiry, s.lc_strike, "C")
-            sc_contract = build_option_contract(s.expiry, s.sc_strike, "C")
-            
-            lc_conid = get_contract_conid_with_retry(app, lc_contract, attempts=3)
-            sc_conid = get_contract_conid_with_retry(app, sc_contract, attempts=3)
+            lc_strike, sc_strike = listed_leg_strikes(app, s)
+            lc_conid = get_leg_conid(app, s.expiry, lc_strike, "C", conid_map)
+            sc_conid = get_leg_conid(app, s.expiry, sc_strike, "C", conid_map)
             
             leg_ids = sorted([lc_conid, sc_conid])
-            if is_duplicate_order(leg_ids, s.trigger_price, existing_orders, managed_orders, s):
+            if duplicate_index.is_duplicate(leg_ids, s.trigger_price, s.allowed_duplicates):
                 print(f"--> Duplicate order detected for {s.lc_strike}/{s.sc_strike} @ {s.trigger_price}. Skipping.", flush=True)
                 continue
 
-            identifier = f"{UNDERLYING_SYMBOL}-{s.expiry}-{s.lc_strike}-{s.sc_strike}-{s.trigger_price}"
-            sig_hash = get_signal_hash(identifier)
+            sig_hash = signal_order_hash(s)
             contract = build_combo_contract(lc_conid, sc_conid)
             order = build_staged_order(s, trigger_conid)
             
             # Stage the order and add it to our managed list
             mo = stage_order(app, s, contract, order, sig_hash)
             managed_orders.append(mo)
+            duplicate_index.add(mo.id, leg_ids, s.trigger_price)
 
         except Exception as e:
             print(f"Could not process or stage signal {s}. Adding to failed conId signals to retry later. Error: {e}", flush=True)
@@ -337,126 +480,256 @@ def process_and_stage_new_signals(app: IBKRApp, signals: List[Signal], managed_o
                 failed_conid_signals.append(s)
             else:
                 print(f"--> Not appending to failed_conid_signals: already reached allowed_duplicates for {key}", flush=True)
-            error_orders = [order for order in app.open_orders if order["orderId"] in app.error_order_ids]
-            status_data = { "error_orders": error_orders, "failed_conid_signals": [{"expiry": fs.expiry, "lc_strike": fs.lc_strike, "sc_strike": fs.sc_strike, "trigger_price": fs.trigger_price} for fs in failed_conid_signals] }
-            print(f"STATUS_UPDATE::{json.dumps(status_data)}", flush=True)
+            print_status_update(app, failed_conid_signals)
             continue
 
-def fetch_open_price_with_retry(app: IBKRApp, symbol: str, attempts: int = 5, wait_secs: int = 3) -> Optional[float]:
+def resolve_open_price(app: IBKRApp, resolver: OpenPriceResolver, symbol: str, grace: float, deadline: float) -> Optional[float]:
+    """
+    Waits for the resolver (attached to the app before the bell) to settle the open,
+    requesting the daily bar once a second meanwhile. Returns None after `deadline` seconds
+    (counted from the call when the bot starts after the bell).
+    """
     underlying_contract = Contract(); underlying_contract.symbol = symbol; underlying_contract.secType = "IND"; underlying_contract.currency = "USD"; underlying_contract.exchange = "CBOE"
-    for i in range(1, attempts + 1):
-        app.underlying_open_price = None
-        app.historical_data_event.clear()
-        print(f"Attempt {i}/{attempts} to fetch {symbol} open price...", flush=True)
-        app.reqHistoricalData(99, underlying_contract, "", "1 D", "1 day", "TRADES", 1, 1, False, [])
-        got = app.historical_data_event.wait(wait_secs)
-        if app.underlying_open_price is not None and got:
-            return app.underlying_open_price
-    return None
-
-def run_post_open_retry_loops(app, managed_orders, failed_conid_signals, trigger_conid, market_close_time, tz, existing_orders):
-    last_status_print = 0  # <-- Add this line!
+
+    def request_daily_bar(req_id: int):
+        app.reqHistoricalData(req_id, underlying_contract, "", "1 D", "1 day", "TRADES", 1, 1, False, [])
+
+    try:
+        quote = resolver.resolve(app.get_new_reqid, request_daily_bar, grace=grace, deadline=deadline)
+    finally:
+        app.open_price_resolver = None
+    print(resolver.format_latencies(), flush=True)
+    if quote is None:
+        return None
+    app.underlying_open_price = quote.price
+    print(f"{symbol} open price {quote.price} from {quote.source}.", flush=True)
+    return quote.price
+
+def stage_intraday_signals(app: IBKRApp, signals: List[Signal], managed_orders: List[ManagedOrder], trigger_conid: int) -> List[ManagedOrder]:
+    """
+    Stages signals posted after the open and runs the GO/NO-GO check on just those orders.
+    Duplicates are checked against app.duplicate_index, which openOrder keeps current,
+    so no open-order snapshot is requested first.
+    """
+    chain = getattr(app, "option_chain", None)
+    if chain is not None:
+        load_expiries(app, chain, {s.expiry for s in signals}, symbol=UNDERLYING_SYMBOL)
+    conid_map = resolve_signal_conids(app, signals)
+    first_new = len(managed_orders)
+    process_and_stage_new_signals(app, signals, managed_orders, [], trigger_conid, conid_map, app.duplicate_index)
+    new_orders = managed_orders[first_new:]
+    if new_orders and app.underlying_open_price is not None:
+        process_managed_orders(app, new_orders, UNDERLYING_SYMBOL)
+    managed_orders.sort(key=lambda x: x.trigger)
+    return new_orders
+
+# Seconds the retry loop sleeps when nothing wakes it, and before a failed signal is re-armed
+RETRY_IDLE_TIMEOUT = 5.0
+RETRY_BACKOFF = 1.0
+
+def print_status_update(app, failed_conid_signals):
+    """Sends the error orders and failed signals as a status event, or prints them as a STATUS_UPDATE line."""
+    error_orders = [order for order in app.open_orders if order["orderId"] in app.error_order_ids]
+    status_data = { "error_orders": error_orders, "failed_conid_signals": [{"expiry": s.expiry, "lc_strike": s.lc_strike, "sc_strike": s.sc_strike, "trigger_price": s.trigger_price} for s in failed_conid_signals] }
+    if events.send(STATUS, **status_data):
+        return
+    print(f"STATUS_UPDATE::{json.dumps(status_data)}", flush=True)
+
+def retry_error_order(app, mo):
+    """Re-transmits an errored order under a new order ID."""
+    error_id = mo.id
+    print(f"Condition met. Retrying order {error_id}...", flush=True)
+    new_id = app.nextOrderId
+    app.nextOrderId += 1
+    mo.order_obj.transmit = True
+    app.placeOrder(new_id, mo.contract, mo.order_obj)
+    app.duplicate_index.discard(mo.id)
+    app.duplicate_index.add(new_id, [leg.conId for leg in mo.contract.comboLegs], mo.trigger)
+    mo.id = new_id
+    if error_id in app.error_order_ids:
+        app.error_order_ids.remove(error_id)
+
+def retry_failed_signal(app, signal, failed_conid_signals, trigger_conid) -> bool:
+    """
+    Resolves the legs of a signal whose conIds could not be fetched before and submits it live.
+    Returns False if it should be retried later; the signal leaves failed_conid_signals otherwise.
+    """
+    try:
+        # With the exact strikes of the expiry loaded the legs are already snapped to listed
+        # ones, so there is nothing to guess. Without them, or with only the union of strikes
+        # over all expirations (which an expiry may not list), fall back to widening by 5.
+        chain = getattr(app, "option_chain", None)
+        has_listed = chain is not None and chain.has_listed(signal.expiry)
+        # The snap was reported when the signal was first staged
+        lc_strike, sc_strike = listed_leg_strikes(app, signal, report=False)
+        try:
+            lc_conid = get_leg_conid(app, signal.expiry, lc_strike, "C")
+        except Exception as e:
+            if has_listed:
+                raise
+            print(f"LC conId fetch failed for {lc_strike}. Trying LC strike -5...", flush=True)
+            lc_conid = get_leg_conid(app, signal.expiry, lc_strike - 5, "C")
+        try:
+            sc_conid = get_leg_conid(app, signal.expiry, sc_strike, "C")
+        except Exception as e:
+            if has_listed:
+                raise
+            print(f"SC conId fetch failed for {sc_strike}. Trying SC strike +5...", flush=True)
+            sc_conid = get_leg_conid(app, signal.expiry, sc_strike + 5, "C")
+
+        leg_ids = sorted([lc_conid, sc_conid])
+        # Check for duplicates before placing order
+        if is_duplicate_order(app, leg_ids, signal.trigger_price, signal):
+            print(f"--> Duplicate order detected for {signal.lc_strike}/{signal.sc_strike} @ {signal.trigger_price}. Skipping.", flush=True)
+        else:
+            contract = build_combo_contract(lc_conid, sc_conid)
+            order = build_staged_order(signal, trigger_conid)
+            order.transmit = True  # <-- Make order live immediately
+            order_id = app.nextOrderId
+            app.nextOrderId += 1
+            app.placeOrder(order_id, contract, order)
+            app.duplicate_index.add(order_id, leg_ids, signal.trigger_price)
+            print(f"Successfully submitted LIVE order for signal {signal} after retry.", flush=True)
+    except Exception as e:
+        print(f"Retry failed for signal {signal}: {e}", flush=True)
+        return False
+    for i, s in enumerate(failed_conid_signals):
+        if s is signal:
+            del failed_conid_signals[i]
+            break
+    print_status_update(app, failed_conid_signals)
+    return True
+
+def run_post_open_retry_loops(app, managed_orders, failed_conid_signals, trigger_conid, market_close_time, tz, signal_watcher=None, on_signal_diff=None):
+    """
+    Retries error orders and failed conId signals until they are resolved or the market closes.
+    Each becomes actionable once SPX trades at or above its LC strike. They wait in a
+    PriceTriggerEngine that tickPrice feeds, so a crossing wakes this loop on the tick
+    that makes it, and only the orders and signals it affects are retried.
+    With a signal_watcher, the loop runs until the close and passes every change of the
+    channel's signals to on_signal_diff.
+    """
+    engine = PriceTriggerEngine()
+    if app.current_spx_price is not None:
+        engine.on_price(app.current_spx_price)
+    app.price_triggers = engine
+    listener = getattr(signal_watcher, "listener", None)
+    if listener is not None:
+        listener.on_update = engine.wake
+    deferred = {}  # key -> time.monotonic() before which a failed retry is not re-armed
+    last_status_print = 0
     print("Entering post-open retry loop for error orders and failed conId signals...", flush=True)
-    while datetime.now(tz) < market_close_time and (app.error_order_ids or failed_conid_signals):
-        live_price = app.current_spx_price
-
-        # Gather all LC strikes from error orders and failed conid signals
-        error_lc_strikes = [mo.lc_strike for mo in managed_orders if mo.id in app.error_order_ids]
-        failed_lc_strikes = [signal.lc_strike for signal in failed_conid_signals]
-        all_lc_strikes = error_lc_strikes + failed_lc_strikes
-
-        if not all_lc_strikes or live_price is None:
-            # Nothing actionable or no price yet
-            now = time.time()
-            if now - last_status_print > 30:
+    try:
+        while datetime.now(tz) < market_close_time and (app.error_order_ids or failed_conid_signals or signal_watcher is not None):
+            if signal_watcher is not None:
+                diff = signal_watcher.poll()
+                if diff and on_signal_diff is not None:
+                    on_signal_diff(diff)
+
+            # Arm new work and disarm what was resolved elsewhere (cancelled, staged, filled)
+            now = time.monotonic()
+            orders = {mo.id: mo for mo in managed_orders}
+            wanted = {}
+            for error_id in list(app.error_order_ids):
+                if error_id not in orders:
+                    print(f"Order ID {error_id} seems resolved. Removing from error list.", flush=True)
+                    app.error_order_ids.remove(error_id)
+                    continue
+                wanted[("order", error_id)] = orders[error_id].lc_strike
+            signals = {id(s): s for s in failed_conid_signals}
+            for signal_id, signal in signals.items():
+                wanted[("signal", signal_id)] = signal.lc_strike
+            for key in list(deferred):
+                if key not in wanted or deferred[key] <= now:
+                    del deferred[key]
+            for key, threshold in wanted.items():
+                if key not in engine and key not in deferred:
+                    engine.add(key, threshold)
+            for key in engine.keys():
+                if key not in wanted:
+                    engine.discard(key)
+
+            if wanted and engine.price is None and now - last_status_print > 30:
                 print("Waiting for SPX live price or actionable signals...", flush=True)
                 last_status_print = now
-            time.sleep(1)
-            continue
 
-        lowest_lc_strike = min(all_lc_strikes)
-
-        if live_price >= lowest_lc_strike:
-            # Live price is above the lowest LC strike, we can act on it
-            print(f"Live price {live_price} is above lowest LC strike {lowest_lc_strike}.", flush=True)
-            # --- Error order retry ---
-            if app.error_order_ids:
-                print(f"Critical error(s) detected for order IDs: {app.error_order_ids}. Retrying...", flush=True)
-                for error_id in list(app.error_order_ids):
-                    matches = [m for m in managed_orders if m.id == error_id]
-                    if not matches:
-                        print(f"Order ID {error_id} seems resolved. Removing from error list.", flush=True)
-                        app.error_order_ids.remove(error_id)
-                        continue
-                    mo = matches[0]
-                    live_price = app.current_spx_price
-                    if live_price is None:
-                        print("Live SPX price not available yet. Waiting...", flush=True)
+            timeout = RETRY_IDLE_TIMEOUT
+            if deferred:
+                timeout = max(0.0, min(timeout, min(deferred.values()) - now))
+            timeout = min(timeout, max(0.0, (market_close_time - datetime.now(tz)).total_seconds()))
+            fired = engine.wait(timeout)
+            if not fired:
+                continue
+
+            live_price = engine.price
+            orders = {mo.id: mo for mo in managed_orders}
+            for kind, ident in fired:
+                if kind == "order":
+                    mo = orders.get(ident)
+                    if mo is None or ident not in app.error_order_ids:
                         continue
-                    print(f"Checking retry condition for order {error_id}: Live={live_price}, LC={mo.lc_strike}", flush=True)
-                    if live_price >= mo.lc_strike:
-                        print(f"Condition met. Retrying order {error_id}...", flush=True)
-                        new_id = app.nextOrderId
-                        app.nextOrderId += 1
-                        mo.order_obj.transmit = True
-                        app.placeOrder(new_id, mo.contract, mo.order_obj)
-                        mo.id = new_id
-                    else:
-                        print(f"Condition not met for order {error_id}. Will re-check in the next cycle.", flush=True)
-
-            # --- Failed conId retry ---
-            if failed_conid_signals:
-                print(f"Retrying failed conId signals: {len(failed_conid_signals)} remaining.", flush=True)
-                for idx, signal in enumerate(list(failed_conid_signals)):
-                    live_price = app.current_spx_price
-                    if live_price is None:
-                        print("Live SPX price not available yet. Waiting...", flush=True)
+                    print(f"Live price {live_price} reached LC strike {mo.lc_strike} of error order {ident}.", flush=True)
+                    retry_error_order(app, mo)
+                else:
+                    signal = signals.get(ident)
+                    if signal is None or not any(s is signal for s in failed_conid_signals):
                         continue
-                    print(f"Checking retry for signal {signal}: Live={live_price}, LC={signal.lc_strike}", flush=True)
-                    if live_price >= signal.lc_strike:
-                        try:
-                            try:
-                                lc_contract = build_option_contract(signal.expiry, signal.lc_strike, "C")
-                                lc_conid = get_contract_conid_with_retry(app, lc_contract, attempts=3)
-                            except Exception as e:
-                                print(f"LC conId fetch failed for {signal.lc_strike}. Trying LC strike -5...", flush=True)
-                                lc_contract = build_option_contract(signal.expiry, signal.lc_strike - 5, "C")
-                                lc_conid = get_contract_conid_with_retry(app, lc_contract, attempts=3)
-                            try:
-                                sc_contract = build_option_contract(signal.expiry, signal.sc_strike, "C")
-                                sc_conid = get_contract_conid_with_retry(app, sc_contract, attempts=3)
-                            except Exception as e:
-                                print(f"SC conId fetch failed for {signal.sc_strike}. Trying SC strike +5...", flush=True)
-                                sc_contract = build_option_contract(signal.expiry, signal.sc_strike + 5, "C")
-                                sc_conid = get_contract_conid_with_retry(app, sc_contract, attempts=3)
-
-                            leg_ids = sorted([lc_conid, sc_conid])
-                            # Check for duplicates before placing order
-                            if is_duplicate_order(leg_ids, signal.trigger_price, existing_orders, managed_orders, signal):
-                                print(f"--> Duplicate order detected for {signal.lc_strike}/{signal.sc_strike} @ {signal.trigger_price}. Skipping.", flush=True)
-                                failed_conid_signals.pop(idx)
-                                error_orders = [order for order in app.open_orders if order["orderId"] in app.error_order_ids]
-                                status_data = { "error_orders": error_orders, "failed_conid_signals": [{"expiry": s.expiry, "lc_strike": s.lc_strike, "sc_strike": s.sc_strike, "trigger_price": s.trigger_price} for s in failed_conid_signals] }
-                                print(f"STATUS_UPDATE::{json.dumps(status_data)}", flush=True)
-                                continue
-                            contract = build_combo_contract(lc_conid, sc_conid)
-                            order = build_staged_order(signal, trigger_conid)
-                            order.transmit = True  # <-- Make order live immediately
-                            order_id = app.nextOrderId
-                            app.nextOrderId += 1
-                            app.placeOrder(order_id, contract, order)
-                            print(f"Successfully submitted LIVE order for signal {signal} after retry.", flush=True)
-                            failed_conid_signals.pop(idx)
-                            error_orders = [order for order in app.open_orders if order["orderId"] in app.error_order_ids]
-                            status_data = { "error_orders": error_orders, "failed_conid_signals": [{"expiry": s.expiry, "lc_strike": s.lc_strike, "sc_strike": s.sc_strike, "trigger_price": s.trigger_price} for s in failed_conid_signals] }
-                            print(f"STATUS_UPDATE::{json.dumps(status_data)}", flush=True)
-                        except Exception as e:
-                            print(f"Retry failed for signal {signal}: {e}", flush=True)
-                    else:
-                        print(f"Condition not met for signal {signal}. Will re-check in the next cycle.", flush=True)
-        time.sleep(1)
+                    print(f"Live price {live_price} reached LC strike {signal.lc_strike} of signal {signal}. Retrying...", flush=True)
+                    if not retry_failed_signal(app, signal, failed_conid_signals, trigger_conid):
+                        deferred[(kind, ident)] = time.monotonic() + RETRY_BACKOFF
+    finally:
+        app.price_triggers = None
+        if listener is not None:
+            listener.on_update = None
     print("Post-open retry loops concluded (either market close reached or no pending issues).", flush=True)
 
+ORDER_LATENCY_DIR = os.path.join(get_user_data_dir(), "order_latency")
+
+def report_order_latency(app, day: str):
+    """Logs the day's order latency histograms and saves them for /api/latency."""
+    lines = app.order_latency.format_report()
+    if not lines:
+        return
+    print("=== Order latency ===", flush=True)
+    for line in lines:
+        print(line, flush=True)
+    try:
+        app.order_latency.save(ORDER_LATENCY_DIR, day)
+    except Exception as e:
+        print(f"Failed to save order latency report: {e}", flush=True)
+
+# Seconds between BARS events (the session's one-minute bars and VWAP) while the market is open
+BARS_EVENT_INTERVAL = 60
+
+def session_bars(app, session_start: datetime, last: int = 390) -> dict:
+    """The session's one-minute SPX bars (at most the `last` ones) and VWAP, as BARS event fields."""
+    start = session_start.timestamp()
+    bars = app.spx_store.ohlc(interval=60.0, start=start)[-last:]
+    return {"bars": [dict(zip(bars.dtype.names, row)) for row in bars.tolist()],
+            "vwap": app.spx_store.vwap(start=start)}
+
+def publish_session_bars(app, session_start: datetime, until: datetime, interval: float = BARS_EVENT_INTERVAL) -> threading.Thread:
+    """Sends a BARS event every `interval` seconds until `until` (the close) while api.py listens."""
+    def run():
+        while datetime.now(app.tz) < until:
+            if events.connected:
+                events.send(BARS, **session_bars(app, session_start))
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="session-bars", daemon=True)
+    thread.start()
+    return thread
+
+def format_session_summary(app, session_start: datetime) -> str:
+    """One line of the session's SPX range from the tick store, e.g. for the close."""
+    bars = app.spx_store.ohlc(interval=60.0, start=session_start.timestamp())
+    if not len(bars):
+        return "No SPX trades recorded this session."
+    line = (f"SPX session: O {bars['open'][0]} H {bars['high'].max()} L {bars['low'].min()} "
+            f"C {bars['close'][-1]} ({int(bars['count'].sum())} ticks, {len(bars)} one-minute bars)")
+    vwap = app.spx_store.vwap(start=session_start.timestamp())
+    return line if vwap is None else f"{line} VWAP {vwap:.2f}"
+
 def format_existing_orders(existing_orders, conid_to_strike, conid_to_expiry):
     lines = []
     if not existing_orders:
@@ -498,7 +771,7 @@ def format_existing_orders(existing_orders, conid_to_strike, conid_to_expiry):
     lines.append("===============================")
     return "\n".join(lines)
 
-def main_loop():
+def parse_args(argv=None):
     parser = argparse.ArgumentParser(description="Automated SPX Bull Spread Order Management for IBKR.")
     parser.add_argument(
         '--check-day', 
@@ -514,24 +787,80 @@ def main_loop():
         default=None,
         help="Override the IBKR Client ID from the config file."
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help="Print where startup time goes (milestones and, via api.py --run-main, imports) once IBKR is connected."
+    )
+    return parser.parse_args(argv)
+
+def run_standby(connect: bool = False):
+    """
+    Warm standby for api.py: with this module's imports done, loads the trading calendar
+    and, with `connect`, opens the TWS connection, then waits for api.py to hand over
+    the run with a line on stdin. Returns at end of input (api.py has gone away).
+    """
+    started = time.perf_counter()
+    args = parse_args()
+    get_calendar()
+    app = None
+    if connect:
+        app = IBKRApp()
+        client_id = args.client_id if args.client_id is not None else IBKR_CLIENT_ID
+        if not connect_with_retry(app, IBKR_HOST, IBKR_PORT, client_id, attempts=1):
+            app = None  # main_loop connects as usual
+    print(f"Warm standby ready in {(time.perf_counter() - started) * 1000:.0f} ms"
+          f"{' with an open IBKR connection' if app is not None else ''}.", flush=True)
+    if not sys.stdin.readline():
+        if app is not None:
+            app.disconnect()
+        return
+    print("Standby activated.", flush=True)
+    main_loop(prepared_app=app)
+
+def main_loop(prepared_app: Optional[IBKRApp] = None):
+    """Runs the bot; a connected `prepared_app` (from run_standby) is used for the first trading day."""
+    args = parse_args()
+    if args.profile_startup and bot_startup.profiler is None:
+        bot_startup.enable()
     day_selection = args.check_day
     client_id_to_use = args.client_id if args.client_id is not None else IBKR_CLIENT_ID
+    # Price, status and order events go to api.py over its channel when it started this process
+    events.connect()
+    # Saved config changes reach order building and signal parsing within a second
+    live_config.watch()
+
+    # Option conIds never change before expiry, so the cache outlives each daily cycle and restarts
+    contract_cache = ContractCache(os.path.join(get_user_data_dir(), "contract_cache.json"))
+    contract_cache.load()
+    print(f"Loaded {len(contract_cache)} cached option contract(s).", flush=True)
+    option_chain = None  # Reloaded once per trading day
+    telegram_listener = None  # Reconnected once per trading day
 
     while True:  # <-- This keeps your bot running 24/7
-        app = IBKRApp()
+        prepared, prepared_app = prepared_app, None
+        app = prepared if prepared is not None and prepared.isConnected() else IBKRApp()
         app.tz = pytz.timezone('US/Eastern')
+        settings = current_config()  # Per-day settings, read once per cycle
+        app.status_throttle = StatusThrottle(settings.PRICE_STATUS_HZ)
+        contract_cache.evict_expired()
+        app.contract_cache = contract_cache
         if not hasattr(app, "executions_event"):
             app.executions_event = threading.Event()
 
-        print("Attempting to connect to IBKR...", flush=True)
-        if not connect_with_retry(app, IBKR_HOST, IBKR_PORT, client_id_to_use, attempts=5):
+        if app is prepared:
+            print(f"Using the standby's IBKR connection. Next Order ID: {app.nextOrderId}", flush=True)
+        else:
+            print("Attempting to connect to IBKR...", flush=True)
+        if app is not prepared and not connect_with_retry(app, IBKR_HOST, IBKR_PORT, client_id_to_use, attempts=5):
             print("Connection failed after multiple retries. Will try again in 5 minutes.", flush=True)
+            bot_startup.finish("IBKR connection failed")
             time.sleep(300)
             continue # Restart the connection loop
+        bot_startup.finish("IBKR connected")
 
         try:
-            existing_orders = fetch_existing_orders(app)
+            existing_orders, trigger_conid = fetch_orders_and_trigger_conid(app, attempts=3)
 
             if existing_orders:
                 # Find the highest ID among all open/filled orders fetched
@@ -543,82 +872,94 @@ def main_loop():
                     print(f"Adjusting nextOrderId. API gave {app.nextOrderId}, but max existing is {max_existing_id}. Setting next ID to {new_next_id}.", flush=True)
                     app.nextOrderId = new_next_id
 
-            trigger_conid = get_trigger_conid_with_retry(app, attempts=3)
             if trigger_conid is None:
                 print("Fatal Error: could not fetch SPX conId. Exiting.")
                 app.disconnect(); return
 
+            # One Telegram connection for the whole day; gather_signal_post reads its latest post
+            if telegram_listener is not None:
+                telegram_listener.stop()
+            telegram_listener = TelegramListener()
+            telegram_listener.start()
+
             # Sleep to wait for any async data to settle
             time.sleep(5)
             print("--------------------------", flush=True)
             print("Looking for new signals...", flush=True)
-            signals = gather_signals(allow_manual_fallback=True)
+            signals, signals_message_id = gather_signal_post(allow_manual_fallback=True)
+
+            expiries = {s.expiry for s in signals}
+            if option_chain is None or option_chain.trade_date != today_eastern():
+                option_chain = load_option_chain(app, trigger_conid, expiries, symbol=UNDERLYING_SYMBOL)
+            else:
+                load_expiries(app, option_chain, expiries, symbol=UNDERLYING_SYMBOL)
+            app.option_chain = option_chain
 
             managed_orders: List[ManagedOrder] = []
-            process_and_stage_new_signals(app, signals, managed_orders, existing_orders, trigger_conid)
+            conid_map = resolve_signal_conids(app, signals)
+            process_and_stage_new_signals(app, signals, managed_orders, existing_orders, trigger_conid, conid_map, app.duplicate_index)
+            contract_cache.save()
 
             market_open_time = get_trading_day_open(app.tz, day_selection)
-            app.market_close_time = market_open_time.replace(hour=16, minute=0, second=0, microsecond=0)
+            # 13:00 on half days
+            app.market_close_time = get_calendar().session_close(market_open_time, app.tz)
             print(f"Scheduled market open check for '{day_selection}' open: {market_open_time.strftime('%Y-%m-%d %H:%M:%S %Z')}", flush=True)
             print(f"Staged {len(managed_orders)} order(s). Waiting for market open...", flush=True)
             time.sleep(2)  # Give some time for the app to settle
-            asyncio.run(wait_until_market_open(market_open_time, app.tz))
 
-            # Wait 3 second(s) after market open for IBKR to publish the open bar
-            print(f"Waiting {WAIT_AFTER_OPEN_SECONDS} second(s) after market open for IBKR to publish the official open price...", flush=True)
-            time.sleep(int(WAIT_AFTER_OPEN_SECONDS))
+            # The open is raced from the OPEN tick, the first trade and the daily bar, so the stream
+            # is subscribed before the bell; WAIT_AFTER_OPEN_SECONDS bounds how long an
+            # unconfirmed OPEN tick waits for confirmation
+            clock = ClockOffset()
+            app.open_price_resolver = OpenPriceResolver(market_open_time.timestamp(), market_open_time.strftime("%Y%m%d"), clock)
+            subscribe_spx_stream(app)
+            wait_until_market_open(market_open_time, app.tz, app, clock)
 
-            open_px = fetch_open_price_with_retry(app, UNDERLYING_SYMBOL, attempts=5, wait_secs=3)
+            open_px = resolve_open_price(app, app.open_price_resolver, UNDERLYING_SYMBOL,
+                                         grace=settings.WAIT_AFTER_OPEN_SECONDS, deadline=settings.WAIT_AFTER_OPEN_SECONDS + 15)
             if open_px is None:
                 print(f"Could not get {UNDERLYING_SYMBOL} open price after retries. Please manually transmit orders.", flush=True)
                 app.disconnect(); return
             print(f"{UNDERLYING_SYMBOL} open price: {open_px}", flush=True)
 
+            # Anything posted since the first fetch is staged now, so it gets the same GO/NO-GO check
+            signal_watcher = SignalWatcher(signals, listener=telegram_listener, message_id=signals_message_id)
+            pre_open_diff = signal_watcher.poll()
+            if pre_open_diff.withdrawn or pre_open_diff.triggered:
+                cancel_signal_orders(app, pre_open_diff.withdrawn + pre_open_diff.triggered, managed_orders, failed_conid_signals)
+            if pre_open_diff.added:
+                print(f"Found {len(pre_open_diff.added)} new signal(s) before the open check. Staging...", flush=True)
+                if option_chain is not None:
+                    load_expiries(app, option_chain, {s.expiry for s in pre_open_diff.added}, symbol=UNDERLYING_SYMBOL)
+                process_and_stage_new_signals(app, pre_open_diff.added, managed_orders, [], trigger_conid,
+                                              resolve_signal_conids(app, pre_open_diff.added), app.duplicate_index)
+
             managed_orders.sort(key=lambda x: x.trigger)
             process_managed_orders(app, managed_orders, UNDERLYING_SYMBOL)
-
-            # Start SPX price stream only after market is open
-            start_spx_stream(app, req_id_start=100, tries=3)
-
-            # --- Post-open signal checks at 9:31 ---
-            print("--- Entering post-open signal monitoring phase ---", flush=True)
-
-            # Wait until 9:32:00
-            wait_time_931 = market_open_time.replace(minute=32, second=0)
-            print(f"Waiting until {wait_time_931.strftime('%H:%M:%S %Z')} to check for new signals...", flush=True)
-            time.sleep(max(0, (wait_time_931 - datetime.now(app.tz)).total_seconds()))
-
-            print("--- 9:32:00 AM: Fetching signals and removing initial ones... ---", flush=True)
-            signals_932 = gather_signals(allow_manual_fallback=False)
-
-            # Create a mutable copy of the 9:32 signals to safely remove items from.
-            new_signals_to_process = list(signals_932)
-
-            # For each signal that we processed initially...
-            for initial_signal in signals:
-                # ...try to find and remove one matching signal from the new list.
-                for i, signal_932 in enumerate(new_signals_to_process):
-                    # Check for a match based on core properties
-                    if (initial_signal.expiry == signal_932.expiry and
-                        initial_signal.lc_strike == signal_932.lc_strike and
-                        initial_signal.sc_strike == signal_932.sc_strike and
-                        initial_signal.trigger_price == signal_932.trigger_price):
-                        
-                        # Found a match, "pop" it from the list and stop searching for this initial_signal
-                        new_signals_to_process.pop(i)
-                        break # Move to the next initial_signal
-
-            if not new_signals_to_process:
-                print("No genuinely new signals found at 9:32:00.", flush=True)
-            else:
-                print(f"Found {len(new_signals_to_process)} new signal(s) at 9:32:00. Processing...", flush=True)
-                existing_orders_932 = fetch_existing_orders(app)
-                process_and_stage_new_signals(app, new_signals_to_process, managed_orders, existing_orders_932, trigger_conid)
-                managed_orders.sort(key=lambda x: x.trigger)
-                time.sleep(3)
-                process_managed_orders(app, managed_orders, UNDERLYING_SYMBOL)
-
-            print("--- Post-open signal checks complete. Monitoring for errors. ---", flush=True)
+            session_day = market_open_time.strftime("%Y-%m-%d")
+            try:
+                app.order_latency.save(ORDER_LATENCY_DIR, session_day)  # The open is visible in /api/latency right away
+            except Exception as e:
+                print(f"Failed to save order latency report: {e}", flush=True)
+
+            # The SPX stream was subscribed before the open; re-request it if it is still silent
+            start_spx_stream(app, tries=3, subscribed=True)
+            publish_session_bars(app, market_open_time, app.market_close_time)
+
+            def on_signal_diff(diff: SignalDiff):
+                # Cancels first: every moment a dead signal's order stays working is exposure
+                if diff.withdrawn or diff.triggered:
+                    for w in diff.withdrawn:
+                        print(f"Signal withdrawn from channel: {w.lc_strike}/{w.sc_strike} @ {w.trigger_price} ({w.expiry}).", flush=True)
+                    for t in diff.triggered:
+                        print(f"Signal marked triggered in channel: {t.lc_strike}/{t.sc_strike} @ {t.trigger_price} ({t.expiry}).", flush=True)
+                    cancel_signal_orders(app, diff.withdrawn + diff.triggered, managed_orders, failed_conid_signals)
+                if diff.added:
+                    print(f"Found {len(diff.added)} new signal(s) in channel. Staging...", flush=True)
+                    stage_intraday_signals(app, diff.added, managed_orders, trigger_conid)
+                    contract_cache.save()
+
+            print("--- Watching for new signals and errors until the close. ---", flush=True)
 
             # Display all submitted and existing open orders
 
@@ -637,11 +978,13 @@ def main_loop():
             for order in existing_orders:
                 all_conids.extend(order.get('leg_conIds', []))
             conid_to_strike, conid_to_expiry = app.fetch_contract_details_for_conids(all_conids)
+            contract_cache.save()
             print(format_existing_orders(existing_orders, conid_to_strike, conid_to_expiry))
 
             time.sleep(2)
             # Post-place error retry loop
-            run_post_open_retry_loops(app, managed_orders, failed_conid_signals, trigger_conid, app.market_close_time, app.tz, existing_orders)
+            run_post_open_retry_loops(app, managed_orders, failed_conid_signals, trigger_conid, app.market_close_time, app.tz,
+                                      signal_watcher=signal_watcher, on_signal_diff=on_signal_diff)
 
             # Gather all conIds from existing orders and display them
             all_conids = []
@@ -649,6 +992,7 @@ def main_loop():
             for order in existing_orders:
                 all_conids.extend(order.get('leg_conIds', []))
             conid_to_strike, conid_to_expiry = app.fetch_contract_details_for_conids(all_conids)
+            contract_cache.save()
             print(format_existing_orders(existing_orders, conid_to_strike, conid_to_expiry))
 
             # If the script completes normally, we can break the loop.
@@ -658,6 +1002,11 @@ def main_loop():
                 time.sleep(60)
 
             print("Market close reached. Sleeping until next trading day...", flush=True)
+            events.send(STATUS, phase="closed")
+            print(format_session_summary(app, market_open_time), flush=True)
+            report_order_latency(app, session_day)
+            telegram_listener.stop()
+            telegram_listener = None
             app.disconnect()  # <-- Disconnect from IBKR after market close
             now = datetime.now(app.tz)
             # Calculate next 5AM US/Eastern
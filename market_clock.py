@@ -0,0 +1,109 @@
+# market_clock.py
+
+import math
+import time
+from typing import Callable, List, Optional, Tuple
+
+class ClockOffset:
+    """
+    Estimates server_time - local_time from reqCurrentTime answers.
+
+    TWS reports whole seconds, so an answer T received for a request sent at local
+    time `sent` and answered by `received` says the server clock read somewhere in
+    [T, T + 1) during that round trip, i.e. the offset lies in
+    [T - received, T + 1 - sent]. Intersecting the bounds of several samples narrows
+    the offset far below one second, especially when requests are timed to land
+    right at a server second boundary (see next_probe_time).
+    """
+
+    def __init__(self):
+        self.low = -math.inf
+        self.high = math.inf
+        self.samples: List[Tuple[float, float, int]] = []
+
+    @property
+    def known(self) -> bool:
+        return math.isfinite(self.low) and math.isfinite(self.high)
+
+    @property
+    def offset(self) -> float:
+        """Best estimate in seconds (midpoint of the bounds), 0 if there is no sample yet."""
+        return (self.low + self.high) / 2 if self.known else 0.0
+
+    @property
+    def uncertainty(self) -> float:
+        """Half-width of the bounds in seconds."""
+        return (self.high - self.low) / 2 if self.known else math.inf
+
+    def add_sample(self, sent: float, received: float, server_seconds: int):
+        self.samples.append((sent, received, server_seconds))
+        low, high = server_seconds - received, server_seconds + 1 - sent
+        if low > self.high or high < self.low:
+            # The clocks moved (local clock stepped or drifted); only the newest sample counts
+            self.low, self.high = low, high
+            return
+        self.low, self.high = max(self.low, low), min(self.high, high)
+
+    def next_probe_time(self, now: float, lead: float = 0.5) -> float:
+        """
+        Local time to send the next request so that, per the current estimate, it reaches
+        the server (half the shortest round trip later) just as a new server second starts;
+        which second comes back then tells on which side of the midpoint the true offset lies.
+        """
+        half_rtt = min(received - sent for sent, received, _ in self.samples) / 2 if self.samples else 0.0
+        server_next = math.ceil(now + lead + self.offset)
+        return server_next - self.offset - half_rtt
+
+def sleep_until(target: float, offset: float = 0.0, spin: float = 0.015,
+                on_second: Optional[Callable[[float], None]] = None) -> float:
+    """
+    Sleeps until local time reaches `target` - `offset` (target on the server clock).
+    Sleeps coarsely (calling on_second with the seconds left about once a second),
+    then fine-sleeps and finally spins for the last `spin` seconds (longer than the
+    ~15 ms timer resolution of Windows, so a sleep never overshoots the target).
+    Returns the lateness in seconds on the server clock (negative if early).
+    """
+    local_target = target - offset
+    next_report = 0.0
+    while True:
+        left = local_target - time.time()
+        if left <= 0.05:
+            break
+        now = time.monotonic()
+        if on_second is not None and now >= next_report:
+            on_second(left)
+            next_report = now + 1.0
+        # Wake a little before each whole second of the countdown, and well ahead of the target
+        time.sleep(min(1.0, left - 0.05, max(0.0, left % 1.0) or 1.0))
+    # From here on use the monotonic high-resolution counter, immune to clock adjustments
+    deadline = time.perf_counter() + (local_target - time.time())
+    while True:
+        left = deadline - time.perf_counter()
+        if left <= spin:
+            break
+        time.sleep(max(0.0, (left - spin) / 2))
+    while time.perf_counter() < deadline:
+        pass
+    return time.time() + offset - target
+
+def refine_clock_offset(app, clock: ClockOffset, samples: int = 6, target_uncertainty: float = 0.002,
+                        timeout: float = 2.0) -> ClockOffset:
+    """
+    Takes up to `samples` reqCurrentTime readings (timed with next_probe_time once the
+    offset is roughly known) until the offset is known to within `target_uncertainty`.
+    `app` is an IBKRApp: currentTime() stores server_time/server_time_received and sets
+    current_time_event.
+    """
+    for _ in range(samples):
+        if clock.known:
+            if clock.uncertainty <= target_uncertainty:
+                break
+            time.sleep(max(0.0, clock.next_probe_time(time.time()) - time.time()))
+        app.current_time_event.clear()
+        sent = time.time()
+        app.reqCurrentTime()
+        if not app.current_time_event.wait(timeout):
+            print("No answer to reqCurrentTime; keeping the current clock offset.", flush=True)
+            break
+        clock.add_sample(sent, app.server_time_received, app.server_time)
+    return clock
@@ -0,0 +1,143 @@
+# open_price.py
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Set
+
+# Sources of the open price, in order of authority
+HISTORICAL = "historical"  # Open of today's daily bar
+OPEN_TICK = "open_tick"    # Streaming tickType 14 received after the bell
+FIRST_TRADE = "first_trade"  # First last price after the bell; only ever used as a cross-check
+
+TICK_LAST = 4
+TICK_OPEN = 14
+
+@dataclass
+class OpenQuote:
+    source: str
+    price: float
+    received: float  # Local time.time()
+
+class OpenPriceResolver:
+    """
+    Races the sources of the official open price instead of waiting a fixed time and
+    polling one of them.
+
+    Before the bell the resolver is attached to the app (IBKRApp.open_price_resolver)
+    while the SPX stream is already subscribed; tickPrice and historicalData feed it
+    from the reader thread. From the bell, resolve() repeatedly requests the daily bar
+    (each request with its own reqId) and returns as soon as the open is settled:
+
+    - by the open of a daily bar dated today (before the bell the newest bar is the
+      previous session's), which wins over any other source, or
+    - by an OPEN tick received after the bell that differs from the OPEN tick TWS showed
+      before it, once the first trade after the bell confirms it within `tolerance` points.
+
+    An unconfirmed OPEN tick is accepted after `grace` seconds. Each source's delay after
+    the bell is kept in `latencies`.
+    """
+
+    def __init__(self, open_time: float, session_date: str, clock=None, tolerance: float = 1.0):
+        self.open_time = open_time  # Epoch seconds of the bell on the exchange clock
+        self.session_date = session_date  # YYYYMMDD of the session
+        self.clock = clock  # Optional ClockOffset, refined while the resolver is already attached
+        self.tolerance = tolerance
+        self.quotes: Dict[str, OpenQuote] = {}
+        self.latencies: Dict[str, float] = {}
+        self.stale_open: Optional[float] = None  # Last OPEN tick before the bell
+        self._hist_reqids: Set[int] = set()
+        self._cond = threading.Condition()
+
+    @property
+    def offset(self) -> float:
+        """Exchange clock - local clock, in seconds."""
+        return self.clock.offset if self.clock is not None else 0.0
+
+    # --- Feeds (reader thread) ---
+
+    def _after_bell(self, received: float) -> bool:
+        return received + self.offset >= self.open_time
+
+    def _record(self, source: str, price: float, received: float):
+        with self._cond:
+            if source in self.quotes:
+                return
+            self.quotes[source] = OpenQuote(source, price, received)
+            self.latencies[source] = received + self.offset - self.open_time
+            self._cond.notify_all()
+
+    def on_tick(self, tick_type: int, price: float, received: Optional[float] = None):
+        if price is None or price <= 0:
+            return
+        received = time.time() if received is None else received
+        if tick_type == TICK_OPEN:
+            if not self._after_bell(received):
+                self.stale_open = price
+            elif price != self.stale_open:
+                self._record(OPEN_TICK, price, received)
+        elif tick_type == TICK_LAST and self._after_bell(received):
+            self._record(FIRST_TRADE, price, received)
+
+    def owns(self, req_id: int) -> bool:
+        return req_id in self._hist_reqids
+
+    def on_historical_bar(self, req_id: int, bar_date: str, open_price: float, received: Optional[float] = None):
+        # Before the bell (or right at it) the newest daily bar is still the previous session's
+        if str(bar_date).replace("-", "")[:8] != self.session_date:
+            return
+        self._record(HISTORICAL, open_price, time.time() if received is None else received)
+
+    # --- Decision (main thread) ---
+
+    def decide(self) -> Optional[OpenQuote]:
+        """The open price if the quotes so far settle it, else None."""
+        with self._cond:
+            hist, tick, trade = (self.quotes.get(s) for s in (HISTORICAL, OPEN_TICK, FIRST_TRADE))
+        if hist is not None:
+            for other in (tick, trade):
+                if other is not None and abs(other.price - hist.price) > self.tolerance:
+                    print(f"Open price sources disagree: daily bar {hist.price} vs {other.source} {other.price}. Using the daily bar.", flush=True)
+            return hist
+        if tick is not None and trade is not None and abs(tick.price - trade.price) <= self.tolerance:
+            return tick
+        return None
+
+    def resolve(self, new_reqid: Callable[[], int], request_historical: Callable[[int], None], grace: float,
+                deadline: float, historical_interval: float = 1.0) -> Optional[OpenQuote]:
+        """
+        Blocks until the open price is settled or `deadline` seconds pass, counted from the
+        bell or, when the bot starts after it, from this call. At least one daily bar
+        request is always sent. `request_historical(req_id)` sends one daily bar request;
+        every request gets a new reqId. After `grace` seconds an unconfirmed OPEN tick is accepted.
+        """
+        start = max(self.open_time, time.time() + self.offset)
+        next_request = 0.0
+        while True:
+            with self._cond:
+                seen = len(self.quotes)
+            elapsed = time.time() + self.offset - start
+            quote = self.decide()
+            if quote is not None:
+                return quote
+            if elapsed >= grace:
+                with self._cond:
+                    fallback = self.quotes.get(OPEN_TICK)
+                if fallback is not None:
+                    print(f"Accepting unconfirmed open price {fallback.price} from {fallback.source} after {grace:.0f}s.", flush=True)
+                    return fallback
+            if elapsed >= deadline and self._hist_reqids:
+                return None
+            if HISTORICAL not in self.quotes and time.monotonic() >= next_request:
+                req_id = new_reqid()
+                self._hist_reqids.add(req_id)  # Before the request, so the answer is never dropped
+                request_historical(req_id)
+                next_request = time.monotonic() + historical_interval
+            with self._cond:
+                if len(self.quotes) == seen:  # Nothing arrived while deciding
+                    self._cond.wait(timeout=min(historical_interval, max(0.01, deadline - elapsed)))
+
+    def format_latencies(self) -> str:
+        parts = [f"{source} {self.latencies[source] * 1000:+.0f} ms" for source in (OPEN_TICK, FIRST_TRADE, HISTORICAL)
+                 if source in self.latencies]
+        return "Open price source latency after the bell: " + (", ".join(parts) if parts else "no source answered")
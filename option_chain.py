@@ -0,0 +1,114 @@
+# option_chain.py
+
+import bisect
+from typing import Dict, Iterable, List, Optional
+
+from ibapi.contract import Contract
+
+from contract_cache import today_eastern
+
+class OptionChain:
+    """
+    Listed strikes of one trading class, kept as sorted lists so the nearest
+    listed strike can be found with a binary search.
+    """
+
+    def __init__(self, trading_class: str, trade_date: str, expirations: Iterable[str] = (), strikes: Iterable[float] = ()):
+        self.trading_class = trading_class
+        self.trade_date = trade_date
+        self.expirations = set(expirations)
+        # Union of strikes over all expirations, as reported by reqSecDefOptParams
+        self.strikes = sorted(float(k) for k in strikes)
+        # Exact strikes per expiry, from a wildcard contract details request
+        self.listed: Dict[str, List[float]] = {}
+
+    def add_listed(self, expiry: str, strikes: Iterable[float]):
+        self.listed[expiry] = sorted(set(float(k) for k in strikes))
+        self.expirations.add(expiry)
+
+    def strikes_for(self, expiry: str) -> List[float]:
+        if expiry in self.listed:
+            return self.listed[expiry]
+        return self.strikes if expiry in self.expirations else []
+
+    def has_expiry(self, expiry: str) -> bool:
+        return bool(self.strikes_for(expiry))
+
+    def has_listed(self, expiry: str) -> bool:
+        """True when the exact strikes of `expiry` are loaded, not just the union over expirations."""
+        return bool(self.listed.get(expiry))
+
+    def is_listed(self, expiry: str, strike: float) -> bool:
+        strikes = self.strikes_for(expiry)
+        i = bisect.bisect_left(strikes, float(strike))
+        return i < len(strikes) and strikes[i] == float(strike)
+
+    def snap(self, expiry: str, strike: float, direction: str = "nearest") -> Optional[float]:
+        """
+        Returns the listed strike closest to `strike`.
+        direction "down" only considers strikes <= strike, "up" only strikes >= strike.
+        Returns None when the expiry is unknown or no strike exists in that direction.
+        """
+        strikes = self.strikes_for(expiry)
+        if not strikes:
+            return None
+        strike = float(strike)
+        i = bisect.bisect_left(strikes, strike)
+        if i < len(strikes) and strikes[i] == strike:
+            return strike
+        below = strikes[i - 1] if i > 0 else None
+        above = strikes[i] if i < len(strikes) else None
+        if direction == "down":
+            return below
+        if direction == "up":
+            return above
+        if below is None or above is None:
+            return below if above is None else above
+        return below if strike - below <= above - strike else above
+
+def build_expiry_contract(symbol: str, trading_class: str, expiry: str, right: str = "C") -> Contract:
+    """An option contract with the strike left unset, matching every strike of the expiry."""
+    contract = Contract()
+    contract.symbol = symbol
+    contract.secType = "OPT"
+    contract.exchange = "SMART"
+    contract.currency = "USD"
+    contract.lastTradeDateOrContractMonth = expiry
+    contract.right = right
+    contract.multiplier = "100"
+    contract.tradingClass = trading_class
+    return contract
+
+def load_expiries(app, chain: OptionChain, expiries: Iterable[str], symbol: str = "SPX", right: str = "C"):
+    """
+    Loads the exact listed strikes of each expiry not yet in the chain with one wildcard
+    contract details request per expiry. The contractDetails callback also fills the
+    contract cache, so staging these legs later needs no further requests.
+    """
+    for expiry in sorted(set(expiries) - set(chain.listed)):
+        try:
+            details = app.get_all_contract_details(build_expiry_contract(symbol, chain.trading_class, expiry, right))
+        except Exception as e:
+            print(f"Could not load {chain.trading_class} strikes for {expiry}: {e}", flush=True)
+            continue
+        if details:
+            chain.add_listed(expiry, [d.contract.strike for d in details])
+            print(f"Loaded {len(chain.listed[expiry])} listed {chain.trading_class} strike(s) for {expiry}.", flush=True)
+        else:
+            print(f"No listed {chain.trading_class} strikes found for {expiry}.", flush=True)
+
+def load_option_chain(app, underlying_conid: int, expiries: Iterable[str], symbol: str = "SPX", trading_class: str = "SPXW") -> Optional[OptionChain]:
+    """
+    Pulls the strike/expiry grid of `trading_class` once, then the exact strikes of `expiries`.
+    Returns None if the chain parameters could not be fetched.
+    """
+    try:
+        params = app.get_option_chain_params(symbol, underlying_conid)
+    except Exception as e:
+        print(f"Could not load {trading_class} option chain: {e}", flush=True)
+        return None
+    expirations, strikes = params.get(trading_class, (set(), set()))
+    chain = OptionChain(trading_class, today_eastern(), expirations, strikes)
+    print(f"Loaded {trading_class} option chain: {len(chain.expirations)} expirations, {len(chain.strikes)} strikes.", flush=True)
+    load_expiries(app, chain, expiries, symbol)
+    return chain
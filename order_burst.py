@@ -0,0 +1,60 @@
+# order_burst.py
+
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+@dataclass
+class BurstResult:
+    go: list = field(default_factory=list)         # Orders transmitted, in send order
+    no_go: list = field(default_factory=list)      # Orders whose trigger the open reached
+    cancelled: List[int] = field(default_factory=list)  # IDs a cancel was actually sent for
+    sent_at: List[float] = field(default_factory=list)  # perf_counter() after each transmit, parallel to go
+    started: float = 0.0
+    finished: float = 0.0
+
+    @property
+    def transmit_spread(self) -> float:
+        """Seconds from the first to the last transmit returning."""
+        return self.sent_at[-1] - self.sent_at[0] if self.sent_at else 0.0
+
+    def summary(self) -> str:
+        return (f"Open burst: {len(self.go)} transmit(s), {len(self.cancelled)} cancel(s) in "
+                f"{(self.finished - self.started) * 1000:.2f} ms (first to last transmit "
+                f"{self.transmit_spread * 1000:.2f} ms).")
+
+def partition_by_open(orders: list, open_price: float) -> Tuple[list, list]:
+    """
+    Splits trigger-sorted orders into (NO-GO, GO) with one binary search: an order is
+    NO-GO when the open is at or above its trigger.
+    """
+    cut = bisect_right(orders, open_price, key=lambda o: o.trigger)
+    return orders[:cut], orders[cut:]
+
+def transmit_burst(app, orders: list, open_price: float) -> BurstResult:
+    """
+    Transmits the GO orders and then cancels the NO-GO ones back to back, doing every
+    other step (partition, order mutation, logging) before or after the burst.
+    `orders` must be sorted by trigger.
+
+    Each placeOrder still serializes its contract and order inside EClient; the stock
+    client offers no way to send a pre-encoded message, so the burst keeps only that
+    and the socket write between consecutive orders.
+    """
+    result = BurstResult()
+    result.no_go, result.go = partition_by_open(orders, open_price)
+    for mo in result.go:
+        mo.order_obj.transmit = True
+    sent_at = [0.0] * len(result.go)
+    place_order, clock = app.placeOrder, time.perf_counter
+
+    result.started = clock()
+    for i, mo in enumerate(result.go):
+        place_order(mo.id, mo.contract, mo.order_obj)
+        sent_at[i] = clock()
+    if result.no_go:
+        result.cancelled = app.cancel_orders([mo.id for mo in result.no_go])
+    result.finished = clock()
+    result.sent_at = sent_at
+    return result
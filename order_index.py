@@ -0,0 +1,80 @@
+# order_index.py
+
+import itertools
+import threading
+from collections import Counter
+from typing import Hashable, Iterable, Optional, Tuple
+
+DuplicateKey = Tuple[Tuple[int, ...], Optional[float]]
+
+_anonymous_ids = itertools.count()
+
+def duplicate_key(leg_ids: Iterable[int], trigger_price) -> DuplicateKey:
+    """The identity of a combo order for duplicate detection: sorted leg conIds and trigger price."""
+    trigger = float(trigger_price) if trigger_price is not None else None
+    return tuple(sorted(leg_ids)), trigger
+
+class DuplicateIndex:
+    """
+    Number of orders per (sorted leg conIds, trigger price), so checking a signal
+    against hundreds of resting orders is a dict lookup.
+    Orders are tracked by order ID, so repeated openOrder callbacks for the same
+    order, or an order that is both staged and reported by TWS, count once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._keys = {}  # order ID -> DuplicateKey
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, order_id: Hashable, leg_ids: Iterable[int], trigger_price):
+        key = duplicate_key(leg_ids, trigger_price)
+        with self._lock:
+            old = self._keys.get(order_id)
+            if old == key:
+                return
+            if old is not None:
+                self._decrement(old)
+            self._keys[order_id] = key
+            self._counts[key] += 1
+
+    def discard(self, order_id: Hashable):
+        with self._lock:
+            old = self._keys.pop(order_id, None)
+            if old is not None:
+                self._decrement(old)
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+            self._keys.clear()
+
+    def count(self, leg_ids: Iterable[int], trigger_price) -> int:
+        return self._counts.get(duplicate_key(leg_ids, trigger_price), 0)
+
+    def is_duplicate(self, leg_ids: Iterable[int], trigger_price, allowed_duplicates: int) -> bool:
+        """True if placing another order would exceed `allowed_duplicates` matching orders."""
+        return self.count(leg_ids, trigger_price) >= allowed_duplicates
+
+    def _decrement(self, key: DuplicateKey):
+        self._counts[key] -= 1
+        if self._counts[key] <= 0:
+            del self._counts[key]
+
+    @classmethod
+    def from_orders(cls, existing_orders, managed_orders) -> "DuplicateIndex":
+        """Builds an index from open order dicts (as from IBKRApp.openOrder) and ManagedOrders."""
+        index = cls()
+        for order in existing_orders:
+            if order.get("secType") != "BAG":
+                continue
+            order_id = order.get("orderId")
+            if order_id is None:
+                order_id = ("anonymous", next(_anonymous_ids))
+            index.add(order_id, order.get("leg_conIds", []), order.get("trigger_price"))
+        for mo in managed_orders:
+            index.add(mo.id, [leg.conId for leg in mo.contract.comboLegs], mo.trigger)
+        return index
@@ -0,0 +1,114 @@
+# order_latency.py
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds (ms) of the histogram buckets; the last bucket takes everything slower
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+class LatencyHistogram:
+    """Sample counts per bucket of BUCKETS_MS plus count/sum/min/max, all O(1) per sample."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms: Optional[float] = None
+
+    def add(self, ms: float):
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = ms if self.max_ms is None else max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th percentile (max_ms for the overflow bucket)."""
+        if not self.count:
+            return None
+        rank, seen = q / 100 * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {"buckets_ms": list(BUCKETS_MS), "counts": self.counts, "count": self.count,
+                "mean_ms": self.total_ms / self.count if self.count else None,
+                "min_ms": self.min_ms, "max_ms": self.max_ms,
+                "p50_ms": self.percentile(50), "p95_ms": self.percentile(95)}
+
+class OrderLatencyTracker:
+    """
+    Per-order lifecycle timestamps from time.perf_counter(): each placeOrder/cancelOrder
+    starts a new attempt, and the first openOrder and each first orderStatus status after it
+    (PreSubmitted, Submitted, Filled, Cancelled, Inactive, ...) add a sample to the
+    histogram of that stage, e.g. "place→Submitted" or "cancel→Cancelled".
+    "Submitted→Filled" is kept apart, since it is the market rather than the round trip.
+
+    Comparing the stages shows where time goes: place→openOrder is our process and TWS,
+    the gap from place→PreSubmitted to place→Submitted is TWS and the exchange, and
+    cancel→Cancelled is the whole cancel round trip.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()  # record() re-enters from event()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._attempts: Dict[int, Tuple[str, float, Dict[str, float]]] = {}  # orderId -> (kind, sent, {event: t})
+
+    def sent(self, order_id: int, kind: str = "place", at: Optional[float] = None):
+        at = time.perf_counter() if at is None else at
+        with self._lock:
+            self._attempts[order_id] = (kind, at, {})
+
+    def event(self, order_id: int, name: str, at: Optional[float] = None):
+        """Records an openOrder ("openOrder") or orderStatus status for the order's current attempt."""
+        at = time.perf_counter() if at is None else at
+        with self._lock:
+            attempt = self._attempts.get(order_id)
+            if attempt is None:
+                return
+            kind, sent, seen = attempt
+            if name in seen:
+                return
+            seen[name] = at
+            self.record(f"{kind}→{name}", at - sent)
+            if name == "Filled" and "Submitted" in seen:
+                self.record("Submitted→Filled", at - seen["Submitted"])
+
+    def record(self, stage: str, seconds: float):
+        """Adds a sample to a stage's histogram (also for timings measured elsewhere)."""
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.add(seconds * 1000)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {stage: h.to_dict() for stage, h in sorted(self.histograms.items())}
+
+    def format_report(self) -> List[str]:
+        lines = []
+        for stage, h in self.snapshot().items():
+            lines.append(f"{stage}: n={h['count']} mean={h['mean_ms']:.1f} ms p50<={h['p50_ms']:g} ms "
+                         f"p95<={h['p95_ms']:g} ms max={h['max_ms']:.1f} ms")
+        return lines
+
+    def save(self, directory: str, day: str):
+        """Writes the day's histograms to <directory>/<day>.json (read by /api/latency)."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{day}.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"date": day, "stages": self.snapshot()}, f, indent=2)
+        os.replace(tmp, path)
+        return path
@@ -0,0 +1,145 @@
+# processed_store.py
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+class ProcessedSignalStore:
+    """
+    Set of processed signal hashes backed by an append-only journal.
+
+    The journal is read once into memory, so lookups are O(1) however long it has grown.
+    Each line is "<hash>\\t<unix time>"; plain "<hash>" lines from older versions are
+    accepted and dated at load time. New hashes are buffered and appended in one write
+    per flush, optionally followed by fsync. The journal is rewritten without entries
+    older than `max_age_days` once it holds `compact_ratio` times more lines than live
+    hashes, or on load if anything has aged out.
+
+    The bot subprocess can be killed mid-write and restarted by api.py: a torn last line
+    is cut off on load, and compaction replaces the file atomically.
+    """
+
+    def __init__(self, path: str, max_age_days: float = 90, fsync: bool = True, flush_every: int = 1,
+                 compact_ratio: float = 2.0, min_compact_lines: int = 1000):
+        self.path = path
+        self.max_age_seconds = max_age_days * 86400
+        self.fsync = fsync
+        self.flush_every = flush_every
+        self.compact_ratio = compact_ratio
+        self.min_compact_lines = min_compact_lines
+        self._lock = threading.Lock()
+        self._seen: Dict[str, float] = {}
+        self._buffer: List[str] = []
+        self._journal_lines = 0
+        self._file = None
+        self._inode = None
+        self.load()
+
+    def __contains__(self, hash_str: str) -> bool:
+        return hash_str in self._seen
+
+    def __len__(self):
+        return len(self._seen)
+
+    def load(self):
+        """(Re)reads the journal into memory and compacts it if entries have aged out."""
+        now = time.time()
+        seen: Dict[str, float] = {}
+        lines = 0
+        torn = False
+        try:
+            with open(self.path, 'r', encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        torn = True  # Torn write from a killed process
+                        break
+                    parts = line.split()
+                    if not parts:
+                        continue
+                    lines += 1
+                    try:
+                        ts = float(parts[1]) if len(parts) > 1 else now
+                    except ValueError:
+                        continue
+                    seen[parts[0]] = max(ts, seen.get(parts[0], 0.0))
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self._close_file()
+            if torn:
+                # Cut the partial line off, or the next append would be joined onto it
+                with open(self.path, 'rb+') as f:
+                    f.truncate(f.read().rfind(b'\n') + 1)
+            self._seen = seen
+            self._journal_lines = lines
+        if any(now - ts > self.max_age_seconds for ts in seen.values()):
+            self.compact(now)
+
+    def add(self, hash_str: str, ts: Optional[float] = None):
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            self._seen[hash_str] = ts
+            self._buffer.append(f"{hash_str}\t{int(ts)}\n")
+            should_flush = len(self._buffer) >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """Appends buffered hashes to the journal in a single write."""
+        with self._lock:
+            if not self._buffer:
+                return
+            data = "".join(self._buffer)
+            count = len(self._buffer)
+            self._buffer = []
+            f = self._open_file()
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            self._journal_lines += count
+            needs_compaction = self._journal_lines >= max(self.min_compact_lines, self.compact_ratio * len(self._seen))
+        if needs_compaction:
+            self.compact()
+
+    def compact(self, now: Optional[float] = None):
+        """Atomically rewrites the journal with only the live, unexpired hashes."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._seen = {h: ts for h, ts in self._seen.items() if now - ts <= self.max_age_seconds}
+            self._close_file()
+            tmp = self.path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.writelines(f"{h}\t{int(ts)}\n" for h, ts in self._seen.items())
+                f.writelines(self._buffer)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self._journal_lines = len(self._seen)
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._close_file()
+
+    def _open_file(self):
+        # Reopen if another process compacted (replaced) the journal since we opened it
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            inode = None
+        if self._file is None or inode != self._inode:
+            self._close_file()
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._inode = os.fstat(self._file.fileno()).st_ino
+        return self._file
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            finally:
+                self._file = None
+                self._inode = None
@@ -1,21 +1,30 @@
-import { useEffect, useState, useCallback } from "react";
+import { useEffect, useState, useCallback, useRef } from "react";
 import { Tabs, Tab, Snackbar, Alert, IconButton } from "@mui/material";
 import PowerSettingsNewIcon from '@mui/icons-material/PowerSettingsNew';
 import ConfigForm from "./components/ConfigForm";
 import BotConsole from "./components/BotConsole";
 import ConsoleHistory from "./components/ConsoleHistory";
 import { io, Socket } from "socket.io-client";
+import { applyBotEvent, emptyBotState } from "./utils/botEvents";
+import type { BotEvent, BotState } from "./utils/botEvents";
+
+type OutputEntry = { seq: number; line: string };
+type OutputFrame = { entries: OutputEntry[]; prev_seq: number; last_seq: number };
 
 function App() {
   const [tab, setTab] = useState(1);
   const [config, setConfig] = useState<Record<string, string>>({});
   const [output, setOutput] = useState<string[]>([]);
+  const [botState, setBotState] = useState<BotState>(emptyBotState);
   const [botRunning, setBotRunning] = useState(false);
   const [botLoading, setBotLoading] = useState(false);
   const [saving, setSaving] = useState(false);
   const [snackbar, setSnackbar] = useState<{ open: boolean; message: string; severity: "success" | "error" }>({ open: false, message: "", severity: "success" });
   const [inputValue, setInputValue] = useState("");
   const [isShuttingDown, setIsShuttingDown] = useState(false);
+  // Console entries by id and the last sequence number applied; frames and resyncs patch these
+  const entriesRef = useRef<OutputEntry[]>([]);
+  const lastSeqRef = useRef(0);
 
   const sleep = (ms: number) => new Promise((r) => setTimeout(r, ms));
   const isAbortError = (e: unknown) =>
@@ -58,32 +67,77 @@ function App() {
     let mounted = true;
     const controller = new AbortController();
 
+    // Applies changed entries: a known id can only be the last entry (a status line update)
+    const applyEntries = (entries: OutputEntry[], lastSeq: number, reset = false) => {
+      const current = reset ? [] : [...entriesRef.current];
+      for (const entry of entries) {
+        if (current.length && current[current.length - 1].seq === entry.seq) {
+          current[current.length - 1] = entry;
+        } else if (!current.length || current[current.length - 1].seq < entry.seq) {
+          current.push(entry);
+        }
+      }
+      entriesRef.current = current;
+      lastSeqRef.current = lastSeq;
+      setOutput(current.map(e => e.line));
+    };
+
+    let resyncing = false;
+    const resync = async () => {
+      if (resyncing) return;
+      resyncing = true;
+      try {
+        const res = await fetchWithRetry(`/api/output?since=${lastSeqRef.current}`, { signal: controller.signal });
+        const data: { entries: OutputEntry[]; last_seq: number; reset: boolean } = await res.json();
+        if (mounted) applyEntries(data.entries ?? [], data.last_seq, data.reset);
+      } catch (e) {
+        if (!isAbortError(e)) console.error("Failed to resync console output", e);
+      } finally {
+        resyncing = false;
+      }
+    };
+
     // --- WebSocket Connection ---
     const socket: Socket = io(`http://${window.location.hostname}:9527`);
-    socket.on("output", (data: { line: string }) => {
-      if (mounted) {
-        setOutput(prev => [...prev, data.line]);
+    // Entries arrive in batches, one frame per emit interval; a gap in the sequence means
+    // frames were missed (e.g. while reconnecting), so fetch what changed since the last one
+    socket.on("output", (data: OutputFrame) => {
+      if (!mounted || !data.entries) return;
+      if (resyncing || data.prev_seq !== lastSeqRef.current) {
+        resync();
+        return;
       }
+      applyEntries(data.entries, data.last_seq);
+    });
+    socket.on("connect", () => {
+      if (mounted && lastSeqRef.current) resync();
+    });
+    // Price, status and order state arrive as typed events, not console lines
+    socket.on("bot_event", (event: BotEvent) => {
+      if (mounted) setBotState(prev => applyBotEvent(prev, event));
     });
     // --- End WebSocket ---
 
     const init = async () => {
       // Fetch all initial state concurrently for speed
       try {
-        const [configRes, statusRes, outputRes] = await Promise.all([
+        const [configRes, statusRes, outputRes, stateRes] = await Promise.all([
           fetchWithRetry("/api/config", { signal: controller.signal }),
           fetchWithRetry("/api/status", { signal: controller.signal }),
           fetchWithRetry("/api/output", { signal: controller.signal }), // <-- Fetch output history
+          fetchWithRetry("/api/state", { signal: controller.signal }),
         ]);
         
         const configData = await configRes.json();
         const statusData: { running?: boolean } = await statusRes.json();
-        const outputData: { output?: string[] } = await outputRes.json(); // <-- Get output history
+        const outputData: { entries?: OutputEntry[]; last_seq?: number } = await outputRes.json(); // <-- Get output history
+        const stateData: BotState = await stateRes.json();
 
         if (mounted) {
           setConfig(configData);
           if (typeof statusData.running === "boolean") setBotRunning(statusData.running);
-          setOutput(outputData.output ?? []); // <-- Set initial output state
+          applyEntries(outputData.entries ?? [], outputData.last_seq ?? 0, true); // <-- Set initial output state
+          setBotState({ ...emptyBotState, ...stateData });
         }
       } catch (e) {
         if (!isAbortError(e)) {
@@ -153,7 +207,10 @@ function App() {
 
   const resetBotState = useCallback(() => {
     setBotRunning(false);
+    // lastSeqRef is kept: the server's clear leaves a sequence gap that triggers a resync
+    entriesRef.current = [];
     setOutput([]);
+    setBotState(emptyBotState);
     setInputValue("");
     // Optionally reset config, snackbar, etc.
   }, []);
@@ -240,6 +297,7 @@ function App() {
         {tab === 1 && (
           <BotConsole
             output={output}
+            botState={botState}
             botRunning={botRunning}
             botLoading={botLoading}
             startBot={startBot}
@@ -2,9 +2,12 @@ import React, { useRef, useEffect, useState, useMemo } from "react";
 import { Box, Button, Typography, TextField, IconButton } from "@mui/material";
 import { stripTimestamp, dedupeCountdowns } from "../utils/consoleUtils";
 import ArrowDownwardIcon from "@mui/icons-material/ArrowDownward";
+import { formatCountdown } from "../utils/botEvents";
+import type { BotState, StatusFields } from "../utils/botEvents";
 
 interface BotConsoleProps {
   output: string[];
+  botState: BotState;
   botRunning: boolean;
   botLoading: boolean;
   startBot: () => void;
@@ -16,6 +19,7 @@ interface BotConsoleProps {
 
 const BotConsole: React.FC<BotConsoleProps> = ({
   output,
+  botState,
   botRunning,
   botLoading,
   startBot,
@@ -65,6 +69,63 @@ const BotConsole: React.FC<BotConsoleProps> = ({
     fontSize: 15,
   };
 
+  const renderStatusUpdate = (status: StatusFields, key: React.Key) => (
+    <Box key={key} sx={bubbleStyle}>
+      <strong>Status Update:</strong>
+      <div>
+        <u>Error Orders</u>:
+        {(status.error_orders ?? []).length === 0 ? (
+          <span> None</span>
+        ) : (
+          <ul style={{ margin: 0, paddingLeft: 16 }}>
+            {(status.error_orders ?? []).map((order, idx) => (
+              <li key={idx}>
+                Order ID: {order.orderId}, Symbol: {order.symbol}, Type: {order.order_type}, Trigger: {order.trigger_price}
+              </li>
+            ))}
+          </ul>
+        )}
+      </div>
+      <div>
+        <u>Failed Signals (conId)</u>:
+        {(status.failed_conid_signals ?? []).length === 0 ? (
+          <span> None</span>
+        ) : (
+          <ul style={{ margin: 0, paddingLeft: 16 }}>
+            {(status.failed_conid_signals ?? []).map((sig, idx) => (
+              <li key={idx}>
+                Expiry: {sig.expiry}, LC: {sig.lc_strike}, SC: {sig.sc_strike}, Trigger: {sig.trigger_price}
+              </li>
+            ))}
+          </ul>
+        )}
+      </div>
+    </Box>
+  );
+
+  // The live line the bot used to print and rewrite: price with the close countdown, or the open countdown
+  const { price, status, orders, bars, log } = botState;
+  let liveLine: string | null = null;
+  if (price && status.phase !== "waiting_open") {
+    liveLine = price.close_seconds === null
+      ? `Live SPX Price: ${price.price}`
+      : price.close_seconds > 0
+        ? `Live SPX Price: ${price.price} | Market Close Countdown: ${formatCountdown(price.close_seconds)}`
+        : `Live SPX Price: ${price.price} | Market closed | Countdown: 00:00:00`;
+  } else if (status.phase === "waiting_open" && status.open_seconds !== undefined) {
+    liveLine = `Waiting for market open: ${formatCountdown(status.open_seconds)} remaining...`;
+  }
+  const recentOrders = Object.values(orders).slice(-10);
+  // Session range from the bot's one-minute bars
+  let sessionLine: string | null = null;
+  if (bars && bars.bars.length > 0) {
+    const high = Math.max(...bars.bars.map(b => b.high));
+    const low = Math.min(...bars.bars.map(b => b.low));
+    sessionLine = `SPX session: O ${bars.bars[0].open} H ${high} L ${low} C ${bars.bars[bars.bars.length - 1].close}`
+      + (bars.vwap !== null ? ` VWAP ${bars.vwap.toFixed(2)}` : "");
+  }
+  const lastWarning = log.length > 0 ? log[log.length - 1] : undefined;
+
   // compute deduped output locally (App does not provide it)
   const dedupedOutput = useMemo(() => dedupeCountdowns(output), [output]);
 
@@ -170,6 +231,32 @@ const BotConsole: React.FC<BotConsoleProps> = ({
         )}
       </Box>
 
+      {(liveLine || sessionLine || recentOrders.length > 0 || status.error_orders || status.failed_conid_signals || lastWarning) && (
+        <Box sx={{ display: "flex", flexDirection: "column", mb: 2 }}>
+          {liveLine && <Box sx={{ ...bubbleStyle, maxWidth: "100%" }}>{liveLine}</Box>}
+          {sessionLine && <Box sx={{ ...bubbleStyle, maxWidth: "100%" }}>{sessionLine}</Box>}
+          {(status.error_orders || status.failed_conid_signals) && renderStatusUpdate(status, "status")}
+          {recentOrders.length > 0 && (
+            <Box sx={bubbleStyle}>
+              <strong>Orders:</strong>
+              <ul style={{ margin: 0, paddingLeft: 16 }}>
+                {recentOrders.map(o => (
+                  <li key={o.order_id}>
+                    Order ID: {o.order_id}, Status: {o.status}, Filled: {o.filled}, Remaining: {o.remaining}
+                    {o.filled > 0 && `, Avg Fill: ${o.avg_fill_price}`}
+                  </li>
+                ))}
+              </ul>
+            </Box>
+          )}
+          {lastWarning && (
+            <Box sx={bubbleStyle}>
+              <strong>Last TWS message:</strong> Code {lastWarning.code} - {lastWarning.message}
+            </Box>
+          )}
+        </Box>
+      )}
+
       <Box
         ref={consoleRef}
         sx={{
@@ -218,39 +305,7 @@ const BotConsole: React.FC<BotConsoleProps> = ({
                 try {
                   const jsonStr = cleanLine.replace("STATUS_UPDATE::", "");
                   const status = JSON.parse(jsonStr);
-                  return (
-                    <Box key={i} sx={bubbleStyle}>
-                      <strong>Status Update:</strong>
-                      <div>
-                        <u>Error Orders</u>:
-                        {status.error_orders.length === 0 ? (
-                          <span> None</span>
-                        ) : (
-                          <ul style={{ margin: 0, paddingLeft: 16 }}>
-                            {status.error_orders.map((order, idx) => (
-                              <li key={idx}>
-                                Order ID: {order.orderId}, Symbol: {order.symbol}, Type: {order.order_type}, Trigger: {order.trigger_price}
-                              </li>
-                            ))}
-                          </ul>
-                        )}
-                      </div>
-                      <div>
-                        <u>Failed Signals (conId)</u>:
-                        {status.failed_conid_signals.length === 0 ? (
-                          <span> None</span>
-                        ) : (
-                          <ul style={{ margin: 0, paddingLeft: 16 }}>
-                            {status.failed_conid_signals.map((sig, idx) => (
-                              <li key={idx}>
-                                Expiry: {sig.expiry}, LC: {sig.lc_strike}, SC: {sig.sc_strike}, Trigger: {sig.trigger_price}
-                              </li>
-                            ))}
-                          </ul>
-                        )}
-                      </div>
-                    </Box>
-                  );
+                  return renderStatusUpdate(status, i);
                 } catch {
                   return <Box key={i} sx={bubbleStyle}>{cleanLine}</Box>;
                 }
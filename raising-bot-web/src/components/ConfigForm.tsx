@@ -5,6 +5,12 @@ const ORDER_TYPES = [
   "SNAP MID", "SNAP MKT", "LMT", "MKT", "PEG MID"
 ];
 
+const STANDBY_MODES = [
+  { value: "off", label: "Off" },
+  { value: "warm", label: "Warm (modules and calendar loaded)" },
+  { value: "connected", label: "Connected (also holds a TWS connection)" },
+];
+
 const CONFIG_FIELDS = [
   { key: "IBKR_ACCOUNT", label: "IBKR Account Number", required: true },
   { key: "IBKR_PORT", label: "IBKR Port", required: true, helper: "Live account is 7496, Paper account is 7497, please confirm it yourself" },
@@ -12,12 +18,14 @@ const CONFIG_FIELDS = [
   { key: "TELEGRAM_API_HASH", label: "Telegram API Hash", required: false },
   { key: "TELEGRAM_CHANNEL", label: "Telegram Channel", required: false, helper: "Optional, e.g. @RaisingCycle_Notification_bot" },
   { key: "IBKR_HOST", label: "IBKR Host", required: true, helper: "Usually '127.0.0.1'" },
-  { key: "IBKR_CLIENT_ID", label: "IBKR Client ID", required: true, helper: "Just put in a random number" },
+  { key: "IBKR_CLIENT_ID", label: "IBKR Client ID", required: true, helper: "Just put in a random number. The bot uses this ID and the next one." },
   { key: "SNAPMID_OFFSET", label: "Midpoint Offset", required: true, helper: "Offset for SNAP MID and PEG MID orders" },
   { key: "DEFAULT_ORDER_TYPE", label: "Default Order Type", required: true, helper: "Choose a valid IBKR order type" },
   { key: "LMT_PRICE_FOR_SPREAD_30", label: "Price Cap for 30-wide Spreads (LMT/PEG MID)", required: false, helper: "Optional. Used for both LMT and PEG MID." },
   { key: "LMT_PRICE_FOR_SPREAD_35", label: "Price Cap for 35-wide Spreads (LMT/PEG MID)", required: false, helper: "Optional. Used for both LMT and PEG MID." },
-  { key: "WAIT_AFTER_OPEN_SECONDS", label: "Wait After Open (seconds)", required: false, helper: "Seconds to wait after market open before fetching SPX open price. Increase if there is latency or low liquidity." }
+  { key: "WAIT_AFTER_OPEN_SECONDS", label: "Wait After Open (seconds)", required: false, helper: "Longest wait after market open for the SPX open price to be confirmed by a second source. Increase if there is latency or low liquidity." },
+  { key: "PRICE_STATUS_HZ", label: "Live Price Updates per Second", required: false, helper: "How often the live SPX price line is refreshed. Every tick is still used by the bot." },
+  { key: "WARM_STANDBY", label: "Warm Standby", required: false, helper: "Keep a bot process ready in the background so Start Bot begins in milliseconds. Connected uses a second TWS connection." }
 ];
 
 interface ConfigFormProps {
@@ -55,6 +63,21 @@ const ConfigForm: React.FC<ConfigFormProps> = ({ config, onFieldChange, onSave,
                   <MenuItem key={type} value={type}>{type}</MenuItem>
                 ))}
               </TextField>
+            ) : key === "WARM_STANDBY" ? (
+              <TextField
+                key={key}
+                select
+                label={label}
+                value={config[key] || "off"}
+                helperText={helper}
+                onChange={(e) => onFieldChange(key, e.target.value)}
+                variant="outlined"
+                fullWidth
+              >
+                {STANDBY_MODES.map(({ value, label: modeLabel }) => (
+                  <MenuItem key={value} value={value}>{modeLabel}</MenuItem>
+                ))}
+              </TextField>
             ) : key === "SNAPMID_OFFSET" ? (
               (orderType === "SNAP MID" || orderType === "PEG MID" || orderType === "SNAP MKT") && (
                 <TextField
@@ -90,7 +113,7 @@ const ConfigForm: React.FC<ConfigFormProps> = ({ config, onFieldChange, onSave,
                 value={config.WAIT_AFTER_OPEN_SECONDS ?? 3}
                 onChange={(e) => onFieldChange("WAIT_AFTER_OPEN_SECONDS", e.target.value)}
                 InputProps={{ inputProps: { min: 1, max: 61 } }}
-                helperText="Seconds to wait after market open before fetching SPX open price."
+                helperText="Longest wait after market open for the SPX open price to be confirmed by a second source."
                 fullWidth
               />
             ) : (
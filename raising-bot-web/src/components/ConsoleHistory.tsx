@@ -1,42 +1,93 @@
-import React, { useEffect, useState } from "react";
-import { Box, Typography, TextField } from "@mui/material";
+import React, { useCallback, useEffect, useState } from "react";
+import { Box, Typography, TextField, Button, Stack } from "@mui/material";
 import { stripTimestamp } from "../utils/consoleUtils";
 
 const todayStr = new Date().toISOString().slice(0, 10);
+const PAGE_SIZE = 500;
+
+const isStatusLine = (line: string) =>
+  stripTimestamp(line).startsWith("Waiting for market open:") ||
+  stripTimestamp(line).startsWith("Live SPX Price:");
 
 const ConsoleHistory: React.FC = () => {
   const [history, setHistory] = useState<string[]>([]);
   const [date, setDate] = useState<string>(todayStr); // Default to today
+  const [start, setStart] = useState<string>("");
+  const [end, setEnd] = useState<string>("");
+  const [query, setQuery] = useState<string>("");
+  const [nextCursor, setNextCursor] = useState<number | null>(null);
+
+  const fetchPage = useCallback(
+    async (cursor: number | null) => {
+      if (!date) return { lines: [] as string[], next: null };
+      const params = new URLSearchParams({ date, limit: String(PAGE_SIZE) });
+      if (start) params.set("start", start);
+      if (end) params.set("end", end);
+      if (query) params.set("q", query);
+      if (cursor !== null) params.set("cursor", String(cursor));
+      const res = await fetch(`/api/history?${params}`);
+      const data: { history: string[]; next_cursor: number | null } = await res.json();
+      return { lines: data.history.filter((line) => !isStatusLine(line)), next: data.next_cursor ?? null };
+    },
+    [date, start, end, query]
+  );
 
   useEffect(() => {
-    const params = date ? `?date=${date}` : "";
-    fetch(`/api/history${params}`)
-      .then((res) => res.json())
-      .then((data) => {
-        setHistory(
-          data.history.filter(
-            (line: string) =>
-              !stripTimestamp(line).startsWith("Waiting for market open:") &&
-              !stripTimestamp(line).startsWith("Live SPX Price:")
-          )
-        );
-      });
-  }, [date]);
+    let active = true;
+    fetchPage(null).then(({ lines, next }) => {
+      if (!active) return;
+      setHistory(lines);
+      setNextCursor(next);
+    });
+    return () => {
+      active = false;
+    };
+  }, [fetchPage]);
+
+  const loadMore = async () => {
+    if (nextCursor === null) return;
+    const { lines, next } = await fetchPage(nextCursor);
+    setHistory((prev) => [...prev, ...lines]);
+    setNextCursor(next);
+  };
 
   return (
     <Box>
       <Typography variant="h6" gutterBottom>
         Console History
       </Typography>
-      <TextField
-        label="Filter by date"
-        type="date"
-        size="small"
-        value={date}
-        onChange={(e) => setDate(e.target.value)}
-        sx={{ mb: 2 }}
-        InputLabelProps={{ shrink: true }}
-      />
+      <Stack direction="row" spacing={2} sx={{ mb: 2 }}>
+        <TextField
+          label="Filter by date"
+          type="date"
+          size="small"
+          value={date}
+          onChange={(e) => setDate(e.target.value)}
+          InputLabelProps={{ shrink: true }}
+        />
+        <TextField
+          label="From"
+          type="time"
+          size="small"
+          value={start}
+          onChange={(e) => setStart(e.target.value)}
+          InputLabelProps={{ shrink: true }}
+        />
+        <TextField
+          label="To"
+          type="time"
+          size="small"
+          value={end}
+          onChange={(e) => setEnd(e.target.value)}
+          InputLabelProps={{ shrink: true }}
+        />
+        <TextField
+          label="Contains"
+          size="small"
+          value={query}
+          onChange={(e) => setQuery(e.target.value)}
+        />
+      </Stack>
       <Box
         sx={{
           background: "#fafafa",
@@ -57,6 +108,11 @@ const ConsoleHistory: React.FC = () => {
             </Box>
           ))
         )}
+        {nextCursor !== null && (
+          <Button size="small" onClick={loadMore}>
+            Load more
+          </Button>
+        )}
       </Box>
     </Box>
   );
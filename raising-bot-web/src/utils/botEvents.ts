@@ -0,0 +1,56 @@
+// Events the bot sends over its channel to the API server, relayed as socket.io "bot_event"
+
+export type ErrorOrder = { orderId: number; symbol: string; order_type: string; trigger_price: number | null };
+export type FailedSignal = { expiry: string; lc_strike: number; sc_strike: number; trigger_price: number };
+
+export type PriceEvent = { type: "price"; price: number | null; close_seconds: number | null };
+export type StatusFields = {
+  phase?: "waiting_open" | "open" | "closed";
+  open_seconds?: number;
+  error_orders?: ErrorOrder[];
+  failed_conid_signals?: FailedSignal[];
+};
+export type OrderEvent = { type: "order"; order_id: number; status: string; filled: number; remaining: number; avg_fill_price: number };
+export type LogEvent = { type: "log"; req_id: number; code: number; message: string };
+export type Bar = { time: number; open: number; high: number; low: number; close: number; volume: number; count: number };
+export type BarsEvent = { type: "bars"; bars: Bar[]; vwap: number | null };
+export type BotEvent = PriceEvent | ({ type: "status" } & StatusFields) | OrderEvent | LogEvent | BarsEvent;
+
+export type BotState = {
+  price: Omit<PriceEvent, "type"> | null;
+  status: StatusFields;
+  orders: Record<string, Omit<OrderEvent, "type">>;
+  bars: Omit<BarsEvent, "type"> | null;
+  log: Omit<LogEvent, "type">[];
+};
+
+export const emptyBotState: BotState = { price: null, status: {}, orders: {}, bars: null, log: [] };
+
+const LOG_SIZE = 50;
+
+// Same merge as BotState.apply in bot_events.py, so /api/state and replayed events agree
+export const applyBotEvent = (state: BotState, event: BotEvent): BotState => {
+  const { type, ...fields } = event;
+  switch (type) {
+    case "price":
+      return { ...state, price: fields as BotState["price"] };
+    case "status":
+      return { ...state, status: { ...state.status, ...(fields as StatusFields) } };
+    case "order": {
+      const order = fields as Omit<OrderEvent, "type">;
+      return { ...state, orders: { ...state.orders, [String(order.order_id)]: order } };
+    }
+    case "log":
+      return { ...state, log: [...state.log, fields as Omit<LogEvent, "type">].slice(-LOG_SIZE) };
+    case "bars":
+      return { ...state, bars: fields as BotState["bars"] };
+    default:
+      return state;
+  }
+};
+
+export const formatCountdown = (seconds: number) => {
+  const s = Math.max(0, Math.floor(seconds));
+  const pad = (n: number) => String(n).padStart(2, "0");
+  return `${pad(Math.floor(s / 3600))}:${pad(Math.floor((s % 3600) / 60))}:${pad(s % 60)}`;
+};
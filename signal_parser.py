@@ -0,0 +1,67 @@
+# signal_parser.py
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List
+
+SIGNAL_MARKER = "到期日"
+PENDING_MARK = "未觸發"
+MAX_SETS_PER_LINE = 20
+
+# Matched only at a marker. Each quantifier is followed by a character it cannot consume,
+# so a failed match gives up at the first mismatch instead of backtracking.
+_HEAD = re.compile(r"到期日:\s*(\d{4}-\d{2}-\d{2})\s*SC:\s*([\d.]+)\s*LC:\s*([\d.]+)")
+_SETS = re.compile(r"@(\d+)")
+
+@dataclass
+class SignalLine:
+    expiry: str  # As posted, YYYY-MM-DD
+    sc_strike: str
+    lc_strike: str
+    sets: int
+    pending: bool
+    text: str
+
+@lru_cache(maxsize=16)
+def compiled_pattern(pattern: str) -> "re.Pattern":
+    """Compiles a configured regex once per distinct pattern string."""
+    return re.compile(pattern)
+
+def parse_signal_lines(text: str) -> List[SignalLine]:
+    """
+    Parses every 到期日/SC/LC signal in `text`, pending or not, in time linear in len(text).
+
+    The text is cut at each 到期日 and every segment is examined once: the head must
+    match at its start, the line is pending if 未觸發 follows the head before the next
+    signal (as with the default MULTI_SIGNAL_REGEX, other text such as 觸發價 may come
+    between), and an @N before that on the head's line gives the number of sets
+    (capped at MAX_SETS_PER_LINE).
+    Unlike the regex, a status is never borrowed from the next signal's segment.
+    """
+    lines: List[SignalLine] = []
+    start = text.find(SIGNAL_MARKER)
+    while start != -1:
+        end = text.find(SIGNAL_MARKER, start + len(SIGNAL_MARKER))
+        segment = text[start:] if end == -1 else text[start:end]
+        start = end
+        head = _HEAD.match(segment)
+        if head is None:
+            continue
+        status = segment.find(PENDING_MARK, head.end())
+        pending = status != -1
+        scope_end = segment.find("\n", head.end())
+        if scope_end == -1:
+            scope_end = len(segment)
+        if pending:
+            scope_end = min(scope_end, status)
+        sets = _SETS.search(segment, head.end(), scope_end)
+        digits = sets.group(1) if sets else "1"
+        # Length check first: int() of a huge digit string is itself slow (or refused)
+        set_num = int(digits) if len(digits) <= 3 else MAX_SETS_PER_LINE + 1
+        if set_num > MAX_SETS_PER_LINE:
+            print(f"Warning: capping @{digits[:8]} to {MAX_SETS_PER_LINE} set(s) in: {segment[:80].strip()}", flush=True)
+            set_num = MAX_SETS_PER_LINE
+        line_end = status + len(PENDING_MARK) if pending else scope_end
+        lines.append(SignalLine(head.group(1), head.group(2), head.group(3), set_num, pending, segment[:line_end].strip()))
+    return lines
@@ -2,21 +2,34 @@
 
 import asyncio
 import hashlib
-import re
 import os
-import requests
-import pandas_market_calendars as mcal
-import pandas as pd
-from telethon import TelegramClient
-from telethon.errors import SessionPasswordNeededError
+import threading
 from datetime import datetime, timezone
 from typing import List
-from config import (TELEGRAM_API_ID, TELEGRAM_API_HASH, TELEGRAM_CHANNEL, get_user_data_dir,
-                    DEFAULT_ORDER_TYPE, DEFAULT_LIMIT_PRICE, DEFAULT_STOP_PRICE, MULTI_SIGNAL_REGEX, SNAPMID_OFFSET)
+from config import (TELEGRAM_API_ID, TELEGRAM_API_HASH, TELEGRAM_CHANNEL, get_user_data_dir, CONFIG_DEFAULTS,
+                    ConfigSnapshot, current_config)
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 from pytz import timezone
 from collections import Counter
+import trading_calendar
+from processed_store import ProcessedSignalStore
+from signal_parser import compiled_pattern, parse_signal_lines
+
+DEFAULT_SIGNAL_REGEX = CONFIG_DEFAULTS["MULTI_SIGNAL_REGEX"]
+
+def _import_telethon():
+    """Imports telethon (the slowest import of the bot's startup) when a client is first needed."""
+    global TelegramClient, SessionPasswordNeededError
+    if "TelegramClient" not in globals():
+        from telethon import TelegramClient
+        from telethon.errors import SessionPasswordNeededError
+
+def __getattr__(name):
+    if name in ("TelegramClient", "SessionPasswordNeededError"):
+        _import_telethon()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 @dataclass
 class Signal:
@@ -30,22 +43,53 @@ class Signal:
     snapmid_offset: Optional[float] = None
     allowed_duplicates: int = 1  # <-- Add this field
 
-# --- Hash and Record-Keeping Functions (Unchanged) ---
+# --- Hash and Record-Keeping Functions ---
+_processed_stores = {}
+_processed_stores_lock = threading.Lock()
+
+def get_processed_store(filename='processed_signals.txt') -> ProcessedSignalStore:
+    """Returns the store for `filename`, reading its journal on first use only."""
+    path = os.path.abspath(filename)
+    with _processed_stores_lock:
+        store = _processed_stores.get(path)
+        if store is None:
+            store = _processed_stores[path] = ProcessedSignalStore(path)
+        return store
+
 def get_signal_hash(text): return hashlib.sha256(text.encode()).hexdigest()
 def already_processed(hash_str, filename='processed_signals.txt'):
-    try:
-        with open(filename, 'r') as f: return hash_str in f.read().splitlines()
-    except FileNotFoundError: return False
+    return hash_str in get_processed_store(filename)
 def record_processed(hash_str, filename='processed_signals.txt'):
-    with open(filename, 'a') as f: f.write(hash_str + '\n')
+    get_processed_store(filename).add(hash_str)
 
 # --- Signal Input Functions ---
+# A connected TelegramListener (see telegram_listener.py), if one is running in this process
+_active_listener = None
+
+def set_active_listener(listener):
+    global _active_listener
+    _active_listener = listener
+
 def get_signal_from_telegram():
+    post = fetch_latest_post()
+    return post[1] if post is not None else None
+
+def fetch_latest_post(interactive: bool = True) -> Optional[Tuple[int, str]]:
+    """
+    (message id, text) of the channel's newest post, or None. With interactive=False a
+    missing or invalid session gives None instead of prompting for a manual login.
+    """
+    listener = _active_listener
+    if listener is not None and listener.connected and listener.latest_text is not None:
+        # The listener already holds the newest post (including edits); no round trip needed
+        return listener.latest_message_id, listener.latest_text
+
     print("telegram channel:", TELEGRAM_CHANNEL, flush=True)
     print("Fetching latest signal from Telegram channel...", flush=True)
     if not TELEGRAM_API_ID or not TELEGRAM_API_HASH:
         print("Missing Telegram API credentials.", flush=True)
         return None
+    _import_telethon()
 
     async def run():
         # --- Use the correct user data directory ---
@@ -63,7 +107,7 @@ def get_signal_from_telegram():
                 if await client.is_user_authorized():
                     message = await client.get_messages(TELEGRAM_CHANNEL, limit=1)
                     await client.disconnect()
-                    return message[0].text
+                    return message[0].id, message[0].text
                 else:
                     # Session exists but is invalid, go to manual login
                     print("Session invalid, manual login required.", flush=True)
@@ -72,6 +116,8 @@ def get_signal_from_telegram():
                 print(f"Session failed: {e}", flush=True)
                 if 'client' in locals() and client.is_connected(): await client.disconnect()
         
+        if not interactive:
+            return None
         # If no session or session failed, do manual login
         client = await run_manual_login()
         if client is None:
@@ -79,7 +125,7 @@ def get_signal_from_telegram():
         try:
             message = await client.get_messages(TELEGRAM_CHANNEL, limit=1)
             await client.disconnect()
-            return message[0].text
+            return message[0].id, message[0].text
         except Exception as e:
             print(f"Failed to fetch messages: {e}", flush=True)
             if client.is_connected(): await client.disconnect()
@@ -92,6 +138,7 @@ def get_signal_from_telegram():
         return None
 
 async def run_manual_login():
+    _import_telethon()
     # --- Use the correct user data directory here as well ---
     USER_DATA_DIR = get_user_data_dir()
     session_name_with_path = os.path.join(USER_DATA_DIR, 'session_name')
@@ -123,32 +170,59 @@ def round_strike(strike):
     except Exception:
         return strike  # fallback if not a number
 
+def _signal_dicts(expiry, sc, lc, set_num, cfg: Optional[ConfigSnapshot] = None):
+    cfg = cfg or current_config()
+    expiry = expiry.replace('-', '')
+    sc_str = round_strike(sc)
+    lc_str = round_strike(lc)
+    trigger_midpoint = (float(sc_str) + float(lc_str)) / 2.0
+
+    return [{
+        "expiry": expiry,
+        "sc_strike": sc_str,
+        "lc_strike": lc_str,
+        "trigger_price": str(trigger_midpoint),
+        "order_type": cfg.DEFAULT_ORDER_TYPE,
+        "lmt_price": cfg.DEFAULT_LIMIT_PRICE,
+        "stop_price": cfg.DEFAULT_STOP_PRICE,
+        "Set": set_num
+    } for _ in range(set_num)]
+
 def parse_multi_signal_message(text):
     signals = []
-    for match in re.finditer(MULTI_SIGNAL_REGEX, text):
-        try:
-            expiry = match.group(1).replace('-', '')
-            sc_str = round_strike(match.group(2))
-            lc_str = round_strike(match.group(3))
-            trigger_midpoint = (float(sc_str) + float(lc_str)) / 2.0
+    cfg = current_config()
+    if cfg.MULTI_SIGNAL_REGEX == DEFAULT_SIGNAL_REGEX:
+        # Same grammar as the default regex, without its quadratic backtracking
+        for line in parse_signal_lines(text):
+            if not line.pending:
+                continue
+            try:
+                signals.extend(_signal_dicts(line.expiry, line.sc_strike, line.lc_strike, line.sets, cfg))
+            except (ValueError, IndexError):
+                print(f"Warning: Skipping an invalid line in message: {line.text}", flush=True)
+        return signals if signals else None
 
+    for match in compiled_pattern(cfg.MULTI_SIGNAL_REGEX).finditer(text):
+        try:
             set_num = int(match.group(4)) if match.group(4) else 1
-            for _ in range(set_num):
-                signals.append({
-                    "expiry": expiry,
-                    "sc_strike": sc_str,
-                    "lc_strike": lc_str,
-                    "trigger_price": str(trigger_midpoint),
-                    "order_type": DEFAULT_ORDER_TYPE,
-                    "lmt_price": DEFAULT_LIMIT_PRICE,
-                    "stop_price": DEFAULT_STOP_PRICE,
-                    "Set": set_num
-                })
+            signals.extend(_signal_dicts(match.group(1), match.group(2), match.group(3), set_num, cfg))
         except (ValueError, IndexError):
             print(f"Warning: Skipping an invalid line in message: {match.group(0)}", flush=True)
             continue
     return signals if signals else None
 
+def parse_triggered_signals(text) -> List[Signal]:
+    """Signals of the lines in `text` that are no longer marked 未觸發 (triggered)."""
+    signals: List[Signal] = []
+    for line in parse_signal_lines(text):
+        if line.pending:
+            continue
+        try:
+            signals.extend(to_signal(d) for d in _signal_dicts(line.expiry, line.sc_strike, line.lc_strike, line.sets))
+        except Exception as e:
+            print(f"Skipping malformed triggered signal line {line.text}: {e}", flush=True)
+    return signals
+
 def get_signal_interactively():
     """Presents a menu for manual signal entry."""
     print("--- MANUAL SIGNAL ENTRY ---", flush=True)
@@ -174,20 +248,41 @@ def get_signal_interactively():
             print("Could not find any valid, untriggered signals in the pasted message.", flush=True)
     else: print("No message pasted.", flush=True)
 
+def signals_from_text(text: str) -> List[Signal]:
+    """Parses a channel message into Signals with allowed_duplicates set."""
+    signals: List[Signal] = []
+    for d in parse_multi_signal_message(text) or []:
+        try:
+            signals.append(to_signal(d))
+        except Exception as e:
+            print(f"Skipping malformed Telegram signal {d}: {e}", flush=True)
+    return set_allowed_duplicates(signals)
+
+def set_allowed_duplicates(signals: List[Signal]) -> List[Signal]:
+    """Sets each signal's allowed_duplicates to how often its key appears in `signals`."""
+    counts = Counter((s.expiry, s.lc_strike, s.sc_strike, s.trigger_price) for s in signals)
+    for s in signals:
+        s.allowed_duplicates = counts[(s.expiry, s.lc_strike, s.sc_strike, s.trigger_price)]
+    return signals
+
 def gather_signals(allow_manual_fallback: bool = True) -> List[Signal]:
+    return gather_signal_post(allow_manual_fallback)[0]
+
+def gather_signal_post(allow_manual_fallback: bool = True) -> Tuple[List[Signal], Optional[int]]:
+    """
+    The signals of the channel's newest post and that post's message id, so later posts
+    can be told apart from edits of it. Manually entered signals have no message id.
+    """
     signals: List[Signal] = []
+    message_id = None
 
     # 1If no signals, try Telegram
     if not signals:
         try:
-            txt = get_signal_from_telegram()
-            if txt:
-                parsed = parse_multi_signal_message(txt) or []
-                for d in parsed:
-                    try:
-                        signals.append(to_signal(d))
-                    except Exception as e:
-                        print(f"Skipping malformed Telegram signal {d}: {e}", flush=True)
+            post = fetch_latest_post()
+            if post is not None and post[1]:
+                message_id = post[0]
+                signals.extend(signals_from_text(post[1]))
         except Exception as e:
             print(f"Telegram fetch/parse error: {e}", flush=True)
 
@@ -199,20 +294,8 @@ def gather_signals(allow_manual_fallback: bool = True) -> List[Signal]:
                 signals.append(to_signal(d))
             except Exception as e:
                 print(f"Skipping malformed manual signal {d}: {e}")
-    
-    # Use a tuple as the key for each signal
-    signal_keys = [
-        (s.expiry, s.lc_strike, s.sc_strike, s.trigger_price)
-        for s in signals
-    ]
-    counts = Counter(signal_keys)
-
-    # Set allowed_duplicates for each signal
-    for s in signals:
-        key = (s.expiry, s.lc_strike, s.sc_strike, s.trigger_price)
-        s.allowed_duplicates = counts[key]
 
-    return signals
+    return set_allowed_duplicates(signals), message_id
 
 def to_signal(d: dict) -> Signal:
     expiry = get_valid_trading_day(str(d["expiry"]))
@@ -224,7 +307,7 @@ def to_signal(d: dict) -> Signal:
         order_type=str(d["order_type"]),
         lmt_price=(None if d.get("lmt_price") in (None, "", "None") else float(d["lmt_price"])),
         stop_price=(None if d.get("stop_price") in (None, "", "None") else float(d["stop_price"])),
-        snapmid_offset=(None if d.get("snapmid_offset") in (None, "", "None") else float(d.get("snapmid_offset", SNAPMID_OFFSET))),
+        snapmid_offset=(None if d.get("snapmid_offset") in (None, "", "None") else float(d.get("snapmid_offset", current_config().SNAPMID_OFFSET))),
         allowed_duplicates=int(d.get("allowed_duplicates", 1))  # <-- Set from dict, default 1
     )
 
@@ -232,14 +315,6 @@ def get_valid_trading_day(date_str):
     """
     Returns date_str (YYYYMMDD) if it's a valid US trading day, otherwise returns previous valid trading day.
     """
-    nyse = mcal.get_calendar('NYSE')
-    date = datetime.strptime(date_str, "%Y%m%d")
-    schedule = nyse.valid_days(start_date="2000-01-01", end_date=date.strftime("%Y-%m-%d"))
-    if len(schedule) == 0:
-        raise ValueError("No valid trading days found before given date.")
-    if pd.Timestamp(date) in schedule:
-        return date_str
-    else:
-        prev_trading_day = schedule[-1]
-        return prev_trading_day.strftime("%Y%m%d")
+    datetime.strptime(date_str, "%Y%m%d")  # Reject malformed dates
+    return trading_calendar.previous_valid_day(date_str)
 
@@ -0,0 +1,156 @@
+# signal_watcher.py
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from signal_utils import Signal, fetch_latest_post, parse_triggered_signals, signals_from_text
+
+SignalKey = Tuple[str, float, float, float]
+
+def signal_key(s: Signal) -> SignalKey:
+    return s.expiry, float(s.lc_strike), float(s.sc_strike), float(s.trigger_price)
+
+@dataclass
+class SignalDiff:
+    added: List[Signal] = field(default_factory=list)
+    withdrawn: List[Signal] = field(default_factory=list)
+    triggered: List[Signal] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.withdrawn or self.triggered)
+
+def merge_diff(diff: SignalDiff, later: SignalDiff):
+    """
+    Folds a later diff into `diff`. A signal added earlier and gone again later nets
+    out, since its order was never staged.
+    """
+    for gone, later_gone in ((diff.withdrawn, later.withdrawn), (diff.triggered, later.triggered)):
+        for s in later_gone:
+            added = next((a for a in diff.added if signal_key(a) == signal_key(s)), None)
+            if added is not None:
+                diff.added.remove(added)
+            else:
+                gone.append(s)
+    diff.added.extend(later.added)
+
+class SignalWatcher:
+    """
+    Multiset of the signal keys the channel currently stands by. An edit of the post
+    the signals came from is compared with its previous version key by key, and only
+    the difference is reported: one Signal per extra occurrence of a key as added, one
+    per missing occurrence as withdrawn, or as triggered when the line is still in the
+    post but no longer marked 未觸發. A new post (another message id) only adds: its
+    signals top up the known ones and become the baseline for its own edits, while
+    signals it does not repeat stay as they are. Added signals carry allowed_duplicates
+    equal to the new count of their key, so staging them tops the orders up to that
+    count. A post without any signal line (e.g. a chat message) leaves the current
+    signals as they are.
+
+    `message_id` is the post the initial signals were read from, so that a post landing
+    between then and the first poll is taken as a new post rather than an edit of it.
+    Posts come from a connected TelegramListener when there is one, each queued post
+    applied in turn; otherwise the channel is polled without ever prompting for a login, every `poll_interval` seconds,
+    backing off up to `max_poll_interval` while fetches fail.
+    """
+
+    def __init__(self, initial_signals: Iterable[Signal] = (), listener=None, message_id: Optional[int] = None,
+                 poll_interval: float = 30.0, max_poll_interval: float = 300.0):
+        self.listener = listener
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self._poll_delay = poll_interval
+        self._counts: Counter = Counter()  # Every signal still standing, across posts
+        self._post_counts: Counter = Counter()  # The signals of the current post
+        self._signals: Dict[SignalKey, Signal] = {}
+        self._last_text: Optional[str] = None
+        self._message_id: Optional[int] = message_id
+        self._last_poll = time.monotonic()
+        self.update(list(initial_signals))
+
+    def counts(self) -> Counter:
+        return Counter(self._counts)
+
+    def update(self, signals: List[Signal], text: Optional[str] = None, message_id: Optional[int] = None) -> SignalDiff:
+        """
+        Takes a version of a post and returns what changed. Without a message id the
+        signals are taken as a version of the current post.
+        """
+        triggered_keys = set()
+        if text is not None:
+            if text == self._last_text:
+                return SignalDiff()
+            self._last_text = text
+            triggered_keys = {signal_key(s) for s in parse_triggered_signals(text)}
+            if not signals and not triggered_keys:
+                return SignalDiff()
+        new_counts = Counter(signal_key(s) for s in signals)
+        latest = {signal_key(s): s for s in signals}
+        diff = SignalDiff()
+        if message_id is None or message_id == self._message_id:
+            # An edit: lines gone from the post are withdrawn, or triggered when still listed
+            for key, missing in (self._post_counts - new_counts).items():
+                missing = min(missing, self._counts[key])
+                gone = diff.triggered if key in triggered_keys else diff.withdrawn
+                gone.extend([self._signals[key]] * missing)
+                self._counts[key] -= missing
+            for key, extra in (new_counts - self._post_counts).items():
+                self._counts[key] += extra
+                diff.added.extend([latest[key]] * extra)
+        else:
+            # A new post: nothing it leaves out is withdrawn; lines it lists as triggered are
+            self._message_id = message_id
+            for key in triggered_keys - set(new_counts):
+                if self._counts[key] > 0:
+                    diff.triggered.extend([self._signals[key]] * self._counts[key])
+                    self._counts[key] = 0
+            for key, count in new_counts.items():
+                extra = count - self._counts[key]
+                if extra > 0:
+                    self._counts[key] = count
+                    diff.added.extend([latest[key]] * extra)
+        for s in diff.added:
+            s.allowed_duplicates = self._counts[signal_key(s)]
+        self._post_counts = new_counts
+        self._counts = +self._counts  # Drops keys with no occurrence left
+        self._signals.update(latest)
+        for key in list(self._signals):
+            if key not in self._counts:
+                del self._signals[key]
+        return diff
+
+    def poll(self) -> SignalDiff:
+        """Returns the changes since the last call; empty if nothing new has been posted."""
+        listener = self.listener
+        if listener is not None and listener.connected:
+            updates = []
+            while True:
+                update = listener.get_update(timeout=0)
+                if update is None:
+                    break
+                if updates and updates[-1].message_id == update.message_id:
+                    updates[-1] = update  # Only the last of consecutive edits of a post matters
+                else:
+                    updates.append(update)
+            diff = SignalDiff()
+            for update in updates:
+                merge_diff(diff, self.update(update.signals, update.text, update.message_id))
+            for s in diff.added:
+                s.allowed_duplicates = self._counts[signal_key(s)]
+            return diff
+
+        now = time.monotonic()
+        if now - self._last_poll < self._poll_delay:
+            return SignalDiff()
+        self._last_poll = now
+        post = fetch_latest_post(interactive=False)
+        if post is None:
+            # A failed fetch says nothing about the signals, so nothing is withdrawn
+            self._poll_delay = min(self._poll_delay * 2, self.max_poll_interval)
+            return SignalDiff()
+        self._poll_delay = self.poll_interval
+        message_id, text = post
+        if text == self._last_text:
+            return SignalDiff()
+        return self.update(signals_from_text(text), text, message_id)
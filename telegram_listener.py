@@ -0,0 +1,195 @@
+# telegram_listener.py
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from config import TELEGRAM_API_ID, TELEGRAM_API_HASH, TELEGRAM_CHANNEL, get_user_data_dir
+import signal_utils
+from signal_utils import Signal, run_manual_login, set_active_listener, signals_from_text
+
+@dataclass
+class SignalUpdate:
+    message_id: int
+    text: str
+    edited: bool
+    signals: List[Signal] = field(default_factory=list)
+    received_at: float = field(default_factory=time.time)
+
+class TelegramListener:
+    """
+    One Telegram connection per trading day, subscribed to new and edited messages of
+    the signal channel. The client runs on its own asyncio loop in a daemon thread;
+    every post or edit of the newest post is parsed there and put on `updates` as a
+    SignalUpdate, and `latest_text` always holds the newest post so gather_signals
+    can answer without a round trip.
+    """
+
+    def __init__(self, channel: str = TELEGRAM_CHANNEL, reconnect_delay: float = 5.0):
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.updates: "queue.Queue[SignalUpdate]" = queue.Queue()
+        self.latest_text: Optional[str] = None
+        self.latest_message_id: Optional[int] = None
+        # Optional callback run after each update is queued, to wake a consumer blocked elsewhere
+        self.on_update: Optional[Callable[[], None]] = None
+        self._lock = threading.Lock()
+        self._connected = threading.Event()
+        self._ready = threading.Event()
+        self._stopping = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def start(self, timeout: Optional[float] = None) -> bool:
+        """
+        Connects in the background and waits until the first connection attempt is over
+        (a manual login prompt may take a while). Returns True if connected.
+        """
+        if not TELEGRAM_API_ID or not TELEGRAM_API_HASH:
+            print("Missing Telegram API credentials; Telegram listener not started.", flush=True)
+            return False
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._thread_main, name="telegram-listener", daemon=True)
+            self._thread.start()
+        self._ready.wait(timeout)
+        if self.connected:
+            set_active_listener(self)
+        return self.connected
+
+    def stop(self, timeout: float = 10):
+        self._stopping.set()
+        if signal_utils._active_listener is self:
+            set_active_listener(None)
+        loop, client = self._loop, self._client
+        if loop is not None and client is not None and loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(client.disconnect(), loop).result(timeout)
+            except Exception as e:
+                print(f"Error disconnecting Telegram listener: {e}", flush=True)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._connected.clear()
+        print("Telegram listener stopped.", flush=True)
+
+    def get_update(self, timeout: Optional[float] = None) -> Optional[SignalUpdate]:
+        """Returns the next SignalUpdate, or None if none arrives within `timeout`."""
+        try:
+            return self.updates.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def handle_message(self, message_id: int, text: Optional[str], edited: bool = False, notify: bool = True) -> Optional[SignalUpdate]:
+        """
+        Records a post of the channel. Posts and edits older than the newest post are
+        ignored, since only the newest post carries the current signals.
+        """
+        if text is None:
+            return None
+        with self._lock:
+            if self.latest_message_id is not None and message_id < self.latest_message_id:
+                return None
+            if message_id == self.latest_message_id and text == self.latest_text:
+                return None
+            self.latest_message_id = message_id
+            self.latest_text = text
+        update = SignalUpdate(message_id, text, edited, signals_from_text(text))
+        if notify:
+            self.updates.put(update)
+            if self.on_update is not None:
+                self.on_update()
+            kind = "Edited" if edited else "New"
+            print(f"{kind} Telegram post {message_id}: {len(update.signals)} signal(s).", flush=True)
+        return update
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._run())
+        except Exception as e:
+            print(f"Telegram listener error: {e}", flush=True)
+        finally:
+            self._connected.clear()
+            self._ready.set()
+            self._loop.close()
+
+    async def _run(self):
+        from telethon import events
+        while not self._stopping.is_set():
+            client = await self._connect()
+            if client is None:
+                self._ready.set()
+                return
+            self._client = client
+            client.add_event_handler(self._on_new_message, events.NewMessage(chats=self.channel))
+            client.add_event_handler(self._on_edited_message, events.MessageEdited(chats=self.channel))
+            try:
+                # Seed with the newest post after subscribing, so nothing posted in between is missed
+                messages = await client.get_messages(self.channel, limit=1)
+                if messages:
+                    self.handle_message(messages[0].id, messages[0].text, notify=False)
+                self._connected.set()
+                if not self._stopping.is_set():
+                    set_active_listener(self)  # Also when connected only after start() returned
+                self._ready.set()
+                print(f"Telegram listener subscribed to {self.channel}.", flush=True)
+                await client.run_until_disconnected()
+            except Exception as e:
+                print(f"Telegram listener disconnected: {e}", flush=True)
+            finally:
+                self._connected.clear()
+                if client.is_connected():
+                    await client.disconnect()
+            if not self._stopping.is_set():
+                print(f"Reconnecting Telegram listener in {self.reconnect_delay:.0f}s...", flush=True)
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _connect(self, max_delay: float = 60.0):
+        """
+        Connects with the saved session. Connection errors are retried with a growing delay
+        (start() returns after the first one); only a missing or unauthorized session asks
+        for a manual login.
+        """
+        from telethon import TelegramClient
+        session_name_with_path = os.path.join(get_user_data_dir(), 'session_name')
+        delay = self.reconnect_delay
+        while os.path.exists(session_name_with_path + '.session') and not self._stopping.is_set():
+            client = TelegramClient(session_name_with_path, int(TELEGRAM_API_ID), TELEGRAM_API_HASH)
+            try:
+                await client.connect()
+                if await client.is_user_authorized():
+                    return client
+                print("Session invalid, manual login required.", flush=True)
+                await client.disconnect()
+                break
+            except Exception as e:
+                print(f"Telegram connection failed: {e}. Retrying in {delay:.0f}s...", flush=True)
+                if client.is_connected():
+                    await client.disconnect()
+            self._ready.set()  # The bot goes on without the listener meanwhile
+            await self._sleep(delay)
+            delay = min(delay * 2, max_delay)
+        if self._stopping.is_set():
+            return None
+        return await run_manual_login()
+
+    async def _sleep(self, seconds: float):
+        """Sleeps up to `seconds`, returning early once stop() is called."""
+        end = time.monotonic() + seconds
+        while not self._stopping.is_set() and time.monotonic() < end:
+            await asyncio.sleep(min(0.2, end - time.monotonic()))
+
+    async def _on_new_message(self, event):
+        self.handle_message(event.message.id, event.message.text)
+
+    async def _on_edited_message(self, event):
+        self.handle_message(event.message.id, event.message.text, edited=True)
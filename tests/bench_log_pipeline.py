@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Throughput of console line ingestion in lines per second: the batched LogPipeline
+against the previous per-line handling (two re.sub calls, one file open and one
+socket emit per line). Emits are counted rather than sent.
+
+    python tests/bench_log_pipeline.py [--lines 200000]
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_pipeline import ConsoleBuffer, LogPipeline
+
+def make_lines(count):
+    lines = []
+    for i in range(count):
+        if i % 4:
+            lines.append(f"[TS:2025-12-31 09:30:{i % 60:02d}] Live SPX Price: {6500 + i % 7} | Market Close Countdown: 06:29:{i % 60:02d}")
+        else:
+            lines.append(f"[TS:2025-12-31 09:30:{i % 60:02d}] OrderStatus. ID: {i}, Status: Submitted, Filled: 0, Remaining: 1, AvgFillPrice: 0.0")
+    return lines
+
+def per_line(lines, log_path):
+    """The per-line handling read_bot_output used before the pipeline."""
+    output, lock, emits = deque(maxlen=5000), threading.Lock(), [0]
+    for raw in lines:
+        stripped = re.sub(r'^\[TS:[^\]]+\]\s*', '', raw)
+        prefixes = ("Waiting for market open:", "Live SPX Price:")
+
+        def is_updatable_line(line):
+            return any(re.sub(r'^\[TS:[^\]]+\]\s*', '', line).startswith(p) for p in prefixes)
+
+        is_updatable = any(stripped.startswith(p) for p in prefixes)
+        with lock:
+            if is_updatable and output and is_updatable_line(output[-1]):
+                output[-1] = raw
+            else:
+                output.append(raw)
+        emits[0] += 1
+        if not is_updatable:
+            with open(log_path, "a") as f:
+                f.write(raw + "\n")
+    return emits[0]
+
+def pipelined(lines, log_path):
+    emits = [0]
+    pipeline = LogPipeline(ConsoleBuffer(maxlen=5000), lambda frame: emits.__setitem__(0, emits[0] + 1), log_path)
+    pipeline.start()
+    for raw in lines:
+        pipeline.ingest(raw)
+    pipeline.stop()
+    return emits[0]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=200_000)
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for name, fn in (("per-line", per_line), ("pipeline", pipelined)):
+            start = time.perf_counter()
+            emits = fn(lines, os.path.join(tmpdir, f"{name}.log"))
+            elapsed = time.perf_counter() - start
+            print(f"{name:<10}{args.lines / elapsed:>14,.0f} lines/s{emits:>10} emits", flush=True)
+    finally:
+        shutil.rmtree(tmpdir)
+
+if __name__ == "__main__":
+    main()
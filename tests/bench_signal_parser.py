@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark of signal parsing: the linear parser against the default MULTI_SIGNAL_REGEX.
+
+    python tests/bench_signal_parser.py            # parser only
+    python tests/bench_signal_parser.py --regex    # also time the regex (slow on adversarial inputs)
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CONFIG_DEFAULTS
+from signal_parser import parse_signal_lines
+from tests.signal_corpus import ADVERSARIAL, WELL_FORMED
+
+def best_of(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--regex", action="store_true", help="Also time the default MULTI_SIGNAL_REGEX.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pattern = re.compile(CONFIG_DEFAULTS["MULTI_SIGNAL_REGEX"])
+    cases = [(f"well_formed_{i}", text) for i, text in enumerate(WELL_FORMED)] + ADVERSARIAL
+    print(f"{'case':<24}{'bytes':>9}{'parser ms':>12}{'MB/s':>9}" + (f"{'regex ms':>12}" if args.regex else ""))
+    for name, text in cases:
+        size = len(text.encode("utf-8"))
+        parser_s = best_of(parse_signal_lines, text, args.repeat)
+        row = f"{name:<24}{size:>9}{parser_s * 1000:>12.3f}{size / max(parser_s, 1e-9) / 1e6:>9.1f}"
+        if args.regex:
+            row += f"{best_of(lambda t: list(pattern.finditer(t)), text, 1) * 1000:>12.1f}"
+        print(row, flush=True)
+
+if __name__ == "__main__":
+    main()
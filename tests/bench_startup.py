@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Time from spawning the bot subprocess (api.py --run-main, as /api/start does) to its
+first connection to TWS, which a local listener stands in for. --eager imports flask,
+flask_socketio and telethon first, as the subprocess did before they were deferred.
+Exits with status 1 when the median exceeds --max-ms, for use as a regression check.
+
+    python tests/bench_startup.py [--runs 5] [--max-ms 1500] [--eager]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_SCRIPT = os.path.join(ROOT, "api.py")
+EAGER = ("import sys, runpy, flask, flask_socketio, telethon; "
+         "sys.argv = sys.argv[1:]; runpy.run_path(sys.argv[0], run_name='__main__')")
+
+def write_config(home, port):
+    """Points a throwaway user data dir (see config.get_user_data_dir) at the fake TWS."""
+    for data_dir in (os.path.join(home, "Library", "Application Support", "RaisingBot"), os.path.join(home, "RaisingBot")):
+        os.makedirs(data_dir, exist_ok=True)
+        with open(os.path.join(data_dir, "config.json"), "w") as f:
+            json.dump({"IBKR_HOST": "127.0.0.1", "IBKR_PORT": port}, f)
+
+def time_to_connect(listener, env, eager, timeout):
+    command = [API_SCRIPT, "--run-main", "--client-id", "999"]
+    command = [sys.executable, "-c", EAGER, *command] if eager else [sys.executable, *command]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        listener.settimeout(timeout)
+        conn, _ = listener.accept()
+        elapsed = time.perf_counter() - start
+        conn.close()
+        return elapsed
+    finally:
+        process.kill()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail when the median time to connect exceeds this.")
+    parser.add_argument("--eager", action="store_true", help="Import the web server and telethon first, as before.")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    home = tempfile.mkdtemp()
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    write_config(home, listener.getsockname()[1])
+    env = {k: v for k, v in os.environ.items() if k != "RAISING_BOT_EVENTS"}
+    env.update(HOME=home, APPDATA=home, PYTHONUNBUFFERED="1")
+    try:
+        times = [time_to_connect(listener, env, args.eager, args.timeout) for _ in range(args.runs)]
+    finally:
+        listener.close()
+        shutil.rmtree(home, ignore_errors=True)
+
+    median_ms = statistics.median(times) * 1000
+    mode = "eager" if args.eager else "lazy"
+    print(f"{mode:<6} time to first IBKR connect: median {median_ms:.0f} ms, "
+          f"min {min(times) * 1000:.0f} ms, max {max(times) * 1000:.0f} ms ({args.runs} runs)", flush=True)
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"Regression: median {median_ms:.0f} ms exceeds {args.max_ms:.0f} ms.", flush=True)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# tests/signal_corpus.py
+"""
+Signal messages for the parser tests and tests/bench_signal_parser.py.
+
+WELL_FORMED messages are parsed identically by the linear parser and the default
+MULTI_SIGNAL_REGEX. ADVERSARIAL messages are ~50 KB inputs that make the regex
+backtrack quadratically (pasted garbage, repeated heads without a status, runs of
+@ signs); each entry is (name, text).
+"""
+
+LINE = "到期日: 2025-12-31 SC: 6500 LC: 6495 未觸發"
+
+WELL_FORMED = [
+    LINE,
+    "到期日: 2025-12-31 SC: 6500 LC: 6495 @2 未觸發",
+    "到期日: 2025-12-31 SC: 6502 LC: 6497 未觸發",
+    "到期日:2025-12-31 SC:6500.0 LC:6495.0 x@3 (SPXW) 未觸發",
+    "📈 今日訊號\n到期日: 2025-12-31 SC: 6500 LC: 6495 未觸發\n到期日: 2026-01-15 SC: 6600 LC: 6595 已觸發\n"
+    "到期日: 2026-01-16 SC: 6700 LC: 6695 @2 未觸發\n祝好運",
+    "\n".join(f"到期日: 2025-12-31 SC: {6500 + 5 * i} LC: {6495 + 5 * i} 未觸發" for i in range(200)),
+    "到期日: 2025-12-31 SC: 6500 LC: 6495 觸發價 6497.5 @2 未觸發",
+    "This is not a valid signal message",
+    "",
+]
+
+def _fill(unit: str, size: int = 50_000) -> str:
+    return unit * (size // len(unit) + 1)
+
+ADVERSARIAL = [
+    ("heads_without_status", _fill("到期日: 2025-12-31 SC: 6500 LC: 6495 ")),
+    ("at_sign_run", "到期日: 2025-12-31 SC: 6500 LC: 6495 " + _fill("@1 ")),
+    ("heads_and_at_signs", _fill("到期日: 2025-12-31 SC: 6500 LC: 6495 @1 @2 @3 ")),
+    ("long_tail_no_status", "到期日: 2025-12-31 SC: 6500 LC: 6495" + _fill("x")),
+    ("partial_heads", _fill("到期日: 2025-12-31 SC: 6500 LC:")),
+    ("digit_run_strike", "到期日: 2025-12-31 SC: " + _fill("9.")),
+    ("huge_set_count", "到期日: 2025-12-31 SC: 6500 LC: 6495 @" + _fill("9") + " 未觸發"),
+    ("markers_only", _fill("到期日")),
+    ("status_chars_only", _fill("未觸發觸發未")),
+    ("valid_then_garbage", "\n".join([LINE] * 100) + "\n" + _fill("到期日: 2025-12-31 SC: 1 LC: 2 @")),
+]
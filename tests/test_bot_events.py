@@ -0,0 +1,103 @@
+# tests/test_bot_events.py
+import io
+import threading
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from bot_events import (BARS, HEADER, MAX_FRAME, ORDER, PRICE, STATUS, BotState, EventChannel, EventServer,
+                        encode_event, read_event)
+from ibkr_app import IBKRApp
+from main import session_bars
+
+
+class TestBotEvents(unittest.TestCase):
+    """Test the length-prefixed event channel between the bot and the API server."""
+
+    def test_frames_are_length_prefixed(self):
+        """Test that payloads with newlines and non-ASCII text survive, and bad frames are rejected."""
+        stream = io.BytesIO(encode_event(STATUS, {"note": "a\nb ✓"}) + encode_event(PRICE, {"price": 6500.25}))
+        self.assertEqual(read_event(stream), {"type": STATUS, "note": "a\nb ✓"})
+        self.assertEqual(read_event(stream), {"type": PRICE, "price": 6500.25})
+        self.assertIsNone(read_event(stream))
+
+        with self.assertRaises(ValueError):
+            read_event(io.BytesIO(encode_event(PRICE, {"price": 1})[:-1]))
+        with self.assertRaises(ValueError):
+            read_event(io.BytesIO(HEADER.pack(MAX_FRAME + 1)))
+
+    def test_server_takes_events_after_token(self):
+        """Test events sent by a channel reaching the server, and a channel with a wrong token being ignored."""
+        received, done = [], threading.Event()
+
+        def on_event(event):
+            received.append(event)
+            if event["type"] == ORDER:
+                done.set()
+
+        server = EventServer(on_event)
+        server.start()
+        try:
+            impostor = EventChannel()
+            self.assertTrue(impostor.connect(server.address.rsplit(":", 1)[0] + ":wrong"))
+            impostor.send(ORDER, order_id=1, status="Filled")
+
+            channel = EventChannel()
+            self.assertTrue(channel.connect(server.address))
+            channel.send(PRICE, price=6500.0, close_seconds=60)
+            channel.send(ORDER, order_id=7, status="Submitted")
+            self.assertTrue(done.wait(2))
+            self.assertEqual(received, [{"type": PRICE, "price": 6500.0, "close_seconds": 60},
+                                        {"type": ORDER, "order_id": 7, "status": "Submitted"}])
+            channel.close()
+            impostor.close()
+        finally:
+            server.close()
+
+        self.assertFalse(EventChannel().send(PRICE, price=1.0))  # Never connected
+
+    def test_state_merges_events(self):
+        """Test that status events merge and order events are kept per order."""
+        state = BotState()
+        state.apply({"type": STATUS, "phase": "waiting_open", "open_seconds": 5})
+        state.apply({"type": STATUS, "error_orders": []})
+        state.apply({"type": ORDER, "order_id": 3, "status": "Submitted"})
+        state.apply({"type": ORDER, "order_id": 3, "status": "Filled"})
+        snapshot = state.snapshot()
+        self.assertEqual(snapshot["status"], {"phase": "waiting_open", "open_seconds": 5, "error_orders": []})
+        self.assertEqual(snapshot["orders"], {"3": {"order_id": 3, "status": "Filled"}})
+
+    def test_price_status_uses_channel(self):
+        """Test that the live price goes over the channel instead of stdout when one is connected."""
+        app = IBKRApp()
+        app.current_spx_price = 6500.0
+        with patch("ibkr_app.events") as events, patch("builtins.print") as printed:
+            events.send.return_value = True
+            app.print_price_status()
+            events.send.assert_called_once_with(PRICE, price=6500.0, close_seconds=None)
+            printed.assert_not_called()
+
+            events.send.return_value = False
+            app.print_price_status()
+            self.assertIn("Live SPX Price: 6500.0", printed.call_args[0][0])
+
+    def test_session_bars_event(self):
+        """Test that the session's one-minute bars and VWAP become a JSON-ready event kept by the state."""
+        app = IBKRApp()
+        open_time = 1767191400.0  # A minute boundary
+        app.spx_store.append(6400.0, 4, 1, open_time - 30)  # Before the open
+        for offset, price, size in ((5, 6500.0, 1), (30, 6510.0, 3), (65, 6490.0, 1)):
+            app.spx_store.append(price, 4, size, open_time + offset)
+
+        fields = session_bars(app, datetime.fromtimestamp(open_time))
+        self.assertEqual([(b["open"], b["high"], b["low"], b["close"], b["count"]) for b in fields["bars"]],
+                         [(6500.0, 6510.0, 6500.0, 6510.0, 2), (6490.0, 6490.0, 6490.0, 6490.0, 1)])
+        self.assertAlmostEqual(fields["vwap"], 6504.0)
+
+        state = BotState()
+        state.apply(read_event(io.BytesIO(encode_event(BARS, fields))))
+        self.assertEqual(state.snapshot()["bars"], fields)
+
+
+if __name__ == "__main__":
+    unittest.main()
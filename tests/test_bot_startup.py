@@ -0,0 +1,73 @@
+# tests/test_bot_startup.py
+import builtins
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import bot_startup
+from bot_startup import StartupProfiler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestBotStartup(unittest.TestCase):
+    """Test the startup profiler and that the bot's startup skips its heaviest imports."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        sys.path.insert(0, self.tmpdir)
+
+    def tearDown(self):
+        sys.path.remove(self.tmpdir)
+        for name in ("startup_outer", "startup_inner"):
+            sys.modules.pop(name, None)
+        shutil.rmtree(self.tmpdir)
+
+    def test_import_times_nest(self):
+        """Test that a nested first import counts toward its parent's total but not its self time."""
+        with open(os.path.join(self.tmpdir, "startup_inner.py"), "w") as f:
+            f.write("import time\ntime.sleep(0.05)\n")
+        with open(os.path.join(self.tmpdir, "startup_outer.py"), "w") as f:
+            f.write("import startup_inner\n")
+        original = builtins.__import__
+        profiler = StartupProfiler()
+        profiler.install()
+        try:
+            import startup_outer  # noqa: F401
+            import startup_outer  # noqa: F401,F811 - already imported, not recorded again
+        finally:
+            profiler.uninstall()
+        self.assertIs(builtins.__import__, original)
+
+        records = {name: (total, own, depth) for name, total, own, depth in profiler.imports}
+        self.assertEqual(len(profiler.imports), 2)
+        self.assertEqual((records["startup_inner"][2], records["startup_outer"][2]), (1, 0))
+        self.assertGreaterEqual(records["startup_outer"][0], 0.05)
+        self.assertLess(records["startup_outer"][1], 0.05)
+
+    def test_finish_reports_once(self):
+        """Test that finish prints the milestones once and that mark is a no-op afterwards."""
+        bot_startup.enable()
+        bot_startup.mark("entry")
+        with patch("builtins.print") as printed:
+            bot_startup.finish("IBKR connected")
+            bot_startup.finish("IBKR connected")
+            bot_startup.mark("ignored")
+        lines = [call.args[0] for call in printed.call_args_list]
+        self.assertEqual(lines[0], "--- Startup profile ---")
+        self.assertTrue(lines[1].endswith("entry") and lines[2].endswith("IBKR connected"))
+        self.assertIsNone(bot_startup.profiler)
+
+    def test_bot_imports_stay_light(self):
+        """Test that importing main loads neither the web server nor telethon."""
+        code = "import sys, main; sys.stdout.write(repr(sorted(m for m in ('flask', 'flask_socketio', 'telethon', 'requests') if m in sys.modules)))"
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "[]", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
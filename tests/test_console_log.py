@@ -0,0 +1,100 @@
+# tests/test_console_log.py
+import os
+import shutil
+import tempfile
+import unittest
+
+from console_log import ConsoleLog
+
+
+def day_lines(day, hours=(9, 10, 11), per_hour=4):
+    return [f"[TS:{day} {h:02d}:{m * 10:02d}:00] line {h}-{m}" for h in hours for m in range(per_hour)]
+
+
+class TestConsoleLog(unittest.TestCase):
+    """Test the per-day, hour-indexed console log."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.log = ConsoleLog(os.path.join(self.tmpdir, "console_logs"))
+
+    def tearDown(self):
+        self.log.close()
+        shutil.rmtree(self.tmpdir)
+
+    def write_all(self, lines):
+        for line in lines:
+            self.log.write(line)
+        self.log.flush()
+
+    def test_lines_split_per_day(self):
+        """Test that each day gets its own file and untimestamped lines follow the previous line."""
+        self.write_all(day_lines("2025-12-30", hours=(15,), per_hour=1) + ["traceback line"] + day_lines("2025-12-31", hours=(9,), per_hour=1))
+
+        self.assertEqual(self.log.days(), ["2025-12-30", "2025-12-31"])
+        lines, cursor = self.log.history("2025-12-30")
+        self.assertEqual(lines, ["[TS:2025-12-30 15:00:00] line 15-0", "traceback line"])
+        self.assertIsNone(cursor)
+
+    def test_time_range_and_text_filter(self):
+        """Test filtering by time range (inclusive) and case-insensitive text."""
+        self.write_all(day_lines("2025-12-31"))
+
+        lines, _ = self.log.history("2025-12-31", start="10:00", end="10:20")
+        self.assertEqual([l[-4:] for l in lines], ["10-0", "10-1", "10-2"])
+        lines, _ = self.log.history("2025-12-31", start="10", end="10")
+        self.assertEqual(len(lines), 4)
+        lines, _ = self.log.history("2025-12-31", text="LINE 11-3")
+        self.assertEqual(lines, ["[TS:2025-12-31 11:30:00] line 11-3"])
+
+    def test_cursor_pagination(self):
+        """Test that pages chain through next_cursor without gaps or repeats."""
+        expected = day_lines("2025-12-31")
+        self.write_all(expected)
+
+        seen, cursor = [], None
+        while True:
+            lines, cursor = self.log.history("2025-12-31", cursor=cursor, limit=5)
+            seen.extend(lines)
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_rotation_compresses_past_days(self):
+        """Test that past days are gzipped per hour and remain queryable with the same cursors."""
+        self.write_all(day_lines("2025-12-30"))
+        page1, cursor = self.log.history("2025-12-30", limit=3)
+        self.write_all(day_lines("2025-12-31", hours=(9,), per_hour=1))  # A new day triggers rotation
+
+        directory = self.log.directory
+        self.assertTrue(os.path.exists(os.path.join(directory, "2025-12-30.log.gz")))
+        self.assertFalse(os.path.exists(os.path.join(directory, "2025-12-30.log")))
+        page2, _ = self.log.history("2025-12-30", cursor=cursor, limit=3)
+        self.assertEqual(page1 + page2, day_lines("2025-12-30")[:6])
+        lines, _ = self.log.history("2025-12-30", start="11:00")
+        self.assertEqual(lines, day_lines("2025-12-30", hours=(11,)))
+
+    def test_late_line_restores_rotated_day(self):
+        """Test that writing to a rotated day brings it back without losing earlier lines."""
+        self.write_all(day_lines("2025-12-30", hours=(9,), per_hour=2))
+        self.log.rotate(today="2025-12-31")
+        self.write_all(["[TS:2025-12-30 16:00:00] late"])
+
+        lines, _ = self.log.history("2025-12-30")
+        self.assertEqual(lines, day_lines("2025-12-30", hours=(9,), per_hour=2) + ["[TS:2025-12-30 16:00:00] late"])
+
+    def test_migrate_legacy_log(self):
+        """Test splitting an old single-file bot_console.log into days."""
+        legacy = os.path.join(self.tmpdir, "bot_console.log")
+        with open(legacy, "w", encoding="utf-8") as f:
+            f.write("\n".join(day_lines("2025-12-29", hours=(9,)) + day_lines("2025-12-30", hours=(9,))) + "\n")
+
+        self.log.migrate(legacy)
+
+        self.assertEqual(self.log.days(), ["2025-12-29", "2025-12-30"])
+        self.assertTrue(os.path.exists(legacy + ".migrated"))
+        self.assertEqual(self.log.history("2025-12-29")[0], day_lines("2025-12-29", hours=(9,)))
+
+
+if __name__ == "__main__":
+    unittest.main()
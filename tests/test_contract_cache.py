@@ -0,0 +1,118 @@
+# tests/test_contract_cache.py
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from ibapi.contract import Contract, ContractDetails
+
+from contract_cache import ContractCache, make_key
+from ibkr_app import IBKRApp
+from main import build_option_contract
+
+
+def make_option_details(conid, expiry, strike, right="C"):
+    details = ContractDetails()
+    details.contract.conId = conid
+    details.contract.symbol = "SPX"
+    details.contract.secType = "OPT"
+    details.contract.tradingClass = "SPXW"
+    details.contract.lastTradeDateOrContractMonth = expiry
+    details.contract.strike = strike
+    details.contract.right = right
+    return details
+
+
+class TestContractCache(unittest.TestCase):
+    """Test the persistent two-way option contract cache."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "contract_cache.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_two_way_lookup(self):
+        """Test that conIds can be found by contract fields and contract fields by conId."""
+        cache = ContractCache(self.path)
+        key = make_key("SPX", "SPXW", "20991231", 5900, "CALL")
+        cache.put(key, 111)
+
+        self.assertEqual(cache.get_conid(key), 111)
+        self.assertEqual(cache.get_key(111), ("SPX", "SPXW", "20991231", 5900.0, "C"))
+        self.assertEqual(cache.lookup(build_option_contract("20991231", 5900.0, "C")), 111)
+
+    def test_save_and_load_roundtrip(self):
+        """Test that entries survive a restart."""
+        cache = ContractCache(self.path)
+        cache.put(make_key("SPX", "SPXW", "20991231", 5900, "C"), 111)
+        cache.save()
+
+        reloaded = ContractCache(self.path)
+        reloaded.load()
+
+        self.assertEqual(len(reloaded), 1)
+        self.assertEqual(reloaded.get_conid(make_key("SPX", "SPXW", "20991231", 5900, "C")), 111)
+
+    def test_expired_entries_are_evicted(self):
+        """Test that options whose expiry has passed are dropped."""
+        cache = ContractCache(self.path)
+        cache.put(make_key("SPX", "SPXW", "20250101", 5900, "C"), 111)
+        cache.put(make_key("SPX", "SPXW", "20250102", 5905, "C"), 222)
+
+        evicted = cache.evict_expired(today="20250102")
+
+        self.assertEqual(evicted, 1)
+        self.assertIsNone(cache.get_key(111))
+        self.assertIsNotNone(cache.get_key(222))
+
+    def test_corrupt_file_is_ignored(self):
+        """Test that an unreadable cache file starts an empty cache."""
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        cache = ContractCache(self.path)
+        cache.load()
+        self.assertEqual(len(cache), 0)
+
+
+class TestIBKRAppContractCache(unittest.TestCase):
+    """Test that IBKRApp consults the contract cache before asking TWS."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.app = IBKRApp()
+        self.app.contract_cache = ContractCache(os.path.join(self.tmpdir, "contract_cache.json"))
+        self.app.reqContractDetails = MagicMock()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_contract_details_callback_populates_cache(self):
+        """Test that option details received from TWS are stored in the cache."""
+        self.app.contractDetails(1, make_option_details(111, "20991231", 5900.0))
+        self.assertEqual(self.app.contract_cache.lookup(build_option_contract("20991231", 5900.0, "C")), 111)
+
+    def test_get_contract_details_served_from_cache(self):
+        """Test that a cached contract needs no reqContractDetails round trip."""
+        self.app.contractDetails(1, make_option_details(111, "20991231", 5900.0))
+
+        conid = self.app.get_contract_details(build_option_contract("20991231", 5900.0, "C"))
+
+        self.assertEqual(conid, 111)
+        self.app.reqContractDetails.assert_not_called()
+
+    def test_fetch_contract_details_for_conids_served_from_cache(self):
+        """Test that strike/expiry maps are filled from the cache for known conIds."""
+        self.app.contract_cache.put(make_key("SPX", "SPXW", "20991231", 5900, "C"), 111)
+
+        strike_map, expiry_map = self.app.fetch_contract_details_for_conids([111])
+
+        self.assertEqual(strike_map[111], 5900.0)
+        self.assertEqual(expiry_map[111], "20991231")
+        self.app.reqContractDetails.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,7 @@ from unittest.mock import MagicMock, patch, call
 from ibapi.contract import Contract
 from ibapi.order_condition import PriceCondition, OrderCondition
 from ibkr_app import IBKRApp
+from tick_stats import StatusThrottle
 
 
 class TestIBKRAppInitialization(unittest.TestCase):
@@ -219,6 +220,93 @@ class TestContractDetailsThreadSafety(unittest.TestCase):
             self.assertIn(conid, expiry_map)
 
 
+class TestBatchConidResolution(unittest.TestCase):
+    """Test resolve_conids sends all requests up front and retries only the failures."""
+
+    def setUp(self):
+        self.app = IBKRApp()
+
+    def _make_details(self, conid, strike):
+        from ibapi.contract import ContractDetails
+        details = MagicMock(spec=ContractDetails)
+        details.contract = MagicMock(spec=Contract)
+        details.contract.conId = conid
+        details.contract.strike = strike
+        details.contract.lastTradeDateOrContractMonth = "20251231"
+        return details
+
+    def test_resolve_conids_sends_all_before_waiting(self):
+        """All requests should be in flight at once, so the batch takes about one round trip."""
+        sent = []
+
+        def mock_req_contract_details(req_id, contract):
+            sent.append(req_id)
+
+            def callback():
+                time.sleep(0.2)
+                self.app.contractDetails(req_id, self._make_details(int(contract.strike), contract.strike))
+                self.app.contractDetailsEnd(req_id)
+
+            threading.Thread(target=callback).start()
+
+        self.app.reqContractDetails = mock_req_contract_details
+
+        contracts = {}
+        for strike in (5900, 5905, 5910, 5915, 5920):
+            c = Contract()
+            c.symbol = "SPX"
+            c.strike = float(strike)
+            contracts[strike] = c
+
+        start = time.monotonic()
+        resolved = self.app.resolve_conids(contracts, timeout=2)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(resolved, {5900: 5900, 5905: 5905, 5910: 5910, 5915: 5915, 5920: 5920})
+        self.assertEqual(len(set(sent)), 5)
+        # Serial requests would take 5 x 0.2s
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(self.app.contract_details_events, {})
+
+    @patch('ibkr_app.time.sleep')
+    def test_resolve_conids_retries_timed_out_requests(self, mock_sleep):
+        """Requests that time out are re-sent on the next attempt; resolved ones are not."""
+        calls = []
+
+        def mock_req_contract_details(req_id, contract):
+            calls.append(contract.strike)
+            # The 5905 leg only answers on its second request
+            if contract.strike == 5905.0 and calls.count(5905.0) == 1:
+                return
+            self.app.contractDetails(req_id, self._make_details(int(contract.strike), contract.strike))
+            self.app.contractDetailsEnd(req_id)
+
+        self.app.reqContractDetails = mock_req_contract_details
+
+        lc, sc = Contract(), Contract()
+        lc.symbol = sc.symbol = "SPX"
+        lc.strike, sc.strike = 5900.0, 5905.0
+
+        resolved = self.app.resolve_conids([lc, sc], timeout=0.1, attempts=3)
+
+        self.assertEqual(resolved, {0: 5900, 1: 5905})
+        self.assertEqual(calls, [5900.0, 5905.0, 5905.0])
+
+    @patch('ibkr_app.time.sleep')
+    def test_resolve_conids_omits_failures(self, mock_sleep):
+        """Contracts with no details after all attempts are left out of the result."""
+        def mock_req_contract_details(req_id, contract):
+            self.app.contractDetailsEnd(req_id)
+
+        self.app.reqContractDetails = mock_req_contract_details
+
+        c = Contract()
+        c.symbol = "SPX"
+        resolved = self.app.resolve_conids({"missing": c}, timeout=0.5, attempts=2)
+
+        self.assertEqual(resolved, {})
+
+
 class TestErrorHandling(unittest.TestCase):
     """Test error handling and event signaling."""
 
@@ -239,10 +327,75 @@ class TestErrorHandling(unittest.TestCase):
     def test_informational_codes_dont_interfere(self):
         """Test that informational codes don't interfere with normal operation."""
         info_codes = [2104, 2106, 2158, 162, 2107, 2108]
-        for code in info_codes:
-            self.app.error(1, code, "Informational message")
-        # Should not raise any exceptions
-        self.assertTrue(True)
+        with patch("ibkr_app.events.send") as mock_send:
+            for code in info_codes:
+                self.app.error(1, code, "Informational message")
+            # Only real errors reach the dashboard's TWS message log
+            mock_send.assert_not_called()
+            self.app.error(7, 201, "Order rejected")
+        mock_send.assert_called_once_with("log", req_id=7, code=201, message="Order rejected")
+
+
+class TestOrderCancellation(unittest.TestCase):
+    """Test cancel requests and their error-202 confirmation."""
+
+    def setUp(self):
+        self.app = IBKRApp()
+        self.app.cancelOrder = MagicMock()
+
+    def test_cancel_confirmed_by_202(self):
+        """Test that error 202 clears the pending cancel and records its latency."""
+        self.app.duplicate_index.add(7, [1, 2], 6497.5)
+
+        self.assertEqual(self.app.cancel_orders([7]), [7])
+        self.app.cancelOrder.assert_called_once_with(7)
+        self.assertIn(7, self.app.pending_cancels)
+
+        self.app.error(7, 202, "Order Canceled - reason:")
+
+        self.assertNotIn(7, self.app.pending_cancels)
+        self.assertIn(7, self.app.cancel_latencies)
+        self.assertEqual(self.app.order_states[7], "Cancelled")
+        self.assertEqual(self.app.duplicate_index.count([1, 2], 6497.5), 0)
+
+    def test_cancel_skips_filled_and_pending(self):
+        """Test that filled orders and orders already being cancelled get no second request."""
+        self.app.orderStatus(8, "Filled", 1, 0, 1.5, 0, 0, 1.5, 0, "", 0)
+        self.app.cancel_orders([9])
+        self.app.cancelOrder.reset_mock()
+
+        self.assertEqual(self.app.cancel_orders([8, 9, 10]), [10])
+        self.app.cancelOrder.assert_called_once_with(10)
+
+
+class TestTickThrottling(unittest.TestCase):
+    """Test that SPX ticks are all recorded while the status line is rate limited."""
+
+    def setUp(self):
+        self.app = IBKRApp()
+        self.app.status_throttle = StatusThrottle(2.0)
+
+    def test_every_tick_recorded_status_throttled(self):
+        """Test that every tick of a burst is stored and at most one status line is printed per 0.5s."""
+        prices = [6500.0, 6502.5, 6498.0, 6501.0]
+        with patch("ibkr_app.time.monotonic", side_effect=[10.0, 10.1, 10.2, 10.6]), \
+             patch.object(self.app, "print_price_status") as status:
+            for price in prices:
+                self.app.tickPrice(IBKRApp.REQID_SPX_STREAM, 4, price, None)
+
+        _, stored, _ = self.app.spx_store.window(tick_type=4)
+        self.assertEqual(stored.tolist(), prices)
+        self.assertEqual(self.app.current_spx_price, 6501.0)
+        self.assertEqual(status.call_count, 2)  # At 10.0 and 10.6
+
+    def test_other_ticks_ignored_and_zero_rate_unthrottled(self):
+        """Test that non-last ticks do not move the live price and a rate of 0 prints every tick."""
+        self.app.tickPrice(IBKRApp.REQID_SPX_STREAM, 1, 6499.0, None)  # Bid
+        self.assertIsNone(self.app.current_spx_price)
+        self.assertEqual(len(self.app.spx_store.window(tick_type=4)[0]), 0)  # Stored, but not as a last price
+
+        throttle = StatusThrottle(0)
+        self.assertTrue(all(throttle.due(1.0) for _ in range(3)))
 
 
 if __name__ == "__main__":
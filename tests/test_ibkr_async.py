@@ -0,0 +1,175 @@
+# tests/test_ibkr_async.py
+import asyncio
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ibapi.common import BarData
+from ibapi.contract import Contract, ContractDetails
+from ibapi.order import Order
+from ibapi.order_state import OrderState
+
+from ibkr_app import IBKRApp
+from ibkr_async import AsyncIBKR, IBKRRequestError
+from main import fetch_orders_and_trigger_conid
+
+
+def later(delay, fn, *args):
+    """Calls fn from another thread, as the EClient reader thread would."""
+    timer = threading.Timer(delay, fn, args)
+    timer.start()
+    return timer
+
+def details(conid, strike=0.0):
+    d = ContractDetails()
+    d.contract.conId = conid
+    d.contract.strike = strike
+    return d
+
+def option(strike):
+    c = Contract()
+    c.symbol, c.secType, c.strike = "SPX", "OPT", strike
+    return c
+
+def combo_order(order_id):
+    contract = Contract()
+    contract.symbol, contract.secType = "SPX", "BAG"
+    return order_id, contract, Order(), OrderState()
+
+
+class TestAsyncIBKR(unittest.TestCase):
+    """Test the asyncio request layer resolving per-reqId futures from the reader thread."""
+
+    def setUp(self):
+        self.app = IBKRApp()
+        self.ib = AsyncIBKR(self.app)
+        patcher = patch("builtins.print")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_concurrent_requests_resolve_by_reqid(self):
+        """Test that contract details and historical bars sent together resolve by reqId, answered in any order."""
+        sent = []
+
+        def req_contract_details(req_id, contract):
+            sent.append(req_id)
+            # The first request is answered last
+            delay = 0.15 if contract.strike == 6500 else 0.02
+            later(delay, self.app.contractDetails, req_id, details(int(contract.strike) * 10, contract.strike))
+            later(delay + 0.01, self.app.contractDetailsEnd, req_id)
+
+        def req_historical_data(req_id, *args):
+            sent.append(req_id)
+            bar = BarData()
+            bar.date, bar.open = "20251231", 6501.5
+            later(0.05, self.app.historicalData, req_id, bar)
+            later(0.06, self.app.historicalDataEnd, req_id, "", "")
+
+        self.app.reqContractDetails = req_contract_details
+        self.app.reqHistoricalData = req_historical_data
+
+        async def run():
+            return await asyncio.gather(self.ib.conid(option(6500)), self.ib.conid(option(6530)),
+                                        self.ib.historical_bars(Contract(), timeout=2))
+
+        low, high, bars = asyncio.run(run())
+        self.assertEqual((low, high), (65000, 65300))
+        self.assertEqual([b.open for b in bars], [6501.5])
+        self.assertEqual(len(set(sent)), 3)
+        self.assertEqual(self.app.conid_to_strike[65000], 6500)  # The app's own mappings still update
+        self.assertFalse(self.ib._requests)
+        self.assertIsNone(self.app.underlying_open_price)  # The bar went to the request, not the open price
+
+    def test_timeouts_and_errors_end_requests(self):
+        """Test that a timeout cancels at TWS, an error fails only its request, and warnings are ignored."""
+        self.app.reqHistoricalData = MagicMock()
+        self.app.cancelHistoricalData = MagicMock()
+
+        def req_contract_details(req_id, contract):
+            later(0.01, self.app.error, req_id, 2176, "Warning: fractional share size rules")
+            later(0.02, self.app.error, req_id, 200, "No security definition has been found for the request")
+
+        self.app.reqContractDetails = req_contract_details
+
+        async def run():
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.ib.historical_bars(Contract(), timeout=0.05)
+            req_id = self.app.reqHistoricalData.call_args[0][0]
+            self.app.cancelHistoricalData.assert_called_once_with(req_id)
+
+            with self.assertRaises(IBKRRequestError) as ctx:
+                await self.ib.contract_details(option(1), timeout=1)
+            self.assertEqual(ctx.exception.code, 200)
+            with self.assertRaisesRegex(Exception, "No details found"):
+                await self.ib.conid(option(1), timeout=1)
+
+        asyncio.run(run())
+        self.assertFalse(self.ib._requests)
+
+    def test_open_orders_shared_and_tick_stream(self):
+        """Test that concurrent open orders callers share one request, and a tick stream is cancelled on close."""
+        def req_all_open_orders():
+            later(0.02, self.app.openOrder, *combo_order(11))
+            later(0.03, self.app.openOrderEnd)
+
+        self.app.reqAllOpenOrders = MagicMock(side_effect=req_all_open_orders)
+        self.app.cancelMktData = MagicMock()
+
+        def req_mkt_data(req_id, *args):
+            later(0.01, self.app.tickPrice, req_id, 4, 101.5, None)
+            later(0.02, self.app.error, req_id, 10167, "Displaying delayed market data")
+            later(0.03, self.app.tickPrice, req_id, 4, 102.0, None)
+
+        self.app.reqMktData = req_mkt_data
+
+        async def run():
+            first, second = await asyncio.gather(self.ib.open_orders(timeout=1), self.ib.open_orders(timeout=1))
+            self.assertEqual([o["orderId"] for o in first], [11])
+            self.assertEqual(first, second)
+            self.assertEqual(self.app.reqAllOpenOrders.call_count, 1)
+
+            async with self.ib.market_data(Contract()) as ticks:
+                self.assertEqual(await ticks.next(timeout=1), (4, 101.5))
+                self.assertEqual(await ticks.next(timeout=1), (4, 102.0))
+                with self.assertRaises(asyncio.TimeoutError):
+                    await ticks.next(timeout=0.05)  # A quiet stream stays subscribed
+            self.app.cancelMktData.assert_called_once_with(ticks.req_id)
+
+        asyncio.run(run())
+        self.assertIsNone(self.app.current_spx_price)  # Not taken for the SPX stream
+        self.assertFalse(self.ib._requests)
+        self.app.openOrder(*combo_order(12))  # A later update finds no request and no closed loop
+
+    def test_startup_fetches_run_together(self):
+        """Test that main's startup fetch sends the open orders and SPX conId requests before either answer."""
+        sent, sent_before_answer = [], []
+
+        def answer_order():
+            sent_before_answer.append(len(sent))
+            self.app.openOrder(*combo_order(21))
+
+        def req_all_open_orders():
+            sent.append("orders")
+            later(0.1, answer_order)
+            later(0.11, self.app.openOrderEnd)
+
+        def req_contract_details(req_id, contract):
+            sent.append("conid")
+            self.assertEqual(contract.secType, "IND")
+            later(0.1, self.app.contractDetails, req_id, details(416904))
+            later(0.11, self.app.contractDetailsEnd, req_id)
+
+        self.app.reqAllOpenOrders = req_all_open_orders
+        self.app.reqContractDetails = req_contract_details
+        self.app.open_orders = [{"orderId": 1}]  # Stale list of the previous fetch
+
+        orders, conid = fetch_orders_and_trigger_conid(self.app)
+        self.assertEqual(sorted(sent), ["conid", "orders"])
+        self.assertEqual(sent_before_answer, [2])
+        self.assertEqual(conid, 416904)
+        self.assertEqual([o["orderId"] for o in orders], [21])
+        self.assertEqual(self.app.open_orders, orders)
+
+
+if __name__ == "__main__":
+    unittest.main()
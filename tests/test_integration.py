@@ -155,6 +155,30 @@ class TestProcessAndStageNewSignals(unittest.TestCase):
         self.assertEqual(len(managed_orders), 0)
 
 
+    @patch('main.get_contract_conid_with_retry')
+    @patch('main.build_staged_order')
+    def test_process_signal_uses_resolved_conids(self, mock_build_order, mock_get_conid):
+        """Test that legs already resolved in a batch skip the per-leg lookup."""
+        mock_build_order.return_value = MagicMock()
+
+        managed_orders = []
+        conid_map = {("20251231", 5900.0, "C"): 123, ("20251231", 5905.0, "C"): 456}
+
+        process_and_stage_new_signals(
+            self.mock_app,
+            [self.signal],
+            managed_orders,
+            [],
+            trigger_conid=999,
+            conid_map=conid_map
+        )
+
+        mock_get_conid.assert_not_called()
+        self.assertEqual(len(managed_orders), 1)
+        leg_ids = [leg.conId for leg in managed_orders[0].contract.comboLegs]
+        self.assertEqual(leg_ids, [123, 456])
+
+
 class TestOrderWorkflow(unittest.TestCase):
     """Test complete order workflow from signal to placement."""
 
@@ -0,0 +1,68 @@
+# tests/test_live_config.py
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from config import LiveConfig
+from main import build_staged_order
+from signal_utils import Signal
+
+
+class TestLiveConfig(unittest.TestCase):
+    """Test reloading config.json into validated snapshots while the bot runs."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "config.json")
+        self.write({"SNAPMID_OFFSET": "0.1", "LMT_PRICE_FOR_SPREAD_30": "19"})
+        self.live = LiveConfig(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, data, raw=None):
+        # Saved the way api.py saves: a new file moved over the old one
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(raw if raw is not None else json.dumps(data))
+        os.replace(tmp, self.path)
+
+    def test_reload_swaps_snapshot_on_change(self):
+        """Test that an unchanged file is not re-read and a saved change replaces the snapshot."""
+        with patch("builtins.open") as opened:
+            self.assertFalse(self.live.reload())
+            opened.assert_not_called()
+
+        before = self.live.snapshot
+        self.write({"SNAPMID_OFFSET": "0.2", "LMT_PRICE_FOR_SPREAD_30": "19"})  # Same size as before
+        with patch("builtins.print"):
+            self.assertTrue(self.live.reload())
+        self.assertEqual(self.live.snapshot.SNAPMID_OFFSET, 0.2)
+        self.assertEqual(before.SNAPMID_OFFSET, 0.1)  # Readers holding the old snapshot are unaffected
+
+    def test_invalid_change_keeps_snapshot(self):
+        """Test that a corrupt file, a bad number or a bad regex leaves the current settings in place."""
+        for data, raw in (({}, "{not json"), ({"SNAPMID_OFFSET": "abc"}, None), ({"MULTI_SIGNAL_REGEX": "("}, None)):
+            self.write(data, raw)
+            with patch("builtins.print") as printed:
+                self.assertFalse(self.live.reload())
+            self.assertIn("Config change ignored", printed.call_args[0][0])
+            self.assertEqual(self.live.snapshot.SNAPMID_OFFSET, 0.1)
+
+    def test_staged_orders_use_reloaded_caps(self):
+        """Test that build_staged_order reads the price cap saved after startup."""
+        signal = Signal(expiry="20251231", lc_strike=6500.0, sc_strike=6530.0, trigger_price=6515.0,
+                        order_type="LMT", lmt_price=None, stop_price=None, snapmid_offset=None)
+        with patch("config.live_config", self.live):
+            self.assertEqual(build_staged_order(signal, 416904).lmtPrice, 19.0)
+            self.write({"SNAPMID_OFFSET": "0.1", "LMT_PRICE_FOR_SPREAD_30": "21"})
+            with patch("builtins.print"):
+                self.live.reload()
+            self.assertEqual(build_staged_order(signal, 416904).lmtPrice, 21.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
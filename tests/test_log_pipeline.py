@@ -0,0 +1,136 @@
+# tests/test_log_pipeline.py
+import os
+import shutil
+import tempfile
+import unittest
+
+from log_pipeline import BufferedLogWriter, ConsoleBuffer, LogPipeline, is_updatable, strip_timestamp
+
+
+class TestLogPipeline(unittest.TestCase):
+    """Test ingestion of bot console lines."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.tmpdir, "bot_console.log")
+        self.output = ConsoleBuffer(maxlen=100)
+        self.frames = []
+        self.pipeline = LogPipeline(self.output, self.frames.append, self.log_path)
+
+    def tearDown(self):
+        self.pipeline.writer.close()
+        shutil.rmtree(self.tmpdir)
+
+    def read_log(self):
+        with open(self.log_path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_timestamp_helpers(self):
+        """Test stripping the [TS:...] prefix and spotting status lines."""
+        self.assertEqual(strip_timestamp("[TS:2025-12-31 09:30:00] Market is open!"), "Market is open!")
+        self.assertTrue(is_updatable("[TS:2025-12-31 09:30:00] Live SPX Price: 6500"))
+        self.assertFalse(is_updatable("[TS:2025-12-31 09:30:00] Market is open!"))
+
+    def test_status_lines_replace_in_place(self):
+        """Test that consecutive status lines overwrite each other and are not logged."""
+        self.pipeline.ingest("[TS:2025-12-31 09:30:00] Market is open!")
+        self.pipeline.ingest("[TS:2025-12-31 09:30:01] Live SPX Price: 6500")
+        self.pipeline.ingest("[TS:2025-12-31 09:30:02] Live SPX Price: 6501")
+        self.pipeline.writer.flush()
+
+        self.assertEqual(self.output.lines(), ["[TS:2025-12-31 09:30:00] Market is open!", "[TS:2025-12-31 09:30:02] Live SPX Price: 6501"])
+        self.assertEqual(self.read_log(), ["[TS:2025-12-31 09:30:00] Market is open!"])
+
+    def test_emits_are_batched(self):
+        """Test that many lines go out as one frame, with status runs collapsed."""
+        for i in range(50):
+            self.pipeline.ingest(f"line {i}")
+        self.pipeline.ingest("Live SPX Price: 6500")
+        self.pipeline.ingest("Live SPX Price: 6501")
+        self.assertEqual(self.frames, [])
+
+        self.pipeline.batcher.flush()
+
+        self.assertEqual(len(self.frames), 1)
+        frame = self.frames[0]
+        self.assertEqual(len(frame["entries"]), 51)
+        self.assertEqual(frame["entries"][-1], {"seq": 51, "line": "Live SPX Price: 6501"})
+        self.assertEqual((frame["prev_seq"], frame["last_seq"]), (0, 52))
+
+    def test_frames_chain_by_sequence(self):
+        """Test that each frame's prev_seq is the previous frame's last_seq, and updates keep their id."""
+        self.pipeline.ingest("Live SPX Price: 6500")
+        self.pipeline.batcher.flush()
+        self.pipeline.ingest("Live SPX Price: 6501")
+        self.pipeline.ingest("Market is open!")
+        self.pipeline.batcher.flush()
+
+        first, second = self.frames
+        self.assertEqual(second["prev_seq"], first["last_seq"])
+        self.assertEqual(second["entries"], [{"seq": 1, "line": "Live SPX Price: 6501"}, {"seq": 3, "line": "Market is open!"}])
+
+    def test_stop_flushes_everything(self):
+        """Test that stopping the pipeline writes and emits the remaining lines."""
+        self.pipeline.start()
+        self.pipeline.ingest("last words")
+        self.pipeline.stop()
+
+        self.assertEqual(self.read_log(), ["last words"])
+        self.assertEqual(sum(len(frame["entries"]) for frame in self.frames), 1)
+
+
+class TestConsoleBuffer(unittest.TestCase):
+    """Test resyncing clients from the sequence-numbered console buffer."""
+
+    def test_since_returns_only_changes(self):
+        """Test that since() returns new entries and the updated status line, nothing older."""
+        buffer = ConsoleBuffer()
+        buffer.add("a", False)
+        buffer.add("Live SPX Price: 6500", True)
+        seen = buffer.last_seq
+        buffer.add("Live SPX Price: 6501", True)
+        buffer.add("b", False)
+
+        entries, last_seq, reset = buffer.since(seen)
+        self.assertEqual(entries, [{"seq": 2, "line": "Live SPX Price: 6501"}, {"seq": 4, "line": "b"}])
+        self.assertEqual((last_seq, reset), (4, False))
+        self.assertEqual(buffer.since(last_seq), ([], 4, False))
+
+    def test_stale_clients_get_a_reset(self):
+        """Test that a cleared buffer, dropped entries or an unknown seq force a full reload."""
+        buffer = ConsoleBuffer(maxlen=3)
+        for line in "abcde":
+            buffer.add(line, False)
+        entries, _, reset = buffer.since(1)  # Entries 2 (and older) were dropped
+        self.assertTrue(reset)
+        self.assertEqual([e["line"] for e in entries], ["c", "d", "e"])
+        self.assertFalse(buffer.since(2)[2])
+        self.assertTrue(buffer.since(99)[2])
+
+        buffer.clear()
+        buffer.add("f", False)
+        self.assertEqual(buffer.since(5), ([{"seq": 7, "line": "f"}], 7, True))
+
+
+class TestBufferedLogWriter(unittest.TestCase):
+    """Test the buffered log file writer."""
+
+    def test_writes_when_buffer_is_full(self):
+        """Test that a full buffer is written without waiting for the flush interval."""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "log.txt")
+            writer = BufferedLogWriter(path, max_lines=3)
+            writer.write("a")
+            writer.write("b")
+            self.assertFalse(os.path.exists(path))
+            writer.write("c")
+            with open(path) as f:
+                self.assertEqual(f.read(), "a\nb\nc\n")
+            writer.close()
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    unittest.main()
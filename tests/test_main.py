@@ -1,4 +1,5 @@
 # tests/test_main.py
+import io
 import unittest
 import threading
 import time
@@ -15,10 +16,12 @@ from main import (
     ManagedOrder,
     get_trading_day_open
 )
+import main
 from signal_utils import Signal
 from ibkr_app import IBKRApp
 from ibapi.contract import Contract
 from ibapi.order import Order
+from ibapi.order_condition import Create, OrderCondition
 
 
 class TestIBKRAppInitialization(unittest.TestCase):
@@ -38,108 +41,62 @@ class TestIBKRAppInitialization(unittest.TestCase):
 class TestDuplicateOrderDetection(unittest.TestCase):
     """Test duplicate order detection logic with allowed_duplicates support."""
 
-    def test_no_duplicates_when_allowed_one(self):
-        """Test that first order is not considered duplicate when allowed_duplicates=1."""
-        leg_ids = [123, 456]
-        trigger = 6000.0
-        existing = []
-        managed = []
-        signal = Signal(
+    def setUp(self):
+        self.app = IBKRApp()
+
+    def make_signal(self, allowed_duplicates=1):
+        return Signal(
             expiry="20251231",
             lc_strike=5900.0,
             sc_strike=5905.0,
             trigger_price=6000.0,
             order_type="SNAP MID",
-            allowed_duplicates=1
+            allowed_duplicates=allowed_duplicates
         )
-        result = is_duplicate_order(leg_ids, trigger, existing, managed, signal)
+
+    def open_order(self, order_id, leg_ids, trigger):
+        """Reports a resting combo order through the openOrder callback, as TWS would."""
+        contract = Contract()
+        contract.symbol, contract.secType = "SPX", "BAG"
+        contract.comboLegs = [MagicMock(conId=conid) for conid in leg_ids]
+        order = Order()
+        cond = Create(OrderCondition.Price)
+        cond.price = trigger
+        order.conditions.append(cond)
+        with patch('builtins.print'):
+            self.app.openOrder(order_id, contract, order, MagicMock())
+
+    def test_no_duplicates_when_allowed_one(self):
+        """Test that first order is not considered duplicate when allowed_duplicates=1."""
+        result = is_duplicate_order(self.app, [123, 456], 6000.0, self.make_signal())
         self.assertFalse(result)
 
     def test_duplicate_detected_in_existing_orders(self):
         """Test duplicate detection when matching order exists in TWS."""
-        leg_ids = [123, 456]
-        trigger = 6000.0
-        existing = [{
-            "secType": "BAG",
-            "leg_conIds": [123, 456],
-            "trigger_price": 6000.0
-        }]
-        managed = []
-        signal = Signal(
-            expiry="20251231",
-            lc_strike=5900.0,
-            sc_strike=5905.0,
-            trigger_price=6000.0,
-            order_type="SNAP MID",
-            allowed_duplicates=1
-        )
-        result = is_duplicate_order(leg_ids, trigger, existing, managed, signal)
+        self.open_order(11, [456, 123], 6000.0)
+        result = is_duplicate_order(self.app, [123, 456], 6000.0, self.make_signal())
         self.assertTrue(result)
 
     def test_duplicate_detected_in_managed_orders(self):
         """Test duplicate detection in current session's managed orders."""
-        leg_ids = [123, 456]
-        trigger = 6000.0
-        existing = []
-        
-        # Create a mock managed order with proper structure
-        mock_contract = MagicMock()
-        mock_leg1 = MagicMock(conId=123)
-        mock_leg2 = MagicMock(conId=456)
-        mock_contract.comboLegs = [mock_leg1, mock_leg2]
-        
-        managed = [
-            MagicMock(contract=mock_contract, trigger=6000.0)
-        ]
-        signal = Signal(
-            expiry="20251231",
-            lc_strike=5900.0,
-            sc_strike=5905.0,
-            trigger_price=6000.0,
-            order_type="SNAP MID",
-            allowed_duplicates=1
-        )
-        result = is_duplicate_order(leg_ids, trigger, existing, managed, signal)
+        # Staging registers each order it places
+        self.app.duplicate_index.add(12, [123, 456], 6000.0)
+        result = is_duplicate_order(self.app, [123, 456], 6000.0, self.make_signal())
         self.assertTrue(result)
 
     def test_allowed_duplicates_two(self):
         """Test that allowed_duplicates=2 allows first duplicate."""
-        leg_ids = [123, 456]
-        trigger = 6000.0
-        existing = [{
-            "leg_conIds": [123, 456],
-            "trigger_price": 6000.0
-        }]
-        managed = []
-        signal = Signal(
-            expiry="20251231",
-            lc_strike=5900.0,
-            sc_strike=5905.0,
-            trigger_price=6000.0,
-            order_type="SNAP MID",
-            allowed_duplicates=2
-        )
-        result = is_duplicate_order(leg_ids, trigger, existing, managed, signal)
+        self.open_order(11, [123, 456], 6000.0)
+        result = is_duplicate_order(self.app, [123, 456], 6000.0, self.make_signal(allowed_duplicates=2))
         self.assertFalse(result)  # Should allow second order
 
     def test_allowed_duplicates_exceeded(self):
         """Test that duplicate is detected when count exceeds allowed_duplicates."""
-        leg_ids = [123, 456]
-        trigger = 6000.0
-        existing = [
-            {"secType": "BAG", "leg_conIds": [123, 456], "trigger_price": 6000.0},
-            {"secType": "BAG", "leg_conIds": [123, 456], "trigger_price": 6000.0}
-        ]
-        managed = []
-        signal = Signal(
-            expiry="20251231",
-            lc_strike=5900.0,
-            sc_strike=5905.0,
-            trigger_price=6000.0,
-            order_type="SNAP MID",
-            allowed_duplicates=2
-        )
-        result = is_duplicate_order(leg_ids, trigger, existing, managed, signal)
+        self.open_order(11, [123, 456], 6000.0)
+        self.open_order(12, [123, 456], 6000.0)
+        self.open_order(12, [123, 456], 6000.0)  # Repeated callbacks for one order count once
+        self.assertFalse(is_duplicate_order(self.app, [123, 456], 6005.0, self.make_signal(allowed_duplicates=2)))
+        result = is_duplicate_order(self.app, [123, 456], 6000.0, self.make_signal(allowed_duplicates=2))
         self.assertTrue(result)  # Already have 2, can't add more
 
 
@@ -349,5 +306,30 @@ class TestManagedOrderDataclass(unittest.TestCase):
         self.assertEqual(managed.hash, "abc123")
 
 
+class TestWarmStandby(unittest.TestCase):
+    """Test the standby that api.py keeps warm for /api/start."""
+
+    @patch("main.get_calendar")
+    @patch("main.main_loop")
+    def test_standby_runs_on_start_line(self, main_loop, get_calendar):
+        """Test that the standby loads the calendar, then runs the bot once a line arrives."""
+        with patch("sys.argv", ["api.py", "--client-id", "145"]), patch("sys.stdin", io.StringIO("start\n")):
+            main.run_standby()
+        get_calendar.assert_called_once()
+        main_loop.assert_called_once_with(prepared_app=None)
+
+    @patch("main.get_calendar")
+    @patch("main.main_loop")
+    @patch("main.connect_with_retry", return_value=True)
+    def test_connected_standby_exits_at_end_of_input(self, connect, main_loop, get_calendar):
+        """Test that a connected standby uses its client ID and disconnects when api.py goes away."""
+        with patch("sys.argv", ["api.py", "--client-id", "145"]), patch("sys.stdin", io.StringIO("")), \
+                patch.object(IBKRApp, "disconnect") as disconnect:
+            main.run_standby(connect=True)
+        self.assertEqual(connect.call_args[0][3], 145)
+        disconnect.assert_called_once()
+        main_loop.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
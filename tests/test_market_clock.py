@@ -0,0 +1,74 @@
+# tests/test_market_clock.py
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from market_clock import ClockOffset, refine_clock_offset, sleep_until
+
+
+def fake_tws(offset, delay=0.001):
+    """An app whose reqCurrentTime is answered like TWS, with a clock `offset` seconds ahead."""
+    app = MagicMock()
+    app.current_time_event = threading.Event()
+
+    def answer():
+        time.sleep(delay)
+        app.server_time = int(time.time() + offset)
+        app.server_time_received = time.time()
+        app.current_time_event.set()
+
+    app.reqCurrentTime.side_effect = answer
+    return app
+
+
+class TestClockOffset(unittest.TestCase):
+    """Test estimating the TWS clock offset from whole-second answers."""
+
+    def test_bounds_intersect_around_true_offset(self):
+        """Test that samples narrow the bounds and always contain the true offset."""
+        clock = ClockOffset()
+        clock.add_sample(100.0, 100.01, 100)   # Offset in [-0.01, 1.0]
+        clock.add_sample(101.6, 101.61, 101)   # Offset in [-0.61, 0.4]
+        clock.add_sample(102.55, 102.56, 103)  # Offset in [0.44, ...] -> inconsistent with 0.4: reset
+        self.assertAlmostEqual(clock.low, 0.44)
+        self.assertAlmostEqual(clock.high, 1.45)
+
+        clock = ClockOffset()
+        clock.add_sample(100.0, 100.01, 100)
+        clock.add_sample(101.6, 101.61, 101)
+        self.assertAlmostEqual(clock.low, -0.01)
+        self.assertAlmostEqual(clock.high, 0.4)
+        self.assertAlmostEqual(clock.offset, 0.195)
+
+    def test_refine_against_fake_tws(self):
+        """Test that timed probes pin down the offset of a simulated TWS clock."""
+        clock = refine_clock_offset(fake_tws(0.25), ClockOffset(), samples=3)
+
+        self.assertEqual(len(clock.samples), 3)
+        self.assertTrue(clock.low <= 0.25 <= clock.high)
+        self.assertLess(clock.uncertainty, 0.5)
+
+    def test_refine_stops_without_answer(self):
+        """Test that a missing answer ends the measurement instead of hanging."""
+        app = MagicMock()
+        app.current_time_event = threading.Event()
+        clock = refine_clock_offset(app, ClockOffset(), samples=3, timeout=0.05)
+        self.assertFalse(clock.known)
+        app.reqCurrentTime.assert_called_once()
+
+
+class TestSleepUntil(unittest.TestCase):
+    """Test the coarse-then-spin sleep."""
+
+    def test_hits_target_on_offset_clock(self):
+        """Test that the wake-up lands within a few milliseconds of a target on a shifted clock."""
+        offset = 5.0  # Server clock 5 s ahead of the local one
+        target = time.time() + offset + 0.2
+        late = sleep_until(target, offset)
+        self.assertLess(abs(late), 0.02)  # A few ms normally; headroom for a loaded test machine
+        self.assertGreaterEqual(time.time() + offset, target - 0.001)
+
+
+if __name__ == "__main__":
+    unittest.main()
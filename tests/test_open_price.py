@@ -0,0 +1,86 @@
+# tests/test_open_price.py
+import time
+import unittest
+from types import SimpleNamespace
+
+from ibkr_app import IBKRApp
+from open_price import FIRST_TRADE, HISTORICAL, OPEN_TICK, OpenPriceResolver
+
+
+class TestOpenPriceResolver(unittest.TestCase):
+    """Test racing the OPEN tick, the first trade and the daily bar for the open price."""
+
+    def setUp(self):
+        self.bell = time.time()
+        self.resolver = OpenPriceResolver(self.bell, "20251231")
+        self.requests = []
+
+    def resolve(self, grace=5.0, deadline=10.0):
+        ids = iter(range(500, 600))
+        return self.resolver.resolve(lambda: next(ids), self.requests.append, grace=grace, deadline=deadline,
+                                     historical_interval=0.05)
+
+    def test_open_tick_confirmed_by_first_trade(self):
+        """Test that a fresh OPEN tick confirmed by the first trade settles the open at once."""
+        self.resolver.on_tick(14, 6480.0, received=self.bell - 30)  # Yesterday's open, shown before the bell
+        self.resolver.on_tick(14, 6480.0, received=self.bell + 0.1)  # Still the stale value
+        self.resolver.on_tick(4, 6501.5, received=self.bell + 0.2)
+        self.resolver.on_tick(14, 6501.0, received=self.bell + 0.3)
+
+        start = time.monotonic()
+        quote = self.resolve()
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual((quote.source, quote.price), (OPEN_TICK, 6501.0))
+        self.assertAlmostEqual(self.resolver.latencies[OPEN_TICK], 0.3, places=3)
+        self.assertIn(FIRST_TRADE, self.resolver.latencies)
+
+    def test_daily_bar_must_be_dated_today(self):
+        """Test that only a daily bar of the session is taken, through IBKRApp.historicalData."""
+        app = IBKRApp()
+        app.open_price_resolver = self.resolver
+        self.resolver._hist_reqids.update({7, 8})
+        app.historicalData(7, SimpleNamespace(date="20251230", open=6480.0))
+        self.assertIsNone(self.resolver.decide())
+
+        app.historicalData(8, SimpleNamespace(date="20251231", open=6499.25))
+        app.historicalData(9, SimpleNamespace(date="20251231", open=1.0))  # Not the resolver's request
+        quote = self.resolver.decide()
+        self.assertEqual((quote.source, quote.price), (HISTORICAL, 6499.25))
+
+    def test_disputed_tick_waits_for_grace(self):
+        """Test that an OPEN tick contradicting the first trade is only taken after the grace period."""
+        self.resolver.on_tick(14, 6501.0, received=self.bell + 0.1)
+        self.resolver.on_tick(4, 6530.0, received=self.bell + 0.2)
+
+        start = time.monotonic()
+        quote = self.resolve(grace=0.3)
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+        self.assertEqual(quote.price, 6501.0)
+        self.assertTrue(self.requests)  # The daily bar was asked for meanwhile, each time with a new reqId
+        self.assertEqual(len(set(self.requests)), len(self.requests))
+
+        self.assertIsNone(OpenPriceResolver(time.time(), "20251231").resolve(lambda: 1, lambda r: None, grace=0.1, deadline=0.2))
+
+    def test_start_after_the_open_still_requests(self):
+        """Test that a bot started long after the bell still asks for the daily bar before giving up."""
+        late = OpenPriceResolver(time.time() - 1800, "20251231")
+        requests = []
+
+        def request_historical(req_id):
+            requests.append(req_id)
+            late.on_historical_bar(req_id, "20251231", 6499.25)
+
+        quote = late.resolve(lambda: 7, request_historical, grace=0.1, deadline=0.2)
+        self.assertEqual(requests, [7])
+        self.assertEqual((quote.source, quote.price), (HISTORICAL, 6499.25))
+
+        silent = []
+        start = time.monotonic()
+        self.assertIsNone(OpenPriceResolver(time.time() - 1800, "20251231").resolve(
+            lambda: len(silent), silent.append, grace=0.1, deadline=0.2, historical_interval=0.05))
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)  # The deadline counts from the late start
+        self.assertTrue(silent)
+
+
+if __name__ == "__main__":
+    unittest.main()
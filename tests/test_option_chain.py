@@ -0,0 +1,124 @@
+# tests/test_option_chain.py
+import unittest
+from unittest.mock import MagicMock, patch
+
+from option_chain import OptionChain, load_option_chain
+from main import listed_leg_strikes, resolve_signal_conids, retry_failed_signal
+from signal_utils import Signal
+
+
+class TestOptionChainSnapping(unittest.TestCase):
+    """Test nearest-listed-strike lookups."""
+
+    def setUp(self):
+        self.chain = OptionChain("SPXW", "20251231", expirations=["20251231", "20260115"], strikes=[5800, 5900, 6000])
+        self.chain.add_listed("20251231", [5890, 5895, 5900, 5910, 5925])
+
+    def test_exact_strike_is_kept(self):
+        """Test that a listed strike snaps to itself in every direction."""
+        for direction in ("down", "up", "nearest"):
+            self.assertEqual(self.chain.snap("20251231", 5900, direction), 5900.0)
+
+    def test_snap_directions(self):
+        """Test snapping an unlisted strike down, up and to the nearest listed strike."""
+        self.assertEqual(self.chain.snap("20251231", 5905, "down"), 5900.0)
+        self.assertEqual(self.chain.snap("20251231", 5905, "up"), 5910.0)
+        self.assertEqual(self.chain.snap("20251231", 5920, "nearest"), 5925.0)
+
+    def test_snap_beyond_range(self):
+        """Test that no strike is returned past the end of the grid."""
+        self.assertIsNone(self.chain.snap("20251231", 5880, "down"))
+        self.assertIsNone(self.chain.snap("20251231", 5930, "up"))
+        self.assertEqual(self.chain.snap("20251231", 5930, "nearest"), 5925.0)
+
+    def test_unloaded_expiry_uses_chain_strikes(self):
+        """Test that expiries without exact strikes fall back to the reqSecDefOptParams grid."""
+        self.assertTrue(self.chain.has_expiry("20260115"))
+        self.assertEqual(self.chain.snap("20260115", 5950, "up"), 6000.0)
+        self.assertFalse(self.chain.has_expiry("20270115"))
+        self.assertIsNone(self.chain.snap("20270115", 5950))
+
+    def test_listed_leg_strikes_widens_spread(self):
+        """Test that staging snaps LC down and SC up when a strike is not listed."""
+        app = MagicMock()
+        app.option_chain = self.chain
+        signal = Signal(expiry="20251231", lc_strike=5905.0, sc_strike=5920.0, trigger_price=5912.5, order_type="SNAP MID")
+
+        self.assertEqual(listed_leg_strikes(app, signal), (5900.0, 5925.0))
+
+    def test_snap_reported_once_per_signal(self):
+        """Test that resolving and then staging a snapped signal prints the snap once."""
+        app = MagicMock()
+        app.option_chain = self.chain
+        app.resolve_conids.return_value = {}
+        signal = Signal(expiry="20251231", lc_strike=5905.0, sc_strike=5920.0, trigger_price=5912.5, order_type="SNAP MID")
+        with patch("builtins.print") as printed:
+            resolve_signal_conids(app, [signal])
+            listed_leg_strikes(app, signal)
+        snaps = [c for c in printed.call_args_list if "not listed" in str(c.args[0])]
+        self.assertEqual(len(snaps), 1)
+
+    def test_union_strikes_still_widen_on_failure(self):
+        """Test that the ±5 fallback runs when only the union of strikes is known for the expiry."""
+        app = MagicMock()
+        app.option_chain = self.chain
+        app.nextOrderId = 1
+        app.duplicate_index.is_duplicate.return_value = False
+        signal = Signal(expiry="20260115", lc_strike=5900.0, sc_strike=5950.0, trigger_price=5925.0, order_type="SNAP MID")
+        fetched = []
+
+        def get_leg_conid(app, expiry, strike, right, conid_map=None):
+            fetched.append(strike)
+            if strike == 6000.0:  # In the union, not listed for this expiry
+                raise Exception("No details found")
+            return int(strike)
+
+        with patch("main.get_leg_conid", side_effect=get_leg_conid), patch("builtins.print"):
+            self.assertTrue(retry_failed_signal(app, signal, [signal], trigger_conid=416904))
+        self.assertEqual(fetched, [5900.0, 6000.0, 6005.0])
+        app.placeOrder.assert_called_once()
+
+        app.placeOrder.reset_mock()
+        fetched.clear()
+        listed = Signal(expiry="20251231", lc_strike=5905.0, sc_strike=5920.0, trigger_price=5912.5, order_type="SNAP MID")
+        with patch("main.get_leg_conid", side_effect=Exception("No details found")), patch("builtins.print"):
+            self.assertFalse(retry_failed_signal(app, listed, [listed], trigger_conid=416904))  # No guessing
+        app.placeOrder.assert_not_called()
+
+
+class TestLoadOptionChain(unittest.TestCase):
+    """Test building the chain from IBKR responses."""
+
+    def test_load_option_chain(self):
+        """Test that chain parameters and the exact strikes of each expiry are loaded."""
+        app = MagicMock()
+        app.get_option_chain_params.return_value = {
+            "SPXW": ({"20251231"}, {5900.0, 5905.0, 5910.0}),
+            "SPX": ({"20251219"}, {5000.0}),
+        }
+        details = []
+        for strike in (5900.0, 5910.0):
+            d = MagicMock()
+            d.contract.strike = strike
+            details.append(d)
+        app.get_all_contract_details.return_value = details
+
+        chain = load_option_chain(app, 416904, ["20251231"])
+
+        self.assertEqual(chain.strikes, [5900.0, 5905.0, 5910.0])
+        self.assertEqual(chain.strikes_for("20251231"), [5900.0, 5910.0])
+        app.get_all_contract_details.assert_called_once()
+        requested = app.get_all_contract_details.call_args[0][0]
+        self.assertEqual(requested.tradingClass, "SPXW")
+        self.assertEqual(requested.strike, 0.0)
+
+    def test_load_option_chain_failure(self):
+        """Test that a failed chain request returns None so staging falls back to the signal strikes."""
+        app = MagicMock()
+        app.get_option_chain_params.side_effect = Exception("timed out")
+
+        self.assertIsNone(load_option_chain(app, 416904, ["20251231"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+# tests/test_order_burst.py
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ibapi.order import Order
+from ibkr_app import IBKRApp
+from main import ManagedOrder, build_combo_contract, process_managed_orders
+from order_burst import partition_by_open, transmit_burst
+
+
+def managed(order_id, trigger):
+    return ManagedOrder(id=order_id, trigger=trigger, lc_strike=trigger + 10, sc_strike=trigger + 40,
+                        contract=build_combo_contract(1, 2), order_obj=Order(), hash=str(order_id))
+
+
+class TestOrderBurst(unittest.TestCase):
+    """Test the GO/NO-GO burst at the open."""
+
+    def setUp(self):
+        self.app = IBKRApp()
+        self.wire = MagicMock()  # Records placeOrder and cancelOrder in the order they were sent
+        self.app.placeOrder = self.wire.placeOrder
+        self.app.cancelOrder = self.wire.cancelOrder
+        self.orders = [managed(1, 6480.0), managed(2, 6490.0), managed(3, 6500.0), managed(4, 6510.0)]
+
+    def test_partition_at_trigger(self):
+        """Test that an open equal to a trigger is NO-GO, found by one bisect."""
+        no_go, go = partition_by_open(self.orders, 6490.0)
+        self.assertEqual([mo.id for mo in no_go], [1, 2])
+        self.assertEqual([mo.id for mo in go], [3, 4])
+        self.assertEqual(partition_by_open(self.orders, 6400.0)[0], [])
+
+    def test_transmits_before_cancels(self):
+        """Test that all GO transmits precede the NO-GO cancels, with a send time per transmit."""
+        result = transmit_burst(self.app, self.orders, 6495.0)
+
+        calls = [(name, args[0]) for name, args, _ in self.wire.mock_calls]
+        self.assertEqual(calls, [("placeOrder", 3), ("placeOrder", 4), ("cancelOrder", 1), ("cancelOrder", 2)])
+        self.assertTrue(all(mo.order_obj.transmit for mo in result.go))
+        self.assertEqual(len(result.sent_at), 2)
+        self.assertLessEqual(result.sent_at[0], result.sent_at[1])
+        self.assertEqual(result.cancelled, [1, 2])
+        self.assertIn(1, self.app.pending_cancels)
+
+    def test_logging_after_burst(self):
+        """Test that process_managed_orders prints nothing until every order has been sent."""
+        self.app.underlying_open_price = 6495.0
+        events = []
+        self.wire.placeOrder.side_effect = lambda *a: events.append("send")
+        self.wire.cancelOrder.side_effect = lambda *a: events.append("send")
+        with patch("builtins.print", side_effect=lambda *a, **k: events.append("print")):
+            process_managed_orders(self.app, list(reversed(self.orders)), "SPX")
+
+        self.assertEqual(events[:4], ["send"] * 4)
+        self.assertEqual(events[4:], ["print"] * 5)  # Four GO/NO-GO lines and the burst summary
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# tests/test_order_index.py
+import unittest
+from unittest.mock import MagicMock
+
+from ibapi.contract import ComboLeg, Contract
+from ibapi.order import Order
+from ibapi.order_condition import Create, OrderCondition
+
+from order_index import DuplicateIndex
+from ibkr_app import IBKRApp
+
+
+def make_combo_order(leg_ids, trigger):
+    contract = Contract()
+    contract.symbol = "SPX"
+    contract.secType = "BAG"
+    contract.comboLegs = []
+    for conid in leg_ids:
+        leg = ComboLeg()
+        leg.conId = conid
+        contract.comboLegs.append(leg)
+    order = Order()
+    order.orderType = "SNAP MID"
+    cond = Create(OrderCondition.Price)
+    cond.price = trigger
+    order.conditions.append(cond)
+    return contract, order
+
+
+class TestDuplicateIndex(unittest.TestCase):
+    """Test the counted (sorted leg conIds, trigger price) index."""
+
+    def test_counts_by_sorted_legs_and_trigger(self):
+        """Test that leg order does not matter and the trigger price does."""
+        index = DuplicateIndex()
+        index.add(1, [456, 123], 6000.0)
+        index.add(2, [123, 456], 6000.0)
+        index.add(3, [123, 456], 6005.0)
+
+        self.assertEqual(index.count([123, 456], 6000.0), 2)
+        self.assertEqual(index.count([456, 123], 6005), 1)
+        self.assertTrue(index.is_duplicate([123, 456], 6000.0, allowed_duplicates=2))
+        self.assertFalse(index.is_duplicate([123, 456], 6005.0, allowed_duplicates=2))
+
+    def test_same_order_id_counts_once(self):
+        """Test that repeated callbacks for one order do not inflate the count."""
+        index = DuplicateIndex()
+        index.add(1, [123, 456], 6000.0)
+        index.add(1, [123, 456], 6000.0)
+        self.assertEqual(index.count([123, 456], 6000.0), 1)
+
+        # An order that is modified moves to its new key
+        index.add(1, [123, 456], 6010.0)
+        self.assertEqual(index.count([123, 456], 6000.0), 0)
+        self.assertEqual(index.count([123, 456], 6010.0), 1)
+
+    def test_discard(self):
+        """Test that removed orders stop counting."""
+        index = DuplicateIndex()
+        index.add(1, [123, 456], 6000.0)
+        index.discard(1)
+        index.discard(99)  # Unknown IDs are ignored
+        self.assertEqual(index.count([123, 456], 6000.0), 0)
+        self.assertEqual(len(index), 0)
+
+
+class TestIBKRAppDuplicateIndex(unittest.TestCase):
+    """Test that IBKRApp keeps its duplicate index current from callbacks."""
+
+    def setUp(self):
+        self.app = IBKRApp()
+
+    def test_open_order_updates_index(self):
+        """Test that openOrder callbacks are counted once per order ID."""
+        contract, order = make_combo_order([456, 123], 6000.0)
+        self.app.openOrder(7, contract, order, MagicMock())
+        self.app.openOrder(7, contract, order, MagicMock())
+
+        self.assertEqual(self.app.duplicate_index.count([123, 456], 6000.0), 1)
+
+    def test_cancelled_order_leaves_index(self):
+        """Test that a cancelled order no longer counts as a duplicate."""
+        contract, order = make_combo_order([123, 456], 6000.0)
+        self.app.openOrder(7, contract, order, MagicMock())
+        self.app.orderStatus(7, "Cancelled", 0, 1, 0.0, 0, 0, 0.0, 1, "", 0.0)
+
+        self.assertEqual(self.app.duplicate_index.count([123, 456], 6000.0), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
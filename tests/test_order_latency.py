@@ -0,0 +1,65 @@
+# tests/test_order_latency.py
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from ibkr_app import IBKRApp
+from order_latency import LatencyHistogram, OrderLatencyTracker
+
+
+class TestOrderLatencyTracker(unittest.TestCase):
+    """Test per-order lifecycle timing and latency histograms."""
+
+    def test_lifecycle_stages(self):
+        """Test that each first status after a send adds one sample to its stage."""
+        tracker = OrderLatencyTracker()
+        tracker.sent(5, "place", at=10.000)
+        tracker.event(5, "openOrder", at=10.003)
+        tracker.event(5, "PreSubmitted", at=10.004)
+        tracker.event(5, "PreSubmitted", at=10.020)  # Repeats are not new samples
+        tracker.event(5, "Submitted", at=10.050)
+        tracker.event(5, "Filled", at=12.050)
+        tracker.sent(6, "cancel", at=20.0)
+        tracker.event(6, "Cancelled", at=20.012)
+
+        stages = tracker.snapshot()
+        self.assertEqual(sorted(stages), ["Submitted→Filled", "cancel→Cancelled", "place→Filled", "place→PreSubmitted",
+                                          "place→Submitted", "place→openOrder"])
+        self.assertEqual(stages["place→PreSubmitted"]["count"], 1)
+        self.assertAlmostEqual(stages["place→Submitted"]["max_ms"], 50.0)
+        self.assertAlmostEqual(stages["Submitted→Filled"]["max_ms"], 2000.0)
+        self.assertEqual(stages["cancel→Cancelled"]["p50_ms"], 20.0)
+
+    def test_histogram_buckets(self):
+        """Test bucket placement and bucket-bound percentiles."""
+        h = LatencyHistogram()
+        for ms in (0.5, 1.0, 3.0, 4.0, 9000.0):
+            h.add(ms)
+        self.assertEqual(h.counts[:3], [2, 0, 2])
+        self.assertEqual(h.counts[-1], 1)
+        self.assertEqual(h.percentile(50), 5.0)
+        self.assertEqual(h.percentile(100), 9000.0)
+
+    def test_app_callbacks_and_daily_file(self):
+        """Test IBKRApp feeding the tracker, statuses of unsent orders being ignored, and the daily file."""
+        app = IBKRApp()
+        app.placeOrder(7, None, None)  # Not connected: EClient reports an error, the send is still timed
+        app.orderStatus(8, "Filled", 1, 0, 1.0, 0, 0, 1.0, 0, "", 0)
+        app.orderStatus(7, "Cancelled", 0, 1, 0.0, 0, 0, 0.0, 0, "", 0)
+
+        self.assertEqual(sorted(app.order_latency.snapshot()), ["place→Cancelled"])
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = app.order_latency.save(tmpdir, "2025-12-31")
+            with open(path) as f:
+                self.assertEqual(json.load(f)["stages"]["place→Cancelled"]["count"], 1)
+            self.assertEqual(os.listdir(tmpdir), ["2025-12-31.json"])
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    unittest.main()
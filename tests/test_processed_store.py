@@ -0,0 +1,88 @@
+# tests/test_processed_store.py
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from processed_store import ProcessedSignalStore
+from signal_utils import already_processed, record_processed
+
+
+class TestProcessedSignalStore(unittest.TestCase):
+    """Test the journal-backed processed-signal set."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "processed_signals.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_add_survives_restart(self):
+        """Test that recorded hashes are found again by a new process."""
+        store = ProcessedSignalStore(self.path)
+        store.add("abc")
+        store.close()
+
+        reloaded = ProcessedSignalStore(self.path)
+        self.assertIn("abc", reloaded)
+        self.assertNotIn("def", reloaded)
+
+    def test_buffered_writes(self):
+        """Test that hashes are visible at once but written in one append per flush."""
+        store = ProcessedSignalStore(self.path, flush_every=3)
+        store.add("a")
+        store.add("b")
+        self.assertIn("a", store)
+        self.assertFalse(os.path.exists(self.path))
+        store.add("c")
+        with open(self.path) as f:
+            self.assertEqual(len(f.read().splitlines()), 3)
+
+    def test_legacy_and_torn_lines(self):
+        """Test that plain-hash lines load, and a torn final line is cut off so the next append survives."""
+        with open(self.path, "w") as f:
+            f.write("legacy\n")
+            f.write(f"dated\t{int(time.time())}\n")
+            f.write("torn\t17")
+        store = ProcessedSignalStore(self.path)
+        self.assertIn("legacy", store)
+        self.assertIn("dated", store)
+        self.assertNotIn("torn", store)
+
+        store.add("after")
+        store.close()
+        self.assertIn("after", ProcessedSignalStore(self.path))
+
+    def test_age_based_eviction(self):
+        """Test that old entries are dropped from memory and from the journal on load."""
+        old = time.time() - 10 * 86400
+        with open(self.path, "w") as f:
+            f.write(f"old\t{int(old)}\n")
+            f.write(f"new\t{int(time.time())}\n")
+        store = ProcessedSignalStore(self.path, max_age_days=5)
+        self.assertNotIn("old", store)
+        self.assertIn("new", store)
+        with open(self.path) as f:
+            self.assertEqual([line.split()[0] for line in f], ["new"])
+
+    def test_compaction_bounds_journal(self):
+        """Test that re-recording the same hashes does not grow the journal forever."""
+        store = ProcessedSignalStore(self.path, min_compact_lines=10)
+        for i in range(50):
+            store.add(f"h{i % 3}")
+        store.close()
+        with open(self.path) as f:
+            self.assertLess(len(f.read().splitlines()), 10)
+        self.assertEqual(len(ProcessedSignalStore(self.path)), 3)
+
+    def test_module_helpers(self):
+        """Test already_processed/record_processed on top of the store."""
+        self.assertFalse(already_processed("xyz", filename=self.path))
+        record_processed("xyz", filename=self.path)
+        self.assertTrue(already_processed("xyz", filename=self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
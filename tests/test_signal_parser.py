@@ -0,0 +1,67 @@
+# tests/test_signal_parser.py
+import re
+import time
+import unittest
+from dataclasses import replace
+from unittest.mock import patch
+
+from config import CONFIG_DEFAULTS, current_config
+from signal_parser import MAX_SETS_PER_LINE, compiled_pattern, parse_signal_lines
+from signal_utils import parse_multi_signal_message
+from tests.signal_corpus import ADVERSARIAL, WELL_FORMED
+
+
+class TestSignalParser(unittest.TestCase):
+    """Test the linear-time parser for the 到期日/SC/LC/@N/未觸發 grammar."""
+
+    def test_matches_default_regex(self):
+        """Test that well-formed messages parse exactly as with the default MULTI_SIGNAL_REGEX."""
+        pattern = re.compile(CONFIG_DEFAULTS["MULTI_SIGNAL_REGEX"])
+        for text in WELL_FORMED:
+            expected = [(m.group(1), m.group(2), m.group(3), int(m.group(4) or 1)) for m in pattern.finditer(text)]
+            parsed = [(l.expiry, l.sc_strike, l.lc_strike, l.sets) for l in parse_signal_lines(text) if l.pending]
+            self.assertEqual(parsed, expected, text[:60])
+
+    def test_line_states(self):
+        """Test that triggered lines are returned as not pending."""
+        lines = parse_signal_lines(WELL_FORMED[4])
+
+        self.assertEqual([(l.lc_strike, l.pending, l.sets) for l in lines], [("6495", True, 1), ("6595", False, 1), ("6695", True, 2)])
+        self.assertEqual(lines[2].text, "到期日: 2026-01-16 SC: 6700 LC: 6695 @2 未觸發")
+
+    def test_status_is_not_borrowed_from_next_signal(self):
+        """Test that a line without a status does not take the next line's 未觸發."""
+        lines = parse_signal_lines("到期日: 2025-12-31 SC: 6500 LC: 6495\n到期日: 2025-12-31 SC: 6600 LC: 6595 未觸發")
+
+        self.assertEqual([(l.lc_strike, l.pending) for l in lines], [("6495", False), ("6595", True)])
+
+    def test_adversarial_inputs_are_linear(self):
+        """Test that every ~50 KB adversarial message parses well within the pre-open budget."""
+        with patch("builtins.print"):
+            for name, text in ADVERSARIAL:
+                start = time.perf_counter()
+                parse_multi_signal_message(text)
+                self.assertLess(time.perf_counter() - start, 0.25, name)
+
+    def test_set_count_is_capped(self):
+        """Test that a huge @N does not expand into millions of signals."""
+        with patch("builtins.print"):
+            signals = parse_multi_signal_message("到期日: 2025-12-31 SC: 6500 LC: 6495 @1000000 未觸發")
+
+        self.assertEqual(len(signals), MAX_SETS_PER_LINE)
+
+    def test_custom_regex_is_compiled_once(self):
+        """Test that a configured non-default pattern is compiled once and reused."""
+        custom = r"EXP\s*(\d{4}-\d{2}-\d{2})\s*SC\s*([\d.]+)\s*LC\s*([\d.]+)()"
+        compiled_pattern.cache_clear()
+        with patch("config.live_config.snapshot", replace(current_config(), MULTI_SIGNAL_REGEX=custom)):
+            parse_multi_signal_message("EXP 2025-12-31 SC 6500 LC 6495")
+            signals = parse_multi_signal_message("EXP 2025-12-31 SC 6600 LC 6595")
+
+        self.assertEqual(signals[0]["lc_strike"], "6595")
+        self.assertEqual(compiled_pattern.cache_info().misses, 1)
+        self.assertEqual(compiled_pattern.cache_info().hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
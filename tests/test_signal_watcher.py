@@ -0,0 +1,222 @@
+# tests/test_signal_watcher.py
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from main import ManagedOrder, cancel_signal_orders, signal_order_hash, stage_intraday_signals
+from signal_utils import Signal, gather_signal_post, signals_from_text
+from signal_watcher import SignalWatcher, signal_key
+from telegram_listener import TelegramListener
+
+POST = """到期日: 2025-12-31 SC: 6500 LC: 6495 未觸發
+到期日: 2025-12-31 SC: 6600 LC: 6595 未觸發"""
+
+
+def make_signal(lc, sc, trigger, expiry="20251231"):
+    return Signal(expiry=expiry, lc_strike=lc, sc_strike=sc, trigger_price=trigger, order_type="SNAP MID")
+
+
+class TestSignalWatcherDiff(unittest.TestCase):
+    """Test multiset diffing of successive channel posts."""
+
+    def test_unchanged_post_has_no_delta(self):
+        """Test that re-reading the same signals reports nothing."""
+        watcher = SignalWatcher([make_signal(6495, 6500, 6497.5)])
+        self.assertFalse(watcher.update([make_signal(6495, 6500, 6497.5)]))
+
+    def test_added_and_withdrawn(self):
+        """Test that only new and missing keys are reported."""
+        watcher = SignalWatcher([make_signal(6495, 6500, 6497.5), make_signal(6595, 6600, 6597.5)])
+        diff = watcher.update([make_signal(6495, 6500, 6497.5), make_signal(6695, 6700, 6697.5)])
+
+        self.assertEqual([signal_key(s) for s in diff.added], [("20251231", 6695.0, 6700.0, 6697.5)])
+        self.assertEqual([signal_key(s) for s in diff.withdrawn], [("20251231", 6595.0, 6600.0, 6597.5)])
+
+    def test_extra_duplicate_is_added_with_new_count(self):
+        """Test that a second copy of a key is one addition allowing two orders."""
+        watcher = SignalWatcher([make_signal(6495, 6500, 6497.5)])
+        diff = watcher.update([make_signal(6495, 6500, 6497.5), make_signal(6495, 6500, 6497.5)])
+
+        self.assertEqual(len(diff.added), 1)
+        self.assertEqual(diff.added[0].allowed_duplicates, 2)
+        self.assertEqual(watcher.counts()[("20251231", 6495.0, 6500.0, 6497.5)], 2)
+
+        diff = watcher.update([make_signal(6495, 6500, 6497.5)])
+        self.assertEqual(len(diff.withdrawn), 1)
+        self.assertFalse(diff.added)
+
+    def test_flipped_line_is_triggered(self):
+        """Test that a line edited from 未觸發 is reported as triggered, not withdrawn."""
+        watcher = SignalWatcher()
+        watcher.update(signals_from_text(POST), POST)
+        edited = POST.replace("SC: 6600 LC: 6595 未觸發", "SC: 6600 LC: 6595 已觸發")
+
+        diff = watcher.update(signals_from_text(edited), edited)
+
+        self.assertEqual([s.lc_strike for s in diff.triggered], [6595.0])
+        self.assertFalse(diff.withdrawn)
+        self.assertFalse(diff.added)
+
+    def test_post_without_signals_is_ignored(self):
+        """Test that a chat message does not withdraw the current signals."""
+        watcher = SignalWatcher()
+        watcher.update(signals_from_text(POST), POST)
+
+        self.assertFalse(watcher.update([], "Good morning"))
+        self.assertEqual(sum(watcher.counts().values()), 2)
+
+    def test_new_post_withdraws_nothing(self):
+        """Test that a follow-up post only adds, and only an edit of that post withdraws its lines."""
+        watcher = SignalWatcher()
+        watcher.update(signals_from_text(POST), POST, message_id=1)
+        follow_up = "到期日: 2025-12-31 SC: 6700 LC: 6695 未觸發"
+        diff = watcher.update(signals_from_text(follow_up), follow_up, message_id=2)
+        self.assertEqual([s.lc_strike for s in diff.added], [6695.0])
+        self.assertFalse(diff.withdrawn)
+        self.assertEqual(sum(watcher.counts().values()), 3)
+
+        diff = watcher.update([], follow_up.replace("未觸發", "已觸發"), message_id=2)
+        self.assertEqual([s.lc_strike for s in diff.triggered], [6695.0])
+        self.assertEqual(sum(watcher.counts().values()), 2)
+
+
+class TestSignalWatcherPolling(unittest.TestCase):
+    """Test where the watcher reads posts from."""
+
+    def test_every_queued_post_is_applied(self):
+        """Test that each queued new post adds its signals, and consecutive edits of a post count once."""
+        listener = TelegramListener(channel="test_channel")
+        listener._connected.set()
+        watcher = SignalWatcher([], listener=listener)
+        listener.handle_message(1, "到期日: 2025-12-31 SC: 6500 LC: 6495 未觸發")
+        listener.handle_message(2, "到期日: 2025-12-31 SC: 6600 LC: 6595 未觸發")
+        listener.handle_message(2, "到期日: 2025-12-31 SC: 6700 LC: 6695 未觸發", edited=True)
+
+        diff = watcher.poll()
+
+        self.assertEqual(sorted(s.lc_strike for s in diff.added), [6495.0, 6695.0])
+        self.assertFalse(diff.withdrawn)
+        self.assertFalse(watcher.poll())
+
+    @patch("signal_utils.get_signal_interactively", return_value=None)
+    def test_post_between_gather_and_open_is_new(self, _):
+        """Test that a post landing after the gathered one is not taken as an edit of it."""
+        listener = TelegramListener(channel="test_channel")
+        listener._connected.set()
+        listener.handle_message(10, POST, notify=False)
+        with patch("signal_utils._active_listener", listener):
+            signals, message_id = gather_signal_post(allow_manual_fallback=False)
+        self.assertEqual(message_id, 10)
+        listener.handle_message(11, "到期日: 2025-12-31 SC: 6700 LC: 6695 未觸發")
+
+        # The watcher is only built at the open, after the new post
+        watcher = SignalWatcher(signals, listener=listener, message_id=message_id)
+        diff = watcher.poll()
+
+        self.assertEqual([s.lc_strike for s in diff.added], [6695.0])
+        self.assertFalse(diff.withdrawn)
+        self.assertEqual(sum(watcher.counts().values()), 3)
+
+    def test_signal_added_and_withdrawn_in_one_poll_nets_out(self):
+        """Test that a signal posted and marked triggered before the poll is neither staged nor cancelled."""
+        listener = TelegramListener(channel="test_channel")
+        listener._connected.set()
+        watcher = SignalWatcher([], listener=listener)
+        listener.handle_message(1, POST)
+        listener.handle_message(2, "到期日: 2025-12-31 SC: 6600 LC: 6595 已觸發")
+
+        diff = watcher.poll()
+
+        self.assertEqual([s.lc_strike for s in diff.added], [6495.0])
+        self.assertFalse(diff.triggered)
+
+    def test_failed_fetch_withdraws_nothing(self):
+        """Test that a failed channel fetch is not read as an empty post, never prompts, and backs off."""
+        watcher = SignalWatcher([make_signal(6495, 6500, 6497.5)], poll_interval=0.05, max_poll_interval=0.4)
+        with patch("signal_watcher.fetch_latest_post", return_value=None) as mock_fetch:
+            self.assertFalse(watcher.poll())  # Too soon after construction
+            time.sleep(0.06)
+            self.assertFalse(watcher.poll())
+            mock_fetch.assert_called_once_with(interactive=False)
+            time.sleep(0.05)
+            watcher.poll()  # Backed off to 0.1s: no second fetch yet
+            self.assertEqual(mock_fetch.call_count, 1)
+        self.assertEqual(sum(watcher.counts().values()), 1)
+
+    def test_polling_fallback(self):
+        """Test polling the channel when no listener is connected."""
+        watcher = SignalWatcher([], poll_interval=0)
+        text = "到期日: 2025-12-31 SC: 6500 LC: 6495 未觸發"
+        with patch("signal_watcher.fetch_latest_post", return_value=(5, text)) as mock_fetch:
+            self.assertEqual(len(watcher.poll().added), 1)
+            self.assertFalse(watcher.poll())
+        self.assertEqual(mock_fetch.call_count, 2)
+
+
+class TestStageIntradaySignals(unittest.TestCase):
+    """Test staging of signals posted after the open."""
+
+    @patch("main.process_managed_orders")
+    @patch("main.process_and_stage_new_signals")
+    def test_only_new_orders_get_open_check(self, mock_stage, mock_process):
+        """Test that GO/NO-GO is run on the newly staged orders only."""
+        app = MagicMock()
+        app.option_chain = None
+        app.underlying_open_price = 6490.0
+        app.get_contract_details.return_value = None
+        existing = MagicMock(trigger=6400.0)
+        new = MagicMock(trigger=6497.5)
+        managed_orders = [existing]
+        mock_stage.side_effect = lambda app, signals, managed, *args: managed.append(new)
+
+        staged = stage_intraday_signals(app, signals_from_text("到期日: 2025-12-31 SC: 6500 LC: 6495 未觸發"), managed_orders, 416904)
+
+        self.assertEqual(staged, [new])
+        mock_process.assert_called_once()
+        self.assertEqual(mock_process.call_args[0][1], [new])
+
+
+class TestCancelSignalOrders(unittest.TestCase):
+    """Test cancelling the orders of signals that are no longer pending."""
+
+    def setUp(self):
+        self.app = MagicMock()
+        self.app.order_states = {}
+        self.app.error_order_ids = []
+        self.app.cancel_orders.side_effect = lambda ids: list(ids)
+        self.signal = signals_from_text("到期日: 2025-12-31 SC: 6500 LC: 6495 未觸發")[0]
+
+    def make_order(self, order_id, signal):
+        return ManagedOrder(id=order_id, trigger=signal.trigger_price, lc_strike=signal.lc_strike, sc_strike=signal.sc_strike,
+                            contract=MagicMock(), order_obj=MagicMock(), hash=signal_order_hash(signal))
+
+    def test_one_order_cancelled_per_occurrence(self):
+        """Test that one of two duplicate orders is cancelled, newest first, and leaves the retry list."""
+        managed_orders = [self.make_order(1, self.signal), self.make_order(2, self.signal)]
+        self.app.error_order_ids = [2]
+
+        cancelled = cancel_signal_orders(self.app, [self.signal], managed_orders, [])
+
+        self.assertEqual(cancelled, [2])
+        self.assertEqual([mo.id for mo in managed_orders], [1])
+        self.assertEqual(self.app.error_order_ids, [])
+
+    def test_filled_orders_are_skipped(self):
+        """Test that a filled order is not cancelled."""
+        managed_orders = [self.make_order(1, self.signal)]
+        self.app.order_states = {1: "Filled"}
+
+        self.assertEqual(cancel_signal_orders(self.app, [self.signal], managed_orders, []), [])
+        self.app.cancel_orders.assert_called_once_with([])
+
+    def test_failed_signal_is_dropped(self):
+        """Test that a signal still waiting for a conId retry is dropped instead."""
+        failed = [self.signal]
+
+        cancel_signal_orders(self.app, [self.signal], [], failed)
+
+        self.assertEqual(failed, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+# tests/test_telegram_listener.py
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import signal_utils
+import telegram_listener
+from signal_utils import gather_signals, get_signal_from_telegram
+from telegram_listener import TelegramListener
+
+
+POST = """到期日: 2025-12-31 SC: 6500 LC: 6495 未觸發
+到期日: 2025-12-31 SC: 6500 LC: 6495 未觸發
+到期日: 2026-01-15 SC: 6600 LC: 6595 未觸發"""
+
+
+class TestTelegramListener(unittest.TestCase):
+    """Test message handling of the long-lived Telegram listener (no network)."""
+
+    def setUp(self):
+        self.listener = TelegramListener(channel="test_channel")
+
+    def tearDown(self):
+        signal_utils.set_active_listener(None)
+
+    def test_new_post_is_parsed_and_queued(self):
+        """Test that a new post is parsed once and pushed to the update queue."""
+        self.listener.handle_message(10, POST)
+
+        update = self.listener.get_update(timeout=0)
+        self.assertEqual(update.message_id, 10)
+        self.assertFalse(update.edited)
+        self.assertEqual(len(update.signals), 3)
+        self.assertEqual([s.allowed_duplicates for s in update.signals], [2, 2, 1])
+        self.assertEqual(self.listener.latest_text, POST)
+        self.assertIsNone(self.listener.get_update(timeout=0))
+
+    def test_edit_of_latest_post_is_queued(self):
+        """Test that editing the newest post replaces the latest text and is queued as an edit."""
+        self.listener.handle_message(10, POST)
+        self.listener.get_update(timeout=0)
+        edited = "到期日: 2025-12-31 SC: 6500 LC: 6495 未觸發"
+        self.listener.handle_message(10, edited, edited=True)
+
+        update = self.listener.get_update(timeout=0)
+        self.assertTrue(update.edited)
+        self.assertEqual(len(update.signals), 1)
+        self.assertEqual(self.listener.latest_text, edited)
+
+    def test_older_and_unchanged_posts_are_ignored(self):
+        """Test that edits of older posts and unchanged re-deliveries are dropped."""
+        self.listener.handle_message(10, POST)
+        self.listener.get_update(timeout=0)
+
+        self.assertIsNone(self.listener.handle_message(9, "到期日: 2025-12-31 SC: 6400 LC: 6395 未觸發", edited=True))
+        self.assertIsNone(self.listener.handle_message(10, POST, edited=True))
+        self.assertIsNone(self.listener.get_update(timeout=0))
+        self.assertEqual(self.listener.latest_message_id, 10)
+
+    def test_gather_signals_reads_connected_listener(self):
+        """Test that gather_signals answers from the listener without creating a client."""
+        self.listener.handle_message(10, POST, notify=False)
+        self.listener._connected.set()
+        signal_utils.set_active_listener(self.listener)
+
+        with patch("signal_utils.TelegramClient") as mock_client:
+            self.assertEqual(get_signal_from_telegram(), POST)
+            signals = gather_signals(allow_manual_fallback=False)
+            mock_client.assert_not_called()
+        self.assertEqual(len(signals), 3)
+
+    def test_disconnected_listener_falls_back_to_fetch(self):
+        """Test that a listener that is not connected is bypassed."""
+        self.listener.handle_message(10, POST, notify=False)
+        signal_utils.set_active_listener(self.listener)
+
+        with patch("signal_utils.TELEGRAM_API_ID", None):
+            self.assertIsNone(get_signal_from_telegram())
+
+    def test_start_without_credentials(self):
+        """Test that the listener does not start a thread without API credentials."""
+        with patch.object(telegram_listener, "TELEGRAM_API_ID", None):
+            self.assertFalse(self.listener.start())
+        self.assertIsNone(self.listener._thread)
+        self.assertIsNone(signal_utils._active_listener)
+
+    def test_connection_errors_retry_without_login(self):
+        """Test that a network error is retried with the saved session, and only an unauthorized one prompts."""
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+        open(os.path.join(data_dir, "session_name.session"), "w").close()
+        listener = TelegramListener(channel="test_channel", reconnect_delay=0.01)
+
+        with patch("telegram_listener.get_user_data_dir", return_value=data_dir), \
+             patch("telegram_listener.TELEGRAM_API_ID", "1"), \
+             patch("telethon.TelegramClient") as client_class, \
+             patch("telegram_listener.run_manual_login", new_callable=AsyncMock) as manual_login, \
+             patch("builtins.print"):
+            client = client_class.return_value
+            client.connect = AsyncMock(side_effect=[OSError("Network is unreachable"), None])
+            client.is_user_authorized = AsyncMock(return_value=True)
+            client.is_connected.return_value = False
+            self.assertIs(asyncio.run(listener._connect()), client)
+            self.assertEqual(client.connect.await_count, 2)
+            self.assertTrue(listener._ready.is_set())  # start() was not kept waiting
+            manual_login.assert_not_called()
+
+            client.connect = AsyncMock()
+            client.is_user_authorized = AsyncMock(return_value=False)
+            client.disconnect = AsyncMock()
+            asyncio.run(listener._connect())
+            manual_login.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
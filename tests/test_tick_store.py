@@ -0,0 +1,50 @@
+# tests/test_tick_store.py
+import unittest
+
+from ibkr_app import IBKRApp
+from tick_store import TickStore
+
+
+class TestTickStore(unittest.TestCase):
+    """Test the NumPy ring buffer of SPX ticks."""
+
+    def test_ring_keeps_newest_ticks_in_order(self):
+        """Test that a full buffer overwrites the oldest ticks and windows stay time ordered."""
+        store = TickStore(capacity=4)
+        for i in range(6):
+            store.append(6500.0 + i, 4, timestamp=100.0 + i)
+
+        times, prices, _ = store.window()
+        self.assertEqual(len(store), 4)
+        self.assertEqual(list(times), [102.0, 103.0, 104.0, 105.0])
+        self.assertEqual(list(store.window(start=103.0, end=105.0)[1]), [6503.0, 6504.0])
+
+    def test_ohlc_bars(self):
+        """Test 1s and 1m bars, including ticks of other types being left out."""
+        store = TickStore()
+        for t, price in [(60.0, 10.0), (60.4, 12.0), (60.8, 9.0), (61.1, 11.0), (125.0, 13.0)]:
+            store.append(price, 4, timestamp=t)
+        store.append(99.0, 1, timestamp=60.5)  # A bid, not a trade
+
+        seconds = store.ohlc(interval=1.0)
+        self.assertEqual(list(seconds["time"]), [60.0, 61.0, 125.0])
+        self.assertEqual((seconds[0]["open"], seconds[0]["high"], seconds[0]["low"], seconds[0]["close"]), (10.0, 12.0, 9.0, 9.0))
+        minutes = store.ohlc(interval=60.0)
+        self.assertEqual(list(minutes["count"]), [4, 1])
+        self.assertEqual(minutes[0]["close"], 11.0)
+
+    def test_vwap_uses_trade_sizes(self):
+        """Test VWAP over a window, with sizes attached by the following tickSize callback."""
+        app = IBKRApp()
+        app.spx_store.append(100.0, 4, timestamp=1.0)
+        app.tickSize(IBKRApp.REQID_SPX_STREAM, 5, 1)
+        app.spx_store.append(110.0, 4, timestamp=2.0)
+        app.tickSize(IBKRApp.REQID_SPX_STREAM, 5, 3)
+
+        self.assertAlmostEqual(app.spx_store.vwap(), 107.5)
+        self.assertEqual(app.spx_store.vwap(start=2.0), 110.0)
+        self.assertIsNone(TickStore().vwap())
+
+
+if __name__ == "__main__":
+    unittest.main()
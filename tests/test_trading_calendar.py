@@ -0,0 +1,78 @@
+# tests/test_trading_calendar.py
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+import pytz
+
+from trading_calendar import TradingCalendar, get_calendar
+
+TZ = pytz.timezone("US/Eastern")
+
+
+def epoch(y, m, d, hh, mm):
+    return int(TZ.localize(datetime(y, m, d, hh, mm)).timestamp())
+
+
+class TestTradingCalendarQueries(unittest.TestCase):
+    """Test binary-search queries on a small hand-built calendar."""
+
+    def setUp(self):
+        # Thu 3 Jul 2025 (half day), Mon 7 Jul 2025, Tue 8 Jul 2025
+        self.cal = TradingCalendar(
+            days=[20250703, 20250707, 20250708],
+            opens=[epoch(2025, 7, 3, 9, 30), epoch(2025, 7, 7, 9, 30), epoch(2025, 7, 8, 9, 30)],
+            closes=[epoch(2025, 7, 3, 13, 0), epoch(2025, 7, 7, 16, 0), epoch(2025, 7, 8, 16, 0)],
+        )
+
+    def test_previous_valid_day(self):
+        """Test that holidays and weekends resolve to the previous session."""
+        self.assertEqual(self.cal.previous_valid_day("20250707"), 20250707)
+        self.assertEqual(self.cal.previous_valid_day("20250704"), 20250703)
+        self.assertEqual(self.cal.previous_valid_day("20250706"), 20250703)
+        with self.assertRaises(ValueError):
+            self.cal.previous_valid_day("20250701")
+
+    def test_next_open(self):
+        """Test that the next open skips non-trading days and honors include_today."""
+        friday = TZ.localize(datetime(2025, 7, 4, 8, 0))
+        self.assertEqual(self.cal.next_open(friday, tz=TZ), TZ.localize(datetime(2025, 7, 7, 9, 30)))
+
+        monday = TZ.localize(datetime(2025, 7, 7, 8, 0))
+        self.assertEqual(self.cal.next_open(monday, tz=TZ).day, 7)
+        self.assertEqual(self.cal.next_open(monday, include_today=False, tz=TZ).day, 8)
+
+    def test_session_close_half_day(self):
+        """Test that early closes are reported instead of a fixed 16:00."""
+        self.assertEqual(self.cal.session_close("20250703", TZ).hour, 13)
+        self.assertEqual(self.cal.session_close("20250707", TZ).hour, 16)
+        self.assertIsNone(self.cal.session_close("20250704", TZ))
+
+    def test_save_and_load_roundtrip(self):
+        """Test that a persisted calendar answers the same queries."""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "nyse_calendar.json")
+            self.cal.save(path)
+            loaded = TradingCalendar.load(path)
+            self.assertEqual(list(loaded.days), list(self.cal.days))
+            self.assertEqual(loaded.previous_valid_day("20250706"), 20250703)
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+class TestNYSECalendar(unittest.TestCase):
+    """Test the shared calendar built from pandas_market_calendars."""
+
+    def test_holiday_and_early_close(self):
+        """Test Independence Day 2025 and the day after Thanksgiving 2025."""
+        cal = get_calendar(covering="20250704")
+        self.assertFalse(cal.is_trading_day("20250704"))
+        self.assertEqual(cal.previous_valid_day("20250704"), 20250703)
+        self.assertEqual(cal.session_close("20251128", TZ).hour, 13)
+
+
+if __name__ == "__main__":
+    unittest.main()
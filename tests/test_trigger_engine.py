@@ -0,0 +1,81 @@
+# tests/test_trigger_engine.py
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytz
+
+from ibkr_app import IBKRApp
+from main import ManagedOrder, build_combo_contract, run_post_open_retry_loops
+from ibapi.order import Order
+from trigger_engine import PriceTriggerEngine
+
+
+class TestPriceTriggerEngine(unittest.TestCase):
+    """Test the heap of price thresholds woken by ticks."""
+
+    def test_crossing_fires_only_reached_keys(self):
+        """Test that a tick fires exactly the keys at or below it, and a discarded key never fires."""
+        engine = PriceTriggerEngine()
+        engine.add("a", 6500.0)
+        engine.add("b", 6510.0)
+        engine.add("c", 6505.0)
+        engine.add("d", 6501.0)
+        engine.discard("d")
+
+        engine.on_price(6499.0)
+        self.assertEqual(engine.wait(0), [])
+        engine.on_price(6506.0)
+        self.assertEqual(engine.wait(0), ["a", "c"])
+        self.assertEqual(engine.keys(), ["b"])
+
+    def test_add_at_reached_price_fires_immediately(self):
+        """Test that arming a key whose threshold is already reached fires it without a tick."""
+        engine = PriceTriggerEngine()
+        engine.on_price(6520.0)
+        engine.add("late", 6510.0)
+        self.assertEqual(engine.wait(0), ["late"])
+        self.assertEqual(len(engine), 0)
+
+    def test_tick_wakes_waiting_thread(self):
+        """Test that a tick from another thread ends wait() well before its timeout."""
+        engine = PriceTriggerEngine()
+        engine.add("x", 6500.0)
+        threading.Timer(0.05, engine.on_price, args=(6500.0,)).start()
+
+        start = time.monotonic()
+        fired = engine.wait(5.0)
+        self.assertEqual(fired, ["x"])
+        self.assertLess(time.monotonic() - start, 1.0)
+
+
+class TestRetryLoop(unittest.TestCase):
+    """Test that the post-open retry loop reacts to the tick that crosses an LC strike."""
+
+    def test_error_order_retried_on_crossing_tick(self):
+        """Test that an error order is re-sent with a new ID as soon as SPX reaches its LC strike."""
+        app = IBKRApp()
+        app.placeOrder = MagicMock()
+        app.nextOrderId = 50
+        app.error_order_ids = [7]
+        mo = ManagedOrder(id=7, trigger=6490.0, lc_strike=6500.0, sc_strike=6530.0,
+                          contract=build_combo_contract(1, 2), order_obj=Order(), hash="h")
+        tz = pytz.timezone("US/Eastern")
+        close = datetime.now(tz) + timedelta(seconds=10)
+
+        threading.Timer(0.05, app.tickPrice, args=(IBKRApp.REQID_SPX_STREAM, 4, 6499.0, None)).start()
+        threading.Timer(0.1, app.tickPrice, args=(IBKRApp.REQID_SPX_STREAM, 4, 6500.5, None)).start()
+        start = time.monotonic()
+        run_post_open_retry_loops(app, [mo], [], 0, close, tz)
+
+        self.assertLess(time.monotonic() - start, 2.0)
+        app.placeOrder.assert_called_once()
+        self.assertEqual(mo.id, 50)
+        self.assertEqual(app.error_order_ids, [])
+        self.assertIsNone(app.price_triggers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+# tick_stats.py
+
+import math
+import time
+from typing import Optional
+
+class StatusThrottle:
+    """
+    Lets a status line through at most `rate_hz` times per second (every time if the
+    rate is 0 or less). The first call is always due.
+    """
+
+    def __init__(self, rate_hz: float = 2.0):
+        self.interval = 1.0 / rate_hz if rate_hz and rate_hz > 0 else 0.0
+        self._next = -math.inf
+
+    def due(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        if now < self._next:
+            return False
+        self._next = now + self.interval
+        return True
@@ -0,0 +1,109 @@
+# tick_store.py
+
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+# One row per bar: start time (epoch seconds), OHLC, summed size and number of ticks
+BAR_DTYPE = np.dtype([("time", "f8"), ("open", "f8"), ("high", "f8"), ("low", "f8"),
+                      ("close", "f8"), ("volume", "f8"), ("count", "i8")])
+
+class TickStore:
+    """
+    Fixed-capacity ring buffer of (timestamp, price, size, tickType) ticks in
+    preallocated NumPy arrays. Appending writes four scalars in place, so the
+    IBKR reader thread never allocates per tick; once full, the oldest ticks are
+    overwritten. Queries copy the requested window out and aggregate it with
+    vectorized operations.
+
+    Timestamps are epoch seconds (time.time()), so 1s/1m bars line up with the clock.
+    """
+
+    def __init__(self, capacity: int = 1 << 18):
+        self.capacity = capacity
+        self._time = np.zeros(capacity, dtype=np.float64)
+        self._price = np.zeros(capacity, dtype=np.float64)
+        self._size = np.zeros(capacity, dtype=np.float64)
+        self._type = np.zeros(capacity, dtype=np.int16)
+        self._next = 0  # Total ticks ever appended; the write position is _next % capacity
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self._next, self.capacity)
+
+    def append(self, price: float, tick_type: int, size: float = 0.0, timestamp: Optional[float] = None):
+        with self._lock:
+            i = self._next % self.capacity
+            self._time[i] = time.time() if timestamp is None else timestamp
+            self._price[i] = price
+            self._size[i] = size
+            self._type[i] = tick_type
+            self._next += 1
+
+    def set_last_size(self, size: float, tick_type: int) -> bool:
+        """
+        IBKR reports a trade's size in a separate tickSize callback right after its price;
+        this attaches it to the newest tick of `tick_type` if that tick has no size yet.
+        """
+        with self._lock:
+            if not self._next:
+                return False
+            i = (self._next - 1) % self.capacity
+            if self._type[i] != tick_type or self._size[i]:
+                return False
+            self._size[i] = size
+            return True
+
+    def window(self, start: Optional[float] = None, end: Optional[float] = None,
+               tick_type: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns (times, prices, sizes) of the ticks with start <= time < end, oldest first."""
+        with self._lock:
+            head = self._next % self.capacity
+            # Oldest-first segments of the ring; ticks arrive in time order, so each is sorted
+            segments = [(head, self.capacity), (0, head)] if self._next > self.capacity else [(0, self._next)]
+            parts = []
+            for seg_lo, seg_hi in segments:
+                seg = self._time[seg_lo:seg_hi]
+                lo = seg_lo + (0 if start is None else int(np.searchsorted(seg, start, side="left")))
+                hi = seg_lo + (len(seg) if end is None else int(np.searchsorted(seg, end, side="left")))
+                if hi > lo:
+                    parts.append(slice(lo, hi))
+            # Copy only the window out, while the reader thread is held off
+            times, prices, sizes, types = (np.concatenate([a[p] for p in parts]) if parts else a[:0].copy()
+                                           for a in (self._time, self._price, self._size, self._type))
+        if tick_type is not None:
+            mask = types == tick_type
+            times, prices, sizes = times[mask], prices[mask], sizes[mask]
+        return times, prices, sizes
+
+    def ohlc(self, interval: float = 60.0, start: Optional[float] = None, end: Optional[float] = None,
+             tick_type: Optional[int] = 4) -> np.ndarray:
+        """
+        Aggregates ticks into bars of `interval` seconds (1.0 and 60.0 for 1s/1m bars),
+        as a BAR_DTYPE array. Intervals without ticks produce no bar.
+        """
+        times, prices, sizes = self.window(start, end, tick_type)
+        if not len(times):
+            return np.empty(0, dtype=BAR_DTYPE)
+        buckets = np.floor(times / interval)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        ends = np.append(starts[1:], len(times))
+        bars = np.empty(len(starts), dtype=BAR_DTYPE)
+        bars["time"] = buckets[starts] * interval
+        bars["open"] = prices[starts]
+        bars["high"] = np.maximum.reduceat(prices, starts)
+        bars["low"] = np.minimum.reduceat(prices, starts)
+        bars["close"] = prices[ends - 1]
+        bars["volume"] = np.add.reduceat(sizes, starts)
+        bars["count"] = ends - starts
+        return bars
+
+    def vwap(self, start: Optional[float] = None, end: Optional[float] = None, tick_type: Optional[int] = 4) -> Optional[float]:
+        """Volume-weighted average price over the window, or None if no tick in it carries a size."""
+        _, prices, sizes = self.window(start, end, tick_type)
+        volume = sizes.sum()
+        if volume <= 0:
+            return None
+        return float(np.dot(prices, sizes) / volume)
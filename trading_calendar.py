@@ -0,0 +1,147 @@
+# trading_calendar.py
+
+import bisect
+import json
+import os
+import threading
+from array import array
+from datetime import datetime
+from typing import Optional, Tuple
+
+import pytz
+
+from config import get_user_data_dir
+
+CALENDAR_VERSION = 1
+CALENDAR_FILE = os.path.join(get_user_data_dir(), 'nyse_calendar.json')
+EASTERN = pytz.timezone('US/Eastern')
+
+def day_key(value) -> int:
+    """Converts a 'YYYYMMDD' string, date or datetime to the YYYYMMDD int used as the calendar key."""
+    if isinstance(value, str):
+        return int(value.replace('-', '')[:8])
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(EASTERN)
+    return value.year * 10000 + value.month * 100 + value.day
+
+class TradingCalendar:
+    """
+    NYSE sessions as three parallel sorted arrays: trading day (YYYYMMDD), session open
+    and session close (epoch seconds). All queries are binary searches over `days`.
+    """
+
+    def __init__(self, days, opens, closes, first: Optional[int] = None, last: Optional[int] = None):
+        self.days = array('q', days)
+        self.opens = array('q', opens)
+        self.closes = array('q', closes)
+        # Calendar range that was built, which may start or end on a non-trading day
+        self.first = first if first is not None else (self.days[0] if self.days else 0)
+        self.last = last if last is not None else (self.days[-1] if self.days else 0)
+
+    def __len__(self):
+        return len(self.days)
+
+    def covers(self, day) -> bool:
+        """True if `day` lies within the loaded range of sessions."""
+        return bool(self.days) and self.first <= day_key(day) <= self.last
+
+    def is_trading_day(self, day) -> bool:
+        key = day_key(day)
+        i = bisect.bisect_left(self.days, key)
+        return i < len(self.days) and self.days[i] == key
+
+    def previous_valid_day(self, day) -> int:
+        """Returns `day` if it is a trading day, otherwise the last trading day before it."""
+        i = bisect.bisect_right(self.days, day_key(day)) - 1
+        if i < 0:
+            raise ValueError("No valid trading days found before given date.")
+        return self.days[i]
+
+    def session(self, day, tz=EASTERN) -> Optional[Tuple[datetime, datetime]]:
+        """Returns (open, close) of the session on `day` in `tz`, or None if the market is closed."""
+        key = day_key(day)
+        i = bisect.bisect_left(self.days, key)
+        if i == len(self.days) or self.days[i] != key:
+            return None
+        return datetime.fromtimestamp(self.opens[i], tz), datetime.fromtimestamp(self.closes[i], tz)
+
+    def session_close(self, day, tz=EASTERN) -> Optional[datetime]:
+        """Returns the close of the session on `day` (13:00 on half days), or None if the market is closed."""
+        session = self.session(day, tz)
+        return session[1] if session else None
+
+    def next_open(self, now: datetime, include_today: bool = True, tz=EASTERN) -> Optional[datetime]:
+        """
+        Returns the open of the first session on or after the date of `now` (strictly after
+        it when include_today is False), in `tz`.
+        """
+        key = day_key(now)
+        i = bisect.bisect_left(self.days, key) if include_today else bisect.bisect_right(self.days, key)
+        if i == len(self.days):
+            return None
+        return datetime.fromtimestamp(self.opens[i], tz)
+
+    @classmethod
+    def build(cls, start_date: str, end_date: str) -> "TradingCalendar":
+        """Builds the calendar from pandas_market_calendars (imported only here)."""
+        import pandas_market_calendars as mcal
+        schedule = mcal.get_calendar('NYSE').schedule(start_date=start_date, end_date=end_date)
+        days = [day_key(ts) for ts in schedule.index]
+        opens = [int(ts.timestamp()) for ts in schedule["market_open"]]
+        closes = [int(ts.timestamp()) for ts in schedule["market_close"]]
+        return cls(days, opens, closes, day_key(start_date), day_key(end_date))
+
+    @classmethod
+    def load(cls, path: str) -> Optional["TradingCalendar"]:
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data.get("version") != CALENDAR_VERSION:
+                return None
+            return cls(data["days"], data["opens"], data["closes"], data.get("first"), data.get("last"))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable trading calendar {path}: {e}", flush=True)
+            return None
+
+    def save(self, path: str):
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump({"version": CALENDAR_VERSION, "first": self.first, "last": self.last,
+                           "days": self.days.tolist(), "opens": self.opens.tolist(),
+                           "closes": self.closes.tolist()}, f)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"Failed to save trading calendar: {e}", flush=True)
+
+_calendar: Optional[TradingCalendar] = None
+_calendar_lock = threading.Lock()
+
+def get_calendar(covering=None) -> TradingCalendar:
+    """
+    Returns the shared calendar, loading it from disk or building it on first use.
+    The calendar spans from the start of last year to the end of the year after next,
+    and is rebuilt (wider) whenever a date outside that span is asked for.
+    """
+    global _calendar
+    today = datetime.now(EASTERN)
+    wanted = [today] + ([covering] if covering is not None else [])
+    cal = _calendar
+    if cal is not None and all(cal.covers(d) for d in wanted):
+        return cal
+    with _calendar_lock:
+        if _calendar is None:
+            _calendar = TradingCalendar.load(CALENDAR_FILE)
+        if _calendar is None or not all(_calendar.covers(d) for d in wanted):
+            years = [day_key(d) // 10000 for d in wanted]
+            start_year = min(min(years), today.year) - 1
+            end_year = max(max(years), today.year + 2)
+            _calendar = TradingCalendar.build(f"{start_year}-01-01", f"{end_year}-12-31")
+            _calendar.save(CALENDAR_FILE)
+        return _calendar
+
+def previous_valid_day(date_str: str) -> str:
+    """Returns date_str (YYYYMMDD) if it is a trading day, otherwise the previous trading day."""
+    return str(get_calendar(covering=date_str).previous_valid_day(date_str))
@@ -0,0 +1,82 @@
+# trigger_engine.py
+
+import heapq
+import itertools
+import threading
+from typing import Dict, Hashable, List, Optional
+
+class PriceTriggerEngine:
+    """
+    Pending actions keyed by the price at or above which they become actionable,
+    kept in a min-heap so a tick only ever looks at the lowest threshold.
+
+    on_price() is called from the IBKR reader thread on every tick: when the price
+    reaches thresholds, exactly those keys are moved to the fired list and the
+    thread blocked in wait() is woken. The actions themselves run in the waiting
+    (main) thread, since they make blocking IBKR requests whose answers arrive on
+    the reader thread.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []  # (threshold, seq, key); entries whose seq is no longer current are stale
+        self._current: Dict[Hashable, int] = {}  # key -> seq of its live heap entry
+        self._fired: List[Hashable] = []
+        self._seq = itertools.count()
+        self._woken = False
+        self.price: Optional[float] = None
+
+    def __len__(self):
+        return len(self._current)
+
+    def __contains__(self, key):
+        return key in self._current
+
+    def keys(self) -> List[Hashable]:
+        with self._cond:
+            return list(self._current)
+
+    def add(self, key: Hashable, threshold: float):
+        """Arms `key` (replacing its previous threshold); fires at once if the price is already there."""
+        with self._cond:
+            if self.price is not None and self.price >= threshold:
+                self._current.pop(key, None)
+                self._fired.append(key)
+                self._cond.notify()
+                return
+            seq = next(self._seq)
+            self._current[key] = seq
+            heapq.heappush(self._heap, (threshold, seq, key))
+
+    def discard(self, key: Hashable):
+        with self._cond:
+            self._current.pop(key, None)  # Its heap entry is skipped when it surfaces
+
+    def on_price(self, price: float):
+        with self._cond:
+            self.price = price
+            heap = self._heap
+            if not heap or heap[0][0] > price:
+                return
+            while heap and heap[0][0] <= price:
+                _, seq, key = heapq.heappop(heap)
+                if self._current.get(key) == seq:
+                    del self._current[key]
+                    self._fired.append(key)
+            if self._fired:
+                self._cond.notify()
+
+    def wake(self):
+        """Ends the current wait() early, e.g. because new work was queued elsewhere."""
+        with self._cond:
+            self._woken = True
+            self._cond.notify()
+
+    def wait(self, timeout: Optional[float] = None) -> List[Hashable]:
+        """Blocks until keys fire, wake() is called or `timeout` passes; returns the fired keys."""
+        with self._cond:
+            if not self._fired and not self._woken:
+                self._cond.wait(timeout)
+            fired, self._fired = self._fired, []
+            self._woken = False
+            return fired